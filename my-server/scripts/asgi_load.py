@@ -0,0 +1,93 @@
+"""Tiny in-process ASGI load driver shared by the benchmark scripts.
+
+Requests are fed straight into the ASGI callable, so the numbers measure the
+application (routing, dependencies, database driver) and not a socket stack.
+"""
+import asyncio
+import statistics
+import time
+from contextlib import asynccontextmanager
+
+
+async def call(app, method, path, headers=None, body=b""):
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    body_sent = False
+    response = {"status": None, "headers": [], "body": []}
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Nothing else will arrive; park until the app stops listening.
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], b"".join(response["body"])
+
+
+@asynccontextmanager
+async def running(app):
+    """Run the app's lifespan startup/shutdown around the block."""
+    inbox = asyncio.Queue()
+    outbox = asyncio.Queue()
+    task = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}}, inbox.get, outbox.put))
+    await inbox.put({"type": "lifespan.startup"})
+    message = await outbox.get()
+    if message["type"] != "lifespan.startup.complete":
+        raise RuntimeError(message.get("message", "lifespan startup failed"))
+    try:
+        yield app
+    finally:
+        await inbox.put({"type": "lifespan.shutdown"})
+        await outbox.get()
+        await task
+
+
+async def run_load(send_one, total, concurrency):
+    """Issue ``total`` calls of ``send_one()`` with at most ``concurrency`` in flight.
+
+    Returns (elapsed seconds, latencies in seconds, {status: count}).
+    """
+    latencies = []
+    statuses = {}
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            status = await send_one()
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, statuses
+
+
+def summarize(label, elapsed, latencies, statuses):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{label:<24} {len(latencies) / elapsed:>9.0f} req/s   p50 {p50:7.1f} ms   p99 {p99:7.1f} ms   {statuses}")
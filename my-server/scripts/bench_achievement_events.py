@@ -0,0 +1,107 @@
+"""Log events per second through the achievement evaluator, by batch size.
+
+Events for --users users on random recent days are pushed through the real
+event bus and ``apply_events``. The session is a stub that compiles every
+statement for asyncpg and answers the summary and counter reads from memory,
+so the numbers are the evaluator's own cost (batching, folding, SQL
+building) plus the statement count a batch sends to Postgres:
+
+    poetry run python scripts/bench_achievement_events.py --events 20000
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+
+from sqlalchemy.dialects import postgresql
+
+from my_server.achievement_engine import LOGGED_COLUMNS, apply_events
+from my_server.events import EventBus, LogEvent
+from my_server.schema.achievements import AchievementCounterORM
+from my_server.schema.stats import UserDailySummaryORM
+
+DIALECT = postgresql.asyncpg.dialect()
+
+
+class StubResult:
+    def __init__(self, rows=(), rowcount=0):
+        self.rows = rows
+        self.rowcount = rowcount
+
+    def mappings(self):
+        return self.rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class StubSession:
+    """Holds every user's daily totals; answers the evaluator's reads for the current batch."""
+
+    def __init__(self, totals):
+        self.totals = totals
+        self.batch = []
+        self.statements = 0
+
+    async def execute(self, stmt):
+        stmt.compile(dialect=DIALECT)
+        self.statements += 1
+        tables = {table.name for table in stmt.get_final_froms()} if hasattr(stmt, "get_final_froms") else set()
+        if UserDailySummaryORM.__tablename__ in tables:
+            pairs = {(item.user_id, item.day) for item in self.batch}
+            return StubResult([self.totals[pair] for pair in pairs if pair in self.totals])
+        if AchievementCounterORM.__tablename__ in tables:
+            return StubResult([])
+        return StubResult(rowcount=len(self.batch))
+
+
+def make_events(count, users, days, rng):
+    today = date.today()
+    return [
+        LogEvent(f"user-{rng.randrange(users)}", today - timedelta(days=rng.randrange(days)))
+        for _ in range(count)
+    ]
+
+
+def make_totals(events, rng):
+    totals = {}
+    for item in events:
+        row = {"user_id": item.user_id, "date": item.day}
+        row.update({column: rng.randint(0, 40) for column in LOGGED_COLUMNS})
+        totals[(item.user_id, item.day)] = row
+    return totals
+
+
+async def measure(batch_size, events, totals):
+    bus = EventBus(len(events))
+    session = StubSession(totals)
+    for item in events:
+        bus.publish(item)
+    started = time.perf_counter()
+    done = 0
+    while done < len(events):
+        session.batch = await bus.next_batch(batch_size)
+        await apply_events(session, session.batch)
+        done += len(session.batch)
+    elapsed = time.perf_counter() - started
+    print(f"batch {batch_size:>5}: {done / elapsed:>10.0f} events/s  {session.statements / done:>6.3f} statements/event")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    events = make_events(args.events, args.users, args.days, rng)
+    totals = make_totals(events, rng)
+    for batch_size in (1, 10, 100, 500, 2000):
+        await measure(batch_size, events, totals)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""Requests per second: blocking psycopg2 sessions vs the asyncpg AsyncSession.
+
+Both apps serve the same "list my water logs" query. The legacy one is a sync
+route (FastAPI runs it in the 40-thread pool) on a psycopg2 engine, the other is
+an async route on ``auth.get_db``. Needs the docker-compose Postgres running:
+
+    poetry run python scripts/bench_db_drivers.py --requests 5000 --concurrency 200
+"""
+import argparse
+import asyncio
+from datetime import date, timedelta
+
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+
+from asgi_load import call, run_load, summarize
+from my_server.api import auth as auth_module
+from my_server.schema.auth import User
+from my_server.settings import settings
+from my_server.schema.water_intake_logs import WaterIntakeLogORM
+
+BENCH_USER_ID = "bench-db-drivers"
+
+sync_engine = create_engine(
+    settings.database_url.replace("+asyncpg", "+psycopg2"),
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+)
+SyncSession = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+
+
+def seed(rows):
+    with SyncSession() as db:
+        db.execute(delete(WaterIntakeLogORM).where(WaterIntakeLogORM.user_id == BENCH_USER_ID))
+        if db.get(User, BENCH_USER_ID) is None:
+            db.add(User(id=BENCH_USER_ID, username="bench", email="bench-db-drivers@example.com", password="x"))
+            db.flush()
+        start = date.today() - timedelta(days=rows)
+        db.add_all(
+            WaterIntakeLogORM(id=f"{BENCH_USER_ID}-{i}", user_id=BENCH_USER_ID, date=start + timedelta(days=i), count=i % 12)
+            for i in range(rows)
+        )
+        db.commit()
+
+
+def build_apps(delay):
+    legacy = FastAPI()
+    modern = FastAPI()
+
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @legacy.get("/logs")
+    def legacy_logs(db: Session = Depends(get_sync_db)):
+        if delay:
+            db.execute(text("SELECT pg_sleep(:s)"), {"s": delay})
+        logs = db.query(WaterIntakeLogORM).filter(WaterIntakeLogORM.user_id == BENCH_USER_ID).all()
+        return [{"id": log.id, "date": log.date, "count": log.count} for log in logs]
+
+    @modern.get("/logs")
+    async def async_logs(db: AsyncSession = Depends(auth_module.get_db)):
+        if delay:
+            await db.execute(text("SELECT pg_sleep(:s)"), {"s": delay})
+        result = await db.execute(select(WaterIntakeLogORM).where(WaterIntakeLogORM.user_id == BENCH_USER_ID))
+        return [{"id": log.id, "date": log.date, "count": log.count} for log in result.scalars()]
+
+    return legacy, modern
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=30, help="water logs seeded for the bench user")
+    parser.add_argument("--query-delay-ms", type=float, default=0.0,
+                        help="extra server-side latency per request (pg_sleep) to mimic a remote database")
+    args = parser.parse_args()
+
+    seed(args.rows)
+    legacy, modern = build_apps(args.query_delay_ms / 1000)
+    for label, app in (("psycopg2 + threadpool", legacy), ("asyncpg + AsyncSession", modern)):
+        async def send_one(app=app):
+            status, _, _ = await call(app, "GET", "/logs")
+            return status
+
+        await run_load(send_one, min(200, args.requests), args.concurrency)  # warm the pools
+        summarize(label, *await run_load(send_one, args.requests, args.concurrency))
+
+    await auth_module.engine.dispose()
+    sync_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""Build time and query latency of the food search index on a synthetic corpus.
+
+Generates Thai and English food names (default 100k), builds the index and
+times a mix of type-ahead prefixes, whole words, typos and Thai queries. Runs
+in-process, no database needed:
+
+    poetry run python scripts/bench_food_search.py --foods 100000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from my_server.food_search import FoodSearchIndex
+from my_server.schema.nutrition_database import NutritionDatabase
+
+ENGLISH = [
+    "chicken", "pork", "beef", "shrimp", "tofu", "egg", "rice", "noodle", "soup", "salad",
+    "fried", "grilled", "steamed", "spicy", "sweet", "sour", "green", "red", "curry", "basil",
+    "garlic", "pepper", "coconut", "milk", "mango", "sticky", "papaya", "banana", "pineapple", "cashew",
+    "omelette", "dumpling", "bun", "toast", "sandwich", "burger", "pizza", "pasta", "yogurt", "oat",
+]
+THAI = [
+    "ข้าว", "ผัด", "ไก่", "หมู", "กุ้ง", "ต้ม", "ยำ", "แกง", "เขียวหวาน", "กะเพรา",
+    "ไข่", "เจียว", "ส้มตำ", "มะม่วง", "เหนียว", "ก๋วยเตี๋ยว", "น้ำ", "ใส", "ทอด", "ปลา",
+    "หมูกรอบ", "ผัดไทย", "ต้มยำ", "มัสมั่น", "พะแนง", "ลาบ", "น้ำตก", "ขนมจีน", "โจ๊ก", "สะเต๊ะ",
+]
+QUERIES = [
+    "c", "ch", "chi", "chick", "chicken", "fried rice", "green curry", "chikcen", "currry", "pinaple",
+    "sticky rice mango", "ข้าว", "ผัดไทย", "ต้มยำกุ้ง", "กะเพราไก่", "ส้มตำ", "มะม่วงข้าวเหนียว", "x", "zzz",
+]
+
+
+def corpus(size, seed):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < size:
+        words = ENGLISH if rng.random() < 0.5 else THAI
+        parts = rng.sample(words, rng.randint(2, 4))
+        joiner = " " if words is ENGLISH else rng.choice(["", " "])
+        names.add(joiner.join(parts) + f" {rng.randint(1, 999)}" * (rng.random() < 0.3))
+    return [
+        NutritionDatabase(id=f"food-{i}", food_name=name, calories=rng.uniform(20, 900))
+        for i, name in enumerate(sorted(names))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--foods", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=50, help="times each query is run")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    foods = corpus(args.foods, args.seed)
+    index = FoodSearchIndex(refresh_seconds=0)
+    started = time.perf_counter()
+    index.build(foods)
+    print(f"built index over {len(index)} foods in {time.perf_counter() - started:.2f}s")
+
+    all_latencies = []
+    print(f"{'query':<22}{'p50 ms':>9}{'p99 ms':>9}  top hit")
+    for query in QUERIES:
+        latencies = []
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            hits = index.search(query, args.limit)
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        all_latencies.extend(latencies)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{query:<22}{statistics.median(latencies):>9.2f}{p99:>9.2f}  {hits[0].food_name if hits else '-'}")
+    all_latencies.sort()
+    print(f"{'all queries':<22}{statistics.median(all_latencies):>9.2f}{all_latencies[int(len(all_latencies) * 0.99)]:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Serialization and compression cost of a 5k-row /water_intake_logs response.
+
+The database is replaced by a stub returning the same ORM rows every time, so
+only routing, model building, JSON encoding and compression are measured:
+
+  * "list + JSONResponse": the handler returns List[WaterIntakeLog] and
+    FastAPI serializes it through the response_model (the previous behaviour)
+  * "list + FastJSONResponse": same, rendered by the app's default class
+  * "model_list_response": what the list endpoints do now
+  * the real route once per Accept-Encoding, with body sizes
+
+    poetry run python scripts/bench_list_responses.py --rows 5000
+"""
+import argparse
+import asyncio
+import os
+import random
+from datetime import date, datetime, timedelta
+from typing import List
+
+# the route's ?limit= bound is read at import time
+os.environ.setdefault("PAGE_SIZE_MAX", "5000")
+
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
+
+from asgi_load import call, run_load, summarize
+from my_server.api import auth as auth_module
+from my_server.main import app
+from my_server.responses import FastJSONResponse, model_list_response
+from my_server.schema.water_intake_logs import WaterIntakeLog, WaterIntakeLogORM
+
+
+class StubResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class StubSession:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def execute(self, stmt):
+        return StubResult(self.rows)
+
+
+def make_rows(count, seed):
+    rng = random.Random(seed)
+    start = date(2020, 1, 1)
+    return [
+        WaterIntakeLogORM(
+            id=f"water-{i:06d}", user_id="bench-user", date=start + timedelta(days=i),
+            count=rng.randint(0, 12), updated_at=datetime(2024, 1, 1) + timedelta(seconds=i * 37),
+        )
+        for i in range(count)
+    ]
+
+
+def to_models(rows):
+    return [WaterIntakeLog(id=r.id, user_id=r.user_id, date=r.date, count=r.count, updated_at=r.updated_at) for r in rows]
+
+
+def comparison_app(rows):
+    # models are built once here, these routes differ only in serialization
+    models = to_models(rows)
+    bench = FastAPI()
+
+    @bench.get("/plain", response_model=List[WaterIntakeLog], response_class=JSONResponse)
+    async def plain():
+        return models
+
+    @bench.get("/fast", response_model=List[WaterIntakeLog], response_class=FastJSONResponse)
+    async def fast():
+        return models
+
+    @bench.get("/direct", response_model=List[WaterIntakeLog])
+    async def direct(response: Response):
+        return model_list_response(response, WaterIntakeLog, models)
+
+    return bench
+
+
+async def measure(label, target, path, requests, headers=None):
+    sizes = []
+
+    async def one():
+        status, _, body = await call(target, "GET", path, headers)
+        sizes.append(len(body))
+        return status
+
+    elapsed, latencies, statuses = await run_load(one, requests, 1)
+    summarize(label, elapsed, latencies, statuses)
+    print(f"{'':<24} {sizes[-1]:>9} bytes")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, args.seed)
+    bench = comparison_app(rows)
+    await measure("list + JSONResponse", bench, "/plain", args.requests)
+    await measure("list + FastJSONResponse", bench, "/fast", args.requests)
+    await measure("model_list_response", bench, "/direct", args.requests)
+
+    async def stub_db():
+        yield StubSession(rows)
+
+    app.dependency_overrides[auth_module.get_db] = stub_db
+    app.dependency_overrides[auth_module.get_current_user_id] = lambda: "bench-user"
+    path = f"/water_intake_logs?limit={args.rows}"
+    for encoding in ("identity", "gzip", "br"):
+        await measure(f"route, {encoding}", app, path, args.requests, {"accept-encoding": encoding})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""Latency of ordinary routes while /auth/login is being hammered.
+
+Measures an authenticated GET (token-cached, no bcrypt) three ways: idle, during
+a login storm with bcrypt on the hashing pool, and during the same storm with
+bcrypt run inline on the event loop (the previous behaviour). Needs the
+docker-compose Postgres running:
+
+    poetry run python scripts/bench_login_storm.py --logins 200 --login-concurrency 50
+"""
+import argparse
+import asyncio
+import json
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from asgi_load import call, run_load, running, summarize
+from my_server.api import auth as auth_module
+from my_server.main import app
+
+
+class InlineHashing:
+    """Stand-in for HashingPool that blocks the event loop, as before."""
+
+    async def run(self, op, fn, *args):
+        return fn(*args)
+
+
+async def register(email, password):
+    body = json.dumps({"username": "storm", "email": email, "password": password}).encode()
+    status, _, payload = await call(app, "POST", "/auth/register", {"content-type": "application/json"}, body)
+    if status != 200:
+        raise SystemExit(f"register failed: {status} {payload!r}")
+    return json.loads(payload)["access_token"]
+
+
+async def measure(label, probe, probes, storm):
+    storm_task = asyncio.create_task(storm()) if storm else None
+    await asyncio.sleep(0)
+    summarize(label, *await run_load(probe, probes, 4))
+    if storm_task:
+        elapsed, latencies, statuses = await storm_task
+        summarize("  logins during run", elapsed, latencies, statuses)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--login-concurrency", type=int, default=50)
+    parser.add_argument("--probes", type=int, default=400)
+    args = parser.parse_args()
+
+    async with running(app):
+        email, password = f"storm-{uuid4().hex[:8]}@example.com", "correct horse battery staple"
+        token = await register(email, password)
+        login_body = urlencode({"username": email, "password": password}).encode()
+
+        async def probe():
+            status, _, _ = await call(app, "GET", "/food_logs", {"authorization": f"Bearer {token}"})
+            return status
+
+        async def login():
+            status, _, _ = await call(app, "POST", "/auth/login",
+                                      {"content-type": "application/x-www-form-urlencoded"}, login_body)
+            return status
+
+        async def storm():
+            return await run_load(login, args.logins, args.login_concurrency)
+
+        pool = auth_module.hashing_pool
+        print(f"bcrypt rounds={auth_module.settings.bcrypt_rounds} workers={pool.workers} max_pending={pool.max_pending}")
+        await measure("probe, idle", probe, args.probes, None)
+        await measure("probe, storm on pool", probe, args.probes, storm)
+        auth_module.hashing_pool = InlineHashing()
+        try:
+            await measure("probe, storm inline", probe, args.probes, storm)
+        finally:
+            auth_module.hashing_pool = pool
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+"""Throughput of the nutrition_database bulk import on a generated file.
+
+Writes a synthetic CSV or JSONL reference dataset (default 500k foods) to a
+temporary file and loads it with the same code as POST /nutrition_database/import.
+``--parse-only`` times reading and validation without a database; otherwise
+the docker-compose Postgres must be running:
+
+    poetry run python scripts/bench_nutrition_import.py --rows 500000
+    poetry run python scripts/bench_nutrition_import.py --rows 500000 --format jsonl --parse-only
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+
+from sqlalchemy import delete
+
+from my_server.database import SessionLocal, engine
+from my_server.nutrition_import import import_foods, read_chunks, text_stream
+from my_server.schema.nutrition_database import NutritionDatabaseORM
+from my_server.settings import settings
+
+NAME_PREFIX = "bench-import "
+
+
+def generate(path, rows, fmt, seed):
+    rng = random.Random(seed)
+    columns = ("food_name", "calories", "protein", "carbs", "fat", "fiber", "sugar")
+    with open(path, "w", encoding="utf-8") as out:
+        if fmt == "csv":
+            out.write(",".join(columns) + "\n")
+        for i in range(rows):
+            values = [f"{NAME_PREFIX}{i}"] + [f"{rng.uniform(0, 100):.1f}" for _ in columns[1:]]
+            if fmt == "csv":
+                out.write(",".join(values) + "\n")
+            else:
+                out.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False) + "\n")
+
+
+async def load(path, fmt, chunk_size):
+    async with SessionLocal() as db:
+        with open(path, "rb") as binary:
+            report = await import_foods(db, text_stream(binary), fmt, chunk_size)
+        await db.execute(delete(NutritionDatabaseORM).where(NutritionDatabaseORM.food_name.startswith(NAME_PREFIX)))
+        await db.commit()
+    await engine.dispose()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    parser.add_argument("--chunk-size", type=int, default=settings.nutrition_import_chunk_size)
+    parser.add_argument("--parse-only", action="store_true", help="read and validate only, no database")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile(suffix=f".{args.format}") as tmp:
+        generate(tmp.name, args.rows, args.format, args.seed)
+        if args.parse_only:
+            started = time.perf_counter()
+            with open(tmp.name, "rb") as binary:
+                valid = sum(chunk[1] for chunk in read_chunks(text_stream(binary), args.format, args.chunk_size))
+            seconds = time.perf_counter() - started
+            print(f"parsed and validated {valid} rows in {seconds:.2f}s ({valid / seconds:.0f} rows/s)")
+            return
+        report = asyncio.run(load(tmp.name, args.format, args.chunk_size))
+    print(f"{report.accepted} rows written, {report.rejected} rejected in {report.seconds}s ({report.rows_per_second} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Per-row cost of turning query results into response models.
+
+Reads the water_intake_logs rows from an in-memory SQLite copy of the table
+(no Postgres needed; the driver cost is the same for every variant) and
+builds WaterIntakeLog models three ways, timing the fetch (driver and row
+or ORM instance construction) and the conversion separately:
+
+  * "orm + __dict__": select(ORM), then Model(**{k: getattr(...)}) per row,
+    as the handlers did before, plus FastAPI dumping and validating those
+    models again against the response_model
+  * "orm + to_models": select(ORM), validated with from_attributes in one call
+  * "select_rows + to_models": column tuples, no ORM instances, what the list
+    endpoints do now
+
+    poetry run python scripts/bench_row_conversion.py --rows 5000
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from my_server.responses import _list_adapter, select_rows, to_models
+from my_server.schema.water_intake_logs import Base, WaterIntakeLog, WaterIntakeLogORM
+
+
+def seed(session, rows, rng):
+    start = date(2010, 1, 1)
+    session.execute(WaterIntakeLogORM.__table__.insert(), [
+        {
+            "id": f"water-{i:06d}", "user_id": "bench-user", "date": start + timedelta(days=i),
+            "count": rng.randint(0, 12), "updated_at": datetime(2024, 1, 1) + timedelta(seconds=i * 37),
+        }
+        for i in range(rows)
+    ])
+    session.commit()
+
+
+def fetch_orm(session):
+    return session.execute(select(WaterIntakeLogORM)).scalars().all()
+
+
+def fetch_rows(session):
+    return session.execute(select_rows(WaterIntakeLogORM)).all()
+
+
+def dict_copy_and_revalidate(logs):
+    models = [WaterIntakeLog(**{k: getattr(log, k) for k in log.__dict__ if not k.startswith('_')}) for log in logs]
+    # what FastAPI did with the returned list: dump each model, validate against response_model
+    return _list_adapter(WaterIntakeLog).validate_python([model.model_dump() for model in models])
+
+
+def from_attributes(rows):
+    return to_models(WaterIntakeLog, rows)
+
+
+VARIANTS = (
+    ("orm + __dict__ (before)", fetch_orm, dict_copy_and_revalidate),
+    ("orm + to_models", fetch_orm, from_attributes),
+    ("select_rows + to_models", fetch_rows, from_attributes),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed(session, args.rows, random.Random(args.seed))
+
+    print(f"{'':<26}{'fetch':>10}{'convert':>10}{'total':>10}  us/row")
+    baseline = None
+    for label, fetch, convert in VARIANTS:
+        fetch_times, convert_times = [], []
+        for _ in range(args.rounds):
+            # a fresh session per round, like one request: no identity map reuse
+            with Session(engine) as session:
+                started = time.perf_counter()
+                rows = fetch(session)
+                fetched = time.perf_counter()
+                models = convert(rows)
+                fetch_times.append(fetched - started)
+                convert_times.append(time.perf_counter() - fetched)
+        assert len(models) == args.rows
+        fetch_cost, convert_cost = (min(times) / args.rows * 1e6 for times in (fetch_times, convert_times))
+        baseline = baseline or fetch_cost + convert_cost
+        total = fetch_cost + convert_cost
+        print(f"{label:<26}{fetch_cost:>10.2f}{convert_cost:>10.2f}{total:>10.2f}  x{baseline / total:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""Server side achievement progress, driven by the log events of ``my_server.events``.
+
+An achievement's ``target`` is a number of consecutive days, each meeting the
+daily amount its type asks for (``DAILY_GOALS``), which is how the app reads
+its achievements: ``water_beginner`` (1) and ``water_week`` (7) count days
+with 8 glasses, ``exercise_first`` and ``exercise_week`` days with 30 minutes
+of exercise, ``sleep_good`` and ``sleep_week`` nights of 8 hours; ``streak``
+counts days with anything logged. Each user has one counter per such type in
+``achievement_counters``: the length of the run of qualifying days ending on
+its ``last_day``.
+
+A batch of events only reads the ``user_daily_summary`` rows of the days it
+names and the users' counters, folds them in memory and writes the counters
+that moved; the achievements of those types then take the counter as
+``current`` and are marked achieved at their ``target``. Clients do not
+compute or PUT back the progress of ``TRACKED_TYPES`` (``drop_client_progress``
+removes it from their writes) and ``initialize_achievements`` sets it when
+such an achievement is written; the progress of other types (weight,
+milestone, ...) stays the client's. A run is only broken by the next
+qualifying day that does not follow it, and days logged behind a counter's
+last day, or edits that lower a day's total, do not move it back.
+
+The evaluator runs as a background task of the app (see main), off the
+request path; ``scripts/bench_achievement_events.py`` measures its throughput.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+from sqlalchemy import ARRAY, String, and_, case, func, literal, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from .events import EventBus, LogEvent, bus
+from .metrics import REGISTRY
+from .schema.achievements import AchievementCounterORM, AchievementORM
+from .schema.stats import UserDailySummaryORM
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+# First key of the pg_advisory_xact_lock(int, int) pair, the second is the user
+ACHIEVEMENT_LOCK_NAMESPACE = 4243
+
+# Achievement type -> the user_daily_summary column and the amount a day needs to count
+DAILY_GOALS = {
+    "water": ("water_count", 8),
+    "exercise": ("exercise_minutes", 30),
+    "sleep": ("sleep_hours", 8),
+}
+# Counts days with anything logged in these columns
+STREAK = "streak"
+LOGGED_COLUMNS = ("water_count", "exercise_minutes", "sleep_hours", "meal_count")
+
+TRACKED_TYPES = (*DAILY_GOALS, STREAK)
+
+# Columns of the achievements of TRACKED_TYPES only the server writes
+PROGRESS_COLUMNS = ("current", "achieved", "achieved_at")
+
+ONE_DAY = timedelta(days=1)
+
+EVENTS_PROCESSED = REGISTRY.counter("achievement_events_processed_total", "Log events folded into achievement counters")
+BATCH_FAILURES = REGISTRY.counter("achievement_batch_failures_total", "Event batches whose transaction failed (events lost)")
+BATCH_SECONDS = REGISTRY.histogram("achievement_batch_seconds", "Time to apply one batch of log events")
+
+
+@dataclass
+class Counter:
+    value: int = 0
+    last_day: Optional[date] = None
+
+
+def _advance(counter: Counter, days: Iterable[date]) -> bool:
+    """Extend ``counter``'s run by the qualifying ``days`` (in order) after its last day."""
+    moved = False
+    for day in days:
+        if counter.last_day is not None and day <= counter.last_day:
+            continue
+        counter.value = counter.value + 1 if counter.last_day == day - ONE_DAY else 1
+        counter.last_day = day
+        moved = True
+    return moved
+
+
+def fold(counters: Dict[str, Counter], totals: Mapping[date, Mapping[str, float]]) -> Set[str]:
+    """Advance one user's ``counters`` by the daily ``totals`` of the changed days; returns the types that moved."""
+    days = sorted(totals)
+    qualifying = {
+        kind: [day for day in days if totals[day][column] >= amount]
+        for kind, (column, amount) in DAILY_GOALS.items()
+    }
+    qualifying[STREAK] = [day for day in days if any(totals[day][column] for column in LOGGED_COLUMNS)]
+    return {kind for kind, kind_days in qualifying.items() if _advance(counters.setdefault(kind, Counter()), kind_days)}
+
+
+def drop_client_progress(values: Dict) -> None:
+    """Remove the progress fields from a client write of an achievement, unless it names a type the engine does not track."""
+    if values.get("type") in TRACKED_TYPES or "type" not in values:
+        for name in PROGRESS_COLUMNS:
+            values.pop(name, None)
+
+
+def _lock_users(user_ids: List[str]):
+    # keys in a fixed order, so two batches sharing users cannot deadlock
+    keys = select(func.hashtext(func.unnest(literal(user_ids, ARRAY(String)))).label("key")).subquery("keys")
+    ordered = select(keys.c.key).order_by(keys.c.key).subquery("ordered")
+    return select(func.pg_advisory_xact_lock(ACHIEVEMENT_LOCK_NAMESPACE, ordered.c.key))
+
+
+def _sync_achievements(moved: List[Tuple[str, str]], now: datetime):
+    """UPDATE the achievements of the moved (user, type) pairs from their counters."""
+    achievement = AchievementORM.__table__
+    counter = AchievementCounterORM.__table__
+    reached = and_(achievement.c.target.isnot(None), counter.c.value >= achievement.c.target)
+    already = func.coalesce(achievement.c.achieved, False)
+    return update(achievement).where(
+        achievement.c.user_id == counter.c.user_id,
+        achievement.c.type == counter.c.type,
+        tuple_(counter.c.user_id, counter.c.type).in_(moved),
+        or_(achievement.c.current.is_distinct_from(counter.c.value), and_(reached, ~already)),
+    ).values(
+        current=counter.c.value,
+        achieved=or_(already, reached),
+        achieved_at=case((and_(reached, ~already), now), else_=achievement.c.achieved_at),
+        updated_at=now,
+    )
+
+
+async def initialize_achievements(db: AsyncSession, user_id: str, achievement_ids: Iterable[str]) -> Dict[str, Mapping]:
+    """Set the progress of the given achievements from the user's counters; returns the new values by id.
+
+    ``apply_events`` only updates achievements whose counter moved, so one
+    created (or given another type or target) after its counter advanced
+    takes the counter here, in the caller's transaction.
+    """
+    achievement = AchievementORM.__table__
+    counter = AchievementCounterORM.__table__
+    await db.execute(_lock_users([user_id]))
+    # a type without a counter yet starts at 0
+    progress = select(achievement.c.id, func.coalesce(counter.c.value, 0).label("value")).outerjoin(
+        counter, and_(counter.c.user_id == achievement.c.user_id, counter.c.type == achievement.c.type)
+    ).where(
+        achievement.c.user_id == user_id,
+        achievement.c.id.in_(list(achievement_ids)),
+        achievement.c.type.in_(TRACKED_TYPES),
+    ).subquery("progress")
+    value = progress.c.value
+    reached = and_(achievement.c.target.isnot(None), value >= achievement.c.target)
+    already = func.coalesce(achievement.c.achieved, False)
+    result = await db.execute(update(achievement).where(achievement.c.id == progress.c.id).values(
+        current=value,
+        achieved=or_(already, reached),
+        achieved_at=case((and_(reached, ~already), datetime.utcnow()), else_=achievement.c.achieved_at),
+    ).returning(achievement.c.id, *(achievement.c[name] for name in PROGRESS_COLUMNS)))
+    return {row["id"]: {name: row[name] for name in PROGRESS_COLUMNS} for row in result.mappings()}
+
+
+async def apply_events(db: AsyncSession, events: Iterable[LogEvent]) -> int:
+    """Fold ``events`` into the counters and achievements in ``db``'s transaction; returns the achievements updated.
+
+    Five statements however many events and users the batch holds.
+    """
+    pairs = {(item.user_id, item.day) for item in events}
+    user_ids = sorted({user_id for user_id, _ in pairs})
+    if not user_ids:
+        return 0
+    await db.execute(_lock_users(user_ids))
+
+    summary = UserDailySummaryORM.__table__
+    totals: Dict[str, Dict[date, Mapping]] = {user_id: {} for user_id in user_ids}
+    rows = await db.execute(
+        select(summary.c.user_id, summary.c.date, *(summary.c[column] for column in LOGGED_COLUMNS))
+        .where(tuple_(summary.c.user_id, summary.c.date).in_(sorted(pairs)))
+    )
+    for row in rows.mappings():
+        totals[row["user_id"]][row["date"]] = row
+
+    counter_table = AchievementCounterORM.__table__
+    counters: Dict[str, Dict[str, Counter]] = {user_id: {} for user_id in user_ids}
+    rows = await db.execute(select(counter_table).where(counter_table.c.user_id.in_(user_ids)))
+    for row in rows:
+        counters[row.user_id][row.type] = Counter(row.value, row.last_day)
+
+    moved = [
+        (user_id, kind)
+        for user_id in user_ids
+        for kind in sorted(fold(counters[user_id], totals[user_id]))
+    ]
+    if not moved:
+        return 0
+    now = datetime.utcnow()
+    stmt = insert(counter_table).values([
+        {"user_id": user_id, "type": kind, "value": counters[user_id][kind].value,
+         "last_day": counters[user_id][kind].last_day, "updated_at": now}
+        for user_id, kind in moved
+    ])
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[counter_table.c.user_id, counter_table.c.type],
+        set_={name: stmt.excluded[name] for name in ("value", "last_day", "updated_at")},
+    ))
+    result = await db.execute(_sync_achievements(moved, now))
+    return result.rowcount
+
+
+class AchievementEvaluator:
+    """Consumes the event bus in batches, one transaction per batch."""
+
+    def __init__(self, events: EventBus, batch_size: int):
+        self.events = events
+        self.batch_size = batch_size
+
+    async def process(self, sessionmaker: async_sessionmaker, batch: List[LogEvent]) -> None:
+        started = time.perf_counter()
+        try:
+            async with sessionmaker() as db:
+                await apply_events(db, batch)
+                await db.commit()
+        except Exception:
+            BATCH_FAILURES.inc()
+            logger.exception("Could not apply %d log events to achievements", len(batch))
+            return
+        finally:
+            BATCH_SECONDS.observe(time.perf_counter() - started)
+        EVENTS_PROCESSED.inc(len(batch))
+
+    async def run(self, sessionmaker: async_sessionmaker) -> None:
+        while True:
+            batch = await self.events.next_batch(self.batch_size)
+            await self.process(sessionmaker, batch)
+
+
+achievement_evaluator = AchievementEvaluator(bus, settings.achievement_batch_size)
@@ -1,32 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordRequestForm
-from my_server.schema.auth import User, RegisterRequest, LoginRequest, TokenResponse
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from my_server.schema.auth import User, RegisterRequest, TokenResponse
 from passlib.context import CryptContext
 import jwt
+import hashlib
 from datetime import datetime, timedelta
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import select
+from my_server.cache import TTLCache
+from my_server.database import engine, SessionLocal, get_db  # noqa: F401  engine and SessionLocal are used as auth_module.*
+from my_server.hashing import HashingPool
+from my_server.settings import settings
 
 router = APIRouter(tags=["Authentication"])
 
-# DB config from docker-compose
-DB_USER = "admin"
-DB_PASSWORD = "adminpass"
-DB_HOST = "localhost"
-DB_PORT = "5432"
-DB_NAME = "health_db"
-DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-from my_server.schema.auth import Base
-
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
+# bcrypt is hundreds of ms of CPU, keep it off the event loop
+hashing_pool = HashingPool(settings.password_hash_workers, settings.password_hash_max_pending)
 SECRET_KEY = "your-secret-key"  # Change this in production
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+# Verified claims keyed by token digest, so a dashboard fan-out decodes the token once
+claims_cache = TTLCache("auth_claims", maxsize=settings.auth_claims_cache_size, ttl=settings.auth_claims_cache_ttl)
+
 
 def verify_password(plain_password, hashed_password):
 	return pwd_context.verify(plain_password, hashed_password)
@@ -41,33 +39,53 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
 	encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 	return encoded_jwt
 
-def get_db():
-	db = SessionLocal()
-	try:
-		yield db
-	finally:
-		db.close()
+def decode_access_token(token: str) -> dict:
+	key = hashlib.sha256(token.encode()).digest()
+	claims = claims_cache.get(key)
+	if claims is None:
+		try:
+			claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+		except jwt.PyJWTError:
+			raise HTTPException(status_code=401, detail="Invalid token")
+		# never serve a cached token past its exp
+		claims_cache.set(key, claims, expires_at=claims.get("exp"))
+	return claims
+
+def get_current_user_id(token: str = Depends(oauth2_scheme)) -> str:
+	claims = decode_access_token(token)
+	user_id = claims.get("user_id") or claims.get("sub")
+	if user_id is None:
+		raise HTTPException(status_code=401, detail="Invalid token")
+	return user_id
+
+def get_admin_user_id(user_id: str = Depends(get_current_user_id)) -> str:
+	"""The caller's id if it is one of ``settings.admin_user_ids``, else 403."""
+	if user_id not in settings.admins:
+		raise HTTPException(status_code=403, detail="Admin access required")
+	return user_id
 
 @router.post("/register", response_model=TokenResponse)
-def register(request: RegisterRequest, db=Depends(get_db)):
+async def register(request: RegisterRequest, db=Depends(get_db)):
 	from uuid import uuid4
 	# Allow duplicate usernames; enforce unique email only
-	email_exist = db.query(User).filter(User.email == request.email).first()
+	result = await db.execute(select(User).where(User.email == request.email))
+	email_exist = result.scalars().first()
 	if email_exist:
 		raise HTTPException(status_code=400, detail="Email already registered")
-	hashed_password = get_password_hash(request.password)
+	hashed_password = await hashing_pool.run("hash", get_password_hash, request.password)
 	user = User(id=str(uuid4()), username=request.username, email=request.email, password=hashed_password)
 	db.add(user)
-	db.commit()
+	await db.commit()
 	# include user id in token
 	access_token = create_access_token({"sub": request.email, "user_id": user.id})
 	return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/login", response_model=TokenResponse)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db=Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db=Depends(get_db)):
 	# Authenticate by email + password
-	user = db.query(User).filter(User.email == form_data.username).first()
-	if not user or not verify_password(form_data.password, user.password):
+	result = await db.execute(select(User).where(User.email == form_data.username))
+	user = result.scalars().first()
+	if not user or not await hashing_pool.run("verify", verify_password, form_data.password, user.password):
 		raise HTTPException(status_code=401, detail="Incorrect email or password")
 	access_token = create_access_token({"sub": user.email, "user_id": user.id})
 	return {"access_token": access_token, "token_type": "bearer"}
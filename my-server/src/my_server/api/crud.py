@@ -0,0 +1,270 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+from datetime import date, datetime
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..api import auth as auth_module
+from ..api.etag import conditional_get
+from ..api.pagination import PageParams, page_params, paginate, finish_page
+from ..api.sync import record_deletions
+from ..enums import enum_registry
+from ..responses import model_list_response, select_rows
+from ..rollup import refresh_daily_summary
+
+
+class CrudHooks:
+    """Resource specific steps around the generic writes.
+
+    ``prepare``, ``before_delete`` and ``written`` run in the request's
+    transaction, ``committed`` after the commit. ``written`` may change
+    ``new`` of a create or update, it is what the route returns. ``old`` is None for a create,
+    the deleted row for a delete, and for an update (or a PUT /by_date that
+    replaced the day's row) holds the ``CrudResource.previous_columns``
+    values from before the update.
+    """
+
+    async def prepare(self, db: AsyncSession, user_id: str, values: Dict[str, Any]) -> None:
+        pass
+
+    async def before_delete(self, db: AsyncSession, user_id: str, record_id: str) -> None:
+        pass
+
+    async def written(self, db: AsyncSession, user_id: str, old: Optional[Mapping], new: Optional[Mapping]) -> None:
+        pass
+
+    def committed(self, old: Optional[Mapping], new: Optional[Mapping]) -> None:
+        pass
+
+
+class DailySummaryHooks(CrudHooks):
+    """Keeps user_daily_summary current for a log table placed on days by ``date_column``."""
+
+    def __init__(self, date_column: str = "date"):
+        self.date_column = date_column
+
+    async def written(self, db, user_id, old, new):
+        days = [row.get(self.date_column) for row in (old, new) if row is not None]
+        await refresh_daily_summary(db, user_id, days)
+
+
+class CrudResource:
+    """One table exposed as list/get/create/update/delete routes under ``/<name>``.
+
+    Every write is a single statement: INSERT ... ON CONFLICT (id) DO NOTHING
+    RETURNING, UPDATE ... RETURNING and DELETE ... RETURNING, all scoped to
+    the caller's rows when ``user_scoped``.
+
+    ``defaults`` fill fields a create leaves out; on update a missing (None)
+    value for one of those fields keeps the stored one. ``previous_columns``
+    are read in the same UPDATE (FROM a locked sub-select) for ``hooks``.
+    ``conflict_detail`` turns a unique violation other than the id into a 400.
+    ``write_dependencies`` run before the create, update and delete routes,
+    e.g. a permission check.
+
+    Tables with one row per user per day (a unique (user_id, ``day_column``)
+    index) also get ``PUT /<name>/by_date/{day}``, an upsert on that index.
+    """
+
+    def __init__(
+        self,
+        orm,
+        schema,
+        name: str,
+        label: str,
+        sort_column,
+        *,
+        user_scoped: bool = True,
+        enum_fields: Optional[Dict[str, str]] = None,
+        updated_column: str = "updated_at",
+        defaults: Optional[Dict[str, Any]] = None,
+        previous_columns: Sequence[str] = (),
+        conflict_detail: Optional[str] = None,
+        conditional: bool = False,
+        day_column: Optional[str] = None,
+        write_dependencies: Sequence[Any] = (),
+        hooks: Optional[CrudHooks] = None,
+    ):
+        self.orm = orm
+        self.table = orm.__table__
+        self.schema = schema
+        self.name = name
+        self.label = label
+        self.sort_column = sort_column
+        self.user_scoped = user_scoped
+        self.enum_fields = enum_fields or {}
+        self.updated_column = updated_column
+        self.defaults = defaults or {}
+        self.previous_columns = tuple(previous_columns)
+        self.conflict_detail = conflict_detail
+        self.conditional = conditional
+        self.day_column = day_column
+        self.write_dependencies = list(write_dependencies)
+        self.hooks = hooks or CrudHooks()
+        # columns the client writes; the server owns the rest
+        self.writable = [
+            c.name for c in self.table.columns
+            if c.name in schema.model_fields and c.name not in ("id", "user_id", "created_at", updated_column)
+        ]
+
+    def owned(self, record_id: str, user_id: str) -> list:
+        conditions = [self.table.c.id == record_id]
+        if self.user_scoped:
+            conditions.append(self.table.c.user_id == user_id)
+        return conditions
+
+    def values(self, item, creating: bool) -> Dict[str, Any]:
+        for field, enum_name in self.enum_fields.items():
+            enum_registry.validate(enum_name, getattr(item, field), field)
+        values = {}
+        for name in self.writable:
+            value = getattr(item, name)
+            if value is None and name in self.defaults:
+                if not creating:
+                    continue
+                value = self.defaults[name]
+            values[name] = value
+        return values
+
+    def new_row(self, record_id: str, user_id: str, values: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        row = dict(values, id=record_id)
+        if self.user_scoped:
+            row["user_id"] = user_id
+        if "created_at" in self.table.c:
+            row["created_at"] = now
+        row[self.updated_column] = now
+        return row
+
+    def update_statement(self, record_id: str, user_id: str, values: Dict[str, Any]):
+        if not self.previous_columns:
+            return update(self.table).where(*self.owned(record_id, user_id)).values(values).returning(*self.table.columns)
+        previous = select(
+            self.table.c.id, *(self.table.c[name] for name in self.previous_columns)
+        ).where(*self.owned(record_id, user_id)).with_for_update().subquery("previous")
+        return update(self.table).where(self.table.c.id == previous.c.id).values(values).returning(
+            *self.table.columns,
+            *(previous.c[name].label(f"previous_{name}") for name in self.previous_columns),
+        )
+
+
+async def _execute_write(db: AsyncSession, resource: CrudResource, stmt):
+    try:
+        return (await db.execute(stmt)).mappings().first()
+    except IntegrityError:
+        if resource.conflict_detail is None:
+            raise
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=resource.conflict_detail)
+
+
+def add_crud_routes(router: APIRouter, resource: CrudResource) -> None:
+    """Register the five routes of ``resource`` on ``router``.
+
+    Call it after the module's own routes under the same prefix, so that e.g.
+    ``/<name>/search`` is matched before ``/<name>/{item_id}``.
+    """
+    schema = resource.schema
+    table = resource.table
+    path = f"/{resource.name}"
+    reads = [Depends(conditional_get(resource.orm))] if resource.conditional and resource.user_scoped else []
+    writes = resource.write_dependencies
+
+    @router.get(path, response_model=List[schema], dependencies=reads, name=f"list_{resource.name}")
+    async def list_items(response: Response, page: PageParams = Depends(page_params), db: AsyncSession = Depends(auth_module.get_db), user_id: str = Depends(auth_module.get_current_user_id)):
+        stmt = select_rows(resource.orm)
+        if resource.user_scoped:
+            stmt = stmt.where(table.c.user_id == user_id)
+        result = await db.execute(paginate(stmt, resource.sort_column, table.c.id, page))
+        rows = finish_page(response, result.all(), resource.sort_column.key, page)
+        return model_list_response(response, schema, rows)
+
+    @router.get(f"{path}/{{item_id}}", response_model=schema, dependencies=reads, name=f"get_{resource.name}")
+    async def get_item(item_id: str, db: AsyncSession = Depends(auth_module.get_db), user_id: str = Depends(auth_module.get_current_user_id)):
+        row = (await db.execute(select_rows(resource.orm).where(*resource.owned(item_id, user_id)))).mappings().first()
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"{resource.label} not found")
+        return dict(row)
+
+    @router.post(path, response_model=schema, dependencies=writes, name=f"create_{resource.name}")
+    async def create_item(item: schema, db: AsyncSession = Depends(auth_module.get_db), user_id: str = Depends(auth_module.get_current_user_id)):
+        values = resource.values(item, creating=True)
+        await resource.hooks.prepare(db, user_id, values)
+        values = resource.new_row(item.id, user_id, values, datetime.utcnow())
+        stmt = insert(table).values(values).on_conflict_do_nothing(index_elements=[table.c.id]).returning(*table.columns)
+        row = await _execute_write(db, resource, stmt)
+        if row is None:
+            raise HTTPException(status_code=400, detail=f"{resource.label} already exists")
+        row = dict(row)
+        await resource.hooks.written(db, user_id, None, row)
+        await db.commit()
+        resource.hooks.committed(None, row)
+        return row
+
+    if resource.day_column is not None:
+        @router.put(f"{path}/by_date/{{day}}", response_model=schema, dependencies=writes, name=f"put_{resource.name}_by_date")
+        async def put_item_by_date(day: date, item: schema, db: AsyncSession = Depends(auth_module.get_db), user_id: str = Depends(auth_module.get_current_user_id)):
+            """Create or replace the caller's row for ``day``; a new row takes the body's id."""
+            values = resource.values(item, creating=True)
+            await resource.hooks.prepare(db, user_id, values)
+            values[resource.day_column] = day
+            # fields left out keep their stored value, as in PUT /{item_id}
+            replaced = [name for name in resource.values(item, creating=False) if name != resource.day_column]
+            # the day's row as the statement found it, for the hooks; no FOR UPDATE,
+            # it would skip the row once the upsert in the same statement changed it
+            previous = select(
+                table.c.id, *(table.c[name] for name in resource.previous_columns)
+            ).where(table.c.user_id == user_id, table.c[resource.day_column] == day).cte("previous")
+            stmt = insert(table).values(resource.new_row(item.id, user_id, values, datetime.utcnow()))
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id, table.c[resource.day_column]],
+                set_={name: stmt.excluded[name] for name in (*replaced, resource.updated_column)},
+            ).add_cte(previous).returning(
+                *table.columns,
+                select(previous.c.id).scalar_subquery().label("previous_id"),
+                *(select(previous.c[name]).scalar_subquery().label(f"previous_{name}") for name in resource.previous_columns),
+            )
+            try:
+                row = (await db.execute(stmt)).mappings().first()
+            except IntegrityError:
+                # the id is taken by another row
+                await db.rollback()
+                raise HTTPException(status_code=400, detail=f"{resource.label} already exists")
+            new = {c.name: row[c.name] for c in table.columns}
+            old = None
+            if row["previous_id"] is not None:
+                old = {name: row[f"previous_{name}"] for name in resource.previous_columns}
+            await resource.hooks.written(db, user_id, old, new)
+            await db.commit()
+            resource.hooks.committed(old, new)
+            return new
+
+    @router.put(f"{path}/{{item_id}}", response_model=schema, dependencies=writes, name=f"update_{resource.name}")
+    async def update_item(item_id: str, item: schema, db: AsyncSession = Depends(auth_module.get_db), user_id: str = Depends(auth_module.get_current_user_id)):
+        values = resource.values(item, creating=False)
+        await resource.hooks.prepare(db, user_id, values)
+        values[resource.updated_column] = datetime.utcnow()
+        row = await _execute_write(db, resource, resource.update_statement(item_id, user_id, values))
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"{resource.label} not found")
+        new = {c.name: row[c.name] for c in table.columns}
+        old = {name: row[f"previous_{name}"] for name in resource.previous_columns}
+        await resource.hooks.written(db, user_id, old, new)
+        await db.commit()
+        resource.hooks.committed(old, new)
+        return new
+
+    @router.delete(f"{path}/{{item_id}}", dependencies=writes, name=f"delete_{resource.name}")
+    async def delete_item(item_id: str, db: AsyncSession = Depends(auth_module.get_db), user_id: str = Depends(auth_module.get_current_user_id)):
+        await resource.hooks.before_delete(db, user_id, item_id)
+        stmt = delete(table).where(*resource.owned(item_id, user_id)).returning(*table.columns)
+        row = (await db.execute(stmt)).mappings().first()
+        if row is None:
+            await db.rollback()
+            raise HTTPException(status_code=404, detail=f"{resource.label} not found")
+        if resource.user_scoped:
+            await record_deletions(db, resource.name, user_id, [row["id"]])
+        await resource.hooks.written(db, user_id, row, None)
+        await db.commit()
+        resource.hooks.committed(row, None)
+        return {"detail": f"{resource.label} deleted"}
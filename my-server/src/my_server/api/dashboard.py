@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from datetime import date, datetime
+from sqlalchemy import JSON, func, literal_column, select, type_coerce
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..schema.dashboard import DashboardSnapshot
+from ..schema.basic_profile import BasicProfileORM
+from ..schema.physical_info import PhysicalInfoORM
+from ..schema.user_goals import UserGoalORM
+from ..schema.water_intake_logs import WaterIntakeLogORM
+from ..schema.exercise_logs import ExerciseLogORM
+from ..schema.sleep_logs import SleepLogORM
+from ..schema.achievements import AchievementORM
+from ..api import auth as auth_module
+from ..responses import select_rows
+
+router = APIRouter(tags=["Dashboard"])
+
+
+def _latest(orm, user_id: str, *criteria):
+    """The user's most recently updated row of ``orm`` as a JSON object, or NULL."""
+    rows = select_rows(orm).where(orm.user_id == user_id, *criteria).order_by(orm.updated_at.desc().nulls_last()).limit(1).subquery()
+    return type_coerce(select(func.row_to_json(rows.table_valued())).scalar_subquery(), JSON)
+
+
+def _all(orm, user_id: str, order_column, *criteria):
+    """The user's rows of ``orm`` as a JSON array ordered by ``order_column``, [] if none."""
+    rows = select_rows(orm).where(orm.user_id == user_id, *criteria).subquery()
+    aggregated = func.json_agg(aggregate_order_by(rows.table_valued(), rows.c[order_column.key], rows.c.id))
+    return type_coerce(select(func.coalesce(aggregated, literal_column("'[]'::json"))).scalar_subquery(), JSON)
+
+
+def dashboard_query(user_id: str, day: date):
+    """Every section of the dashboard in one statement, one scalar JSON subquery per column.
+
+    Postgres runs the sub-selects in a single round trip on one connection,
+    each on its (user_id, ...) index.
+    """
+    return select(
+        _latest(BasicProfileORM, user_id).label("profile"),
+        _latest(PhysicalInfoORM, user_id).label("physical_info"),
+        _all(UserGoalORM, user_id, UserGoalORM.start_date, UserGoalORM.is_active.is_(True)).label("goals"),
+        _latest(WaterIntakeLogORM, user_id, WaterIntakeLogORM.date == day).label("water"),
+        _all(ExerciseLogORM, user_id, ExerciseLogORM.created_at, ExerciseLogORM.date == day).label("exercise"),
+        _latest(SleepLogORM, user_id, SleepLogORM.date == day).label("sleep"),
+        _all(AchievementORM, user_id, AchievementORM.created_at).label("achievements"),
+    )
+
+
+@router.get("/dashboard", response_model=DashboardSnapshot)
+async def get_dashboard(
+    day: Optional[date] = Query(None, alias="date", description="Day of the water, exercise and sleep sections (YYYY-MM-DD), default today (UTC)"),
+    db: AsyncSession = Depends(auth_module.get_db),
+    user_id: str = Depends(auth_module.get_current_user_id),
+):
+    """Everything the dashboard screen shows on start, instead of one request per section."""
+    day = day or datetime.utcnow().date()
+    row = (await db.execute(dashboard_query(user_id, day))).mappings().one()
+    return {"date": day, **row}
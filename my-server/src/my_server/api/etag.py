@@ -0,0 +1,55 @@
+from fastapi import Depends, HTTPException, Request, Response
+from typing import Optional
+import hashlib
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..api import auth as auth_module
+
+# Responses must be revalidated, and only by the user they belong to
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    return '"' + hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (RFC 9110 weak comparison: a W/ prefix is ignored)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def conditional_get(orm, updated_column: str = "updated_at"):
+    """Dependency answering 304 Not Modified for GETs over one user's rows of ``orm``.
+
+    The version of the user's rows is their count, latest ``updated_column``
+    and sum of ``updated_column`` epochs: an insert or delete changes the count
+    and any update moves the timestamps. It is read with one aggregate over the
+    (user_id, updated_at, id) index, so a matching If-None-Match costs that
+    query and nothing else. The path and query string are part of the tag,
+    so each page and each single-row URL gets its own.
+    """
+    column = getattr(orm, updated_column)
+
+    async def check(
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(auth_module.get_db),
+        user_id: str = Depends(auth_module.get_current_user_id),
+    ) -> str:
+        count, latest, total = (await db.execute(
+            select(func.count(), func.max(column), func.sum(func.extract("epoch", column))).where(orm.user_id == user_id)
+        )).one()
+        etag = make_etag(user_id, request.url.path, request.url.query, count, latest, total)
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return etag
+
+    return check
@@ -1,74 +1,114 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.security import OAuth2PasswordBearer
-import jwt
-from typing import List
-from ..schema.food_logs import FoodLog
-
-SECRET_KEY = "your-secret-key"
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.security import OAuth2PasswordBearer
-from typing import List
-from ..schema.food_logs import FoodLog
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Dict, List, Optional
+from datetime import date
+from sqlalchemy import and_, delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..schema.food_logs import FoodLog, FoodLogORM, DayNutrition, MealNutrition, NutritionRangeResponse, NutritionTotals
+from ..schema.meals import MealORM
 from ..api import auth as auth_module
+from ..api.crud import CrudHooks, CrudResource, add_crud_routes
+from ..api.sync import record_deletions
+from ..api.stats import resolve_range
+from ..nutrition_lookup import lookup_foods
+from ..rollup import refresh_daily_summary
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+router = APIRouter(tags=["Food Logs"])
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    try:
-        payload = jwt.decode(token, auth_module.SECRET_KEY, algorithms=[auth_module.ALGORITHM])
-        user_id = payload.get("user_id") or payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        return user_id
-    except Exception:
-        raise HTTPException(status_code=401, detail="Invalid token")
+NUTRIENTS = list(NutritionTotals.model_fields)
 
-router = APIRouter(tags=["Food Logs"])
-food_logs_db = {}
 
+def _meal_rows(user_id: str):
+    # outer join: a food log without meals still reports (zero) totals
+    return select(
+        FoodLogORM.id, FoodLogORM.date, MealORM.id.label("meal_id"), MealORM.food_name, MealORM.meal_type,
+    ).select_from(FoodLogORM).outerjoin(
+        MealORM, and_(MealORM.food_log_id == FoodLogORM.id, MealORM.user_id == user_id)
+    ).where(FoodLogORM.user_id == user_id)
 
-@router.get("/food_logs", response_model=List[FoodLog])
-def get_food_logs(db=Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    return [v for v in food_logs_db.values() if getattr(v, 'user_id', None) == user_id]
 
+def _add(totals: NutritionTotals, food) -> None:
+    for name in NUTRIENTS:
+        setattr(totals, name, getattr(totals, name) + (getattr(food, name) or 0.0))
 
-@router.get("/food_logs/{log_id}", response_model=FoodLog)
-def get_food_log(log_id: str, db=Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    log = food_logs_db.get(log_id)
-    if not log or getattr(log, 'user_id', None) != user_id:
-        raise HTTPException(status_code=404, detail="Food log not found")
-    return log
 
+async def _days_nutrition(db: AsyncSession, rows) -> List[DayNutrition]:
+    """Per food log totals for ``_meal_rows`` results, nutrition looked up by food name."""
+    foods = await lookup_foods(db, (row.food_name for row in rows if row.food_name))
+    days: Dict[str, DayNutrition] = {}
+    for row in rows:
+        day = days.get(row.id)
+        if day is None:
+            day = days[row.id] = DayNutrition(date=row.date, food_log_id=row.id, totals=NutritionTotals())
+        if row.meal_id is None:
+            continue
+        food = foods.get(row.food_name) if row.food_name else None
+        meal = MealNutrition(meal_id=row.meal_id, food_name=row.food_name, meal_type=row.meal_type)
+        if food is None:
+            if row.food_name and row.food_name not in day.unmatched_foods:
+                day.unmatched_foods.append(row.food_name)
+        else:
+            meal.nutrition = NutritionTotals()
+            _add(meal.nutrition, food)
+            _add(day.totals, food)
+            _add(day.by_meal_type.setdefault(row.meal_type or "unspecified", NutritionTotals()), food)
+        day.meals.append(meal)
+    return list(days.values())
 
-@router.post("/food_logs", response_model=FoodLog)
-def create_food_log(log: FoodLog, db=Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    if log.id in food_logs_db:
-        raise HTTPException(status_code=400, detail="Food log already exists")
-    try:
-        log.user_id = user_id
-    except Exception:
-        log = FoodLog(**{**(log.model_dump() if hasattr(log, 'model_dump') else log.__dict__), 'user_id': user_id})
-    food_logs_db[log.id] = log
-    return log
 
+@router.get("/food_logs/nutrition", response_model=NutritionRangeResponse)
+async def get_nutrition_for_range(
+    date_from: Optional[date] = Query(None, alias="from", description="First day (YYYY-MM-DD), default 30 days before 'to'"),
+    date_to: Optional[date] = Query(None, alias="to", description="Last day (YYYY-MM-DD), default today"),
+    db: AsyncSession = Depends(auth_module.get_db),
+    user_id: str = Depends(auth_module.get_current_user_id),
+):
+    """Calorie and macro totals per day, and for the whole range, of the logged meals."""
+    date_from, date_to = resolve_range(date_from, date_to)
+    stmt = _meal_rows(user_id).where(FoodLogORM.date.between(date_from, date_to)).order_by(FoodLogORM.date, MealORM.created_at)
+    days = await _days_nutrition(db, (await db.execute(stmt)).all())
+    totals = NutritionTotals()
+    for day in days:
+        _add(totals, day.totals)
+    return NutritionRangeResponse(date_from=date_from, date_to=date_to, totals=totals, days=days)
 
-@router.put("/food_logs/{log_id}", response_model=FoodLog)
-def update_food_log(log_id: str, log: FoodLog, db=Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    existing = food_logs_db.get(log_id)
-    if not existing or getattr(existing, 'user_id', None) != user_id:
-        raise HTTPException(status_code=404, detail="Food log not found")
-    try:
-        log.user_id = user_id
-    except Exception:
-        log = FoodLog(**{**(log.model_dump() if hasattr(log, 'model_dump') else log.__dict__), 'user_id': user_id})
-    food_logs_db[log_id] = log
-    return log
-
-
-@router.delete("/food_logs/{log_id}")
-def delete_food_log(log_id: str, db=Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    existing = food_logs_db.get(log_id)
-    if not existing or getattr(existing, 'user_id', None) != user_id:
+
+@router.get("/food_logs/{log_id}/nutrition", response_model=DayNutrition)
+async def get_food_log_nutrition(log_id: str, db: AsyncSession = Depends(auth_module.get_db), user_id: str = Depends(auth_module.get_current_user_id)):
+    stmt = _meal_rows(user_id).where(FoodLogORM.id == log_id).order_by(MealORM.created_at)
+    days = await _days_nutrition(db, (await db.execute(stmt)).all())
+    if not days:
         raise HTTPException(status_code=404, detail="Food log not found")
-    del food_logs_db[log_id]
-    return {"detail": "Food log deleted"}
+    return days[0]
+
+
+class FoodLogHooks(CrudHooks):
+    async def before_delete(self, db, user_id, record_id):
+        # meals reference the log (FK), so they go with it
+        meal_ids = (await db.execute(
+            delete(MealORM).where(MealORM.food_log_id == record_id, MealORM.user_id == user_id).returning(MealORM.id)
+        )).scalars().all()
+        await record_deletions(db, "meals", user_id, meal_ids)
+
+    async def written(self, db, user_id, old, new):
+        # the log's meals count towards its day: a new log has none yet, a
+        # moved or deleted one changes the count of its old and new day
+        if old is None or (new is not None and old["date"] == new["date"]):
+            return
+        await refresh_daily_summary(db, user_id, [old["date"], new["date"] if new is not None else None])
+
+
+resource = CrudResource(
+    FoodLogORM,
+    FoodLog,
+    "food_logs",
+    "Food log",
+    FoodLogORM.date,
+    updated_column="last_modified",
+    defaults={"meal_count": 0},
+    previous_columns=("date",),
+    day_column="date",
+    # unique (user_id, date): one food log per day
+    conflict_detail="Food log for this date already exists",
+    hooks=FoodLogHooks(),
+)
+add_crud_routes(router, resource)
@@ -1,74 +1,77 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.security import OAuth2PasswordBearer
-import jwt
-from typing import List
-from ..schema.nutrition_database import NutritionDatabase
-
-SECRET_KEY = "your-secret-key"
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.security import OAuth2PasswordBearer
-from typing import List
-from ..schema.nutrition_database import NutritionDatabase
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from typing import List, Literal, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..schema.nutrition_database import NutritionDatabase, NutritionDatabaseORM
 from ..api import auth as auth_module
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
-
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    try:
-        payload = jwt.decode(token, auth_module.SECRET_KEY, algorithms=[auth_module.ALGORITHM])
-        user_id = payload.get("user_id") or payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        return user_id
-    except Exception:
-        raise HTTPException(status_code=401, detail="Invalid token")
+from ..api.crud import CrudHooks, CrudResource, add_crud_routes
+from ..food_search import food_index
+from ..nutrition_lookup import forget_food, nutrition_cache
+from ..nutrition_import import ImportFileError, ImportReport, detect_format, import_foods, text_stream
 
 router = APIRouter(tags=["Nutrition Database"])
-nutrition_db = {}
 
+# The food table is shared reference data: any signed-in user can read it,
+# rows are not scoped by user_id.
 
-@router.get("/nutrition_database", response_model=List[NutritionDatabase])
-def get_nutrition_database(db=Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    return [v for v in nutrition_db.values() if getattr(v, 'user_id', None) == user_id]
 
+@router.get("/nutrition_database/search", response_model=List[NutritionDatabase])
+async def search_nutrition(
+    q: str = Query(..., min_length=1, max_length=100, description="Part of a food name, Thai or English"),
+    limit: int = Query(10, ge=1, le=50),
+    user_id: str = Depends(auth_module.get_current_user_id),
+):
+    """Type-ahead search served from the in-process index, no database round trip."""
+    return food_index.search(q, limit)
 
-@router.get("/nutrition_database/{food_id}", response_model=NutritionDatabase)
-def get_nutrition(food_id: str, db=Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    food = nutrition_db.get(food_id)
-    if not food or getattr(food, 'user_id', None) != user_id:
-        raise HTTPException(status_code=404, detail="Food not found")
-    return food
 
+@router.post("/nutrition_database/import", response_model=ImportReport)
+async def import_nutrition(
+    file: UploadFile = File(..., description="CSV with a header row, or JSON Lines; columns as in NutritionDatabase, id optional"),
+    format: Optional[Literal["csv", "jsonl"]] = Query(None, description="Default: from the file name"),
+    db: AsyncSession = Depends(auth_module.get_db),
+    user_id: str = Depends(auth_module.get_admin_user_id),
+):
+    """Insert or update (by food_name) every food in the file; bad rows are reported, not fatal.
 
-@router.post("/nutrition_database", response_model=NutritionDatabase)
-def create_nutrition(food: NutritionDatabase, db=Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    if food.id in nutrition_db:
-        raise HTTPException(status_code=400, detail="Food already exists")
+    A file that cannot be read at all (not UTF-8, unreadable CSV header) is a 400 and imports nothing.
+    """
     try:
-        food.user_id = user_id
-    except Exception:
-        food = NutritionDatabase(**{**(food.model_dump() if hasattr(food, 'model_dump') else food.__dict__), 'user_id': user_id})
-    nutrition_db[food.id] = food
-    return food
+        report = await import_foods(db, text_stream(file.file), format or detect_format(file.filename))
+    except ImportFileError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if report.accepted:
+        nutrition_cache.clear()
+        await food_index.load(auth_module.engine)
+    return report
 
 
-@router.put("/nutrition_database/{food_id}", response_model=NutritionDatabase)
-def update_nutrition(food_id: str, food: NutritionDatabase, db=Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    existing = nutrition_db.get(food_id)
-    if not existing or getattr(existing, 'user_id', None) != user_id:
-        raise HTTPException(status_code=404, detail="Food not found")
-    try:
-        food.user_id = user_id
-    except Exception:
-        food = NutritionDatabase(**{**(food.model_dump() if hasattr(food, 'model_dump') else food.__dict__), 'user_id': user_id})
-    nutrition_db[food_id] = food
-    return food
+class FoodHooks(CrudHooks):
+    """Apply this worker's writes to the search index and the meal nutrition cache right away."""
+
+    def committed(self, old, new):
+        if new is None:
+            food_index.remove(old["id"])
+        else:
+            food_index.upsert(NutritionDatabase.model_validate(new))
+        # a renamed or new food may have been cached under its name, even as unknown
+        for row in (old, new):
+            if row is not None and row.get("food_name"):
+                forget_food(row["food_name"])
 
 
-@router.delete("/nutrition_database/{food_id}")
-def delete_nutrition(food_id: str, db=Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    existing = nutrition_db.get(food_id)
-    if not existing or getattr(existing, 'user_id', None) != user_id:
-        raise HTTPException(status_code=404, detail="Food not found")
-    del nutrition_db[food_id]
-    return {"detail": "Food deleted"}
+resource = CrudResource(
+    NutritionDatabaseORM,
+    NutritionDatabase,
+    "nutrition_database",
+    "Food",
+    NutritionDatabaseORM.last_updated,
+    user_scoped=False,
+    updated_column="last_updated",
+    previous_columns=("food_name",),
+    # food_name is unique
+    conflict_detail="Food already exists",
+    # shared by every user: reads are open, changes are for admins
+    write_dependencies=[Depends(auth_module.get_admin_user_id)],
+    hooks=FoodHooks(),
+)
+add_crud_routes(router, resource)
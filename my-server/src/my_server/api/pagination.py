@@ -0,0 +1,85 @@
+from fastapi import HTTPException, Query, Response
+from typing import Any, List, Optional, Sequence
+from datetime import date, datetime, timedelta
+import base64
+import json
+from pydantic import BaseModel
+from sqlalchemy import Date, func, literal, tuple_
+from ..settings import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Rows without a sort value page as if they were this old
+EPOCH = datetime(1970, 1, 1)
+
+
+class PageParams(BaseModel):
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None  # inclusive
+    cursor: Optional[str] = None
+    limit: int
+
+
+def page_params(
+    date_from: Optional[date] = Query(None, alias="from", description="First day to include (YYYY-MM-DD)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Last day to include (YYYY-MM-DD)"),
+    cursor: Optional[str] = Query(None, description=f"Value of the previous page's {NEXT_CURSOR_HEADER} header"),
+    limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+) -> PageParams:
+    return PageParams(date_from=date_from, date_to=date_to, cursor=cursor, limit=limit)
+
+
+def _encode_cursor(sort_value, record_id: str) -> str:
+    raw = json.dumps([sort_value.isoformat(), record_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, python_type) -> tuple:
+    try:
+        sort_value, record_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        value = datetime.fromisoformat(sort_value)
+        return (value.date() if python_type is date else value), record_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _start_of(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time())
+
+
+def paginate(stmt, sort_col, id_col, params: PageParams):
+    """Apply from/to and keyset pagination on (sort_col, id_col) to a select.
+
+    With the (user_id, sort_col, id) indexes this is one index range scan. One
+    row past ``limit`` is fetched so ``finish_page`` can tell if a next page exists.
+    """
+    is_date = isinstance(sort_col.type, Date)
+    # NOT NULL columns keep the bare column so the index serves the ORDER BY
+    sort_expr = sort_col if not sort_col.nullable else func.coalesce(sort_col, literal(EPOCH.date() if is_date else EPOCH, sort_col.type))
+    if params.date_from is not None:
+        stmt = stmt.where(sort_col >= (params.date_from if is_date else _start_of(params.date_from)))
+    if params.date_to is not None:
+        if is_date:
+            stmt = stmt.where(sort_col <= params.date_to)
+        else:
+            stmt = stmt.where(sort_col < _start_of(params.date_to + timedelta(days=1)))
+    if params.cursor:
+        stmt = stmt.where(tuple_(sort_expr, id_col) > _decode_cursor(params.cursor, date if is_date else datetime))
+    return stmt.order_by(sort_expr, id_col).limit(params.limit + 1)
+
+
+def finish_page(response: Response, rows: Sequence[Any], sort_attr: str, params: PageParams) -> List[Any]:
+    """Trim the look-ahead row and expose the next cursor as a response header."""
+    rows = list(rows)
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        last = rows[-1]
+        sort_value = _get(last, sort_attr)
+        if sort_value is None:
+            sort_value = EPOCH
+        response.headers[NEXT_CURSOR_HEADER] = _encode_cursor(sort_value, _get(last, "id"))
+    return rows
+
+
+def _get(row, attr):
+    return row[attr] if isinstance(row, dict) else getattr(row, attr)
@@ -0,0 +1,77 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional
+from datetime import date, datetime, timedelta
+from sqlalchemy import DateTime, Date, and_, cast, func, literal, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..schema.stats import DailyStats, DailyStatsResponse, UserDailySummaryORM
+from ..api import auth as auth_module
+from ..settings import settings
+
+router = APIRouter(tags=["Stats"])
+
+ONE_DAY = literal_column("interval '1 day'")
+
+
+def day_series(date_from: date, date_to: date):
+    """Subquery with one ``day`` row for every date from date_from to date_to."""
+    return select(
+        cast(func.generate_series(
+            literal(datetime.combine(date_from, datetime.min.time()), DateTime),
+            literal(datetime.combine(date_to, datetime.min.time()), DateTime),
+            ONE_DAY,
+        ), Date).label("day")
+    ).subquery("days")
+
+
+def daily_stats_query(user_id: str, date_from: date, date_to: date):
+    """One row per day in [date_from, date_to] read from the user_daily_summary rollup.
+
+    The summary rows come from one primary key range scan; days with no row
+    (nothing logged) are filled in as zeros by the generate_series join.
+    """
+    days = day_series(date_from, date_to)
+    summary = UserDailySummaryORM
+    return select(
+        days.c.day,
+        func.coalesce(summary.water_count, 0).label("water_count"),
+        func.coalesce(summary.exercise_minutes, 0).label("exercise_minutes"),
+        func.coalesce(summary.exercise_calories, 0).label("exercise_calories"),
+        func.coalesce(summary.sleep_hours, 0).label("sleep_hours"),
+        func.coalesce(summary.meal_count, 0).label("meal_count"),
+    ).select_from(days).outerjoin(
+        summary, and_(summary.user_id == user_id, summary.date == days.c.day)
+    ).order_by(days.c.day)
+
+
+def resolve_range(date_from: Optional[date], date_to: Optional[date]):
+    # server timestamps are UTC (datetime.utcnow()), so is the default day
+    date_to = date_to or datetime.utcnow().date()
+    date_from = date_from or date_to - timedelta(days=settings.stats_default_days - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if (date_to - date_from).days + 1 > settings.stats_max_days:
+        raise HTTPException(status_code=400, detail=f"At most {settings.stats_max_days} days per request")
+    return date_from, date_to
+
+
+@router.get("/stats/daily", response_model=DailyStatsResponse)
+async def get_daily_stats(
+    date_from: Optional[date] = Query(None, alias="from", description="First day (YYYY-MM-DD), default 30 days before 'to'"),
+    date_to: Optional[date] = Query(None, alias="to", description="Last day (YYYY-MM-DD), default today (UTC)"),
+    db: AsyncSession = Depends(auth_module.get_db),
+    user_id: str = Depends(auth_module.get_current_user_id),
+):
+    date_from, date_to = resolve_range(date_from, date_to)
+    result = await db.execute(daily_stats_query(user_id, date_from, date_to))
+    days = [
+        DailyStats(
+            date=row.day,
+            water_count=row.water_count,
+            exercise_minutes=row.exercise_minutes,
+            exercise_calories=row.exercise_calories,
+            sleep_hours=round(row.sleep_hours, 2),
+            meal_count=row.meal_count,
+        )
+        for row in result
+    ]
+    return DailyStatsResponse(date_from=date_from, date_to=date_to, days=days)
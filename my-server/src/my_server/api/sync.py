@@ -0,0 +1,433 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from datetime import date, datetime, timedelta
+import base64
+import json
+from pydantic import ValidationError
+from sqlalchemy import delete, exists, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..schema.sync import (
+    SyncBatchRequest, SyncBatchResponse, SyncItemResult,
+    SyncChangesResponse, SyncResourceChanges, SyncTombstoneORM,
+)
+from ..schema.water_intake_logs import WaterIntakeLog, WaterIntakeLogORM
+from ..schema.basic_profile import BasicProfile, BasicProfileORM
+from ..schema.physical_info import PhysicalInfo, PhysicalInfoORM
+from ..schema.about_yourself import AboutYourself, AboutYourselfORM
+from ..schema.food_logs import FoodLog, FoodLogORM
+from ..schema.meals import Meal, MealORM
+from ..schema.exercise_logs import ExerciseLog, ExerciseLogORM
+from ..schema.sleep_logs import SleepLog, SleepLogORM
+from ..schema.user_goals import UserGoal, UserGoalORM
+from ..schema.achievements import Achievement, AchievementORM
+from ..schema.notification_settings import NotificationSettings, NotificationSettingsORM
+from ..api import auth as auth_module
+from ..achievement_engine import drop_client_progress, initialize_achievements
+from ..enums import enum_registry
+from ..goals import recompute_goals
+from ..reminders import schedule
+from ..rollup import days_of, lock_user, refresh_daily_summary
+from ..settings import settings
+
+router = APIRouter(tags=["Sync"])
+
+# Rows per multi-VALUES statement, keeps well under asyncpg's 32767 bind parameters
+CHUNK_SIZE = 500
+
+
+class SyncResource:
+    """How /sync/batch turns a client record into a row of one table.
+
+    Fields the record leaves out are left out of the row too: an insert
+    gets the column default, an update keeps the stored value, as on the
+    CRUD routes.
+    """
+
+    def __init__(
+        self,
+        orm,
+        schema,
+        enum_fields: Optional[Dict[str, str]] = None,
+        updated_column: str = "updated_at",
+        day_column: Optional[str] = None,
+        parents: Optional[Dict[str, object]] = None,
+        prepare: Optional[Callable[[dict], None]] = None,
+    ):
+        self.table = orm.__table__
+        self.schema = schema
+        self.enum_fields = enum_fields or {}
+        # column -> ORM of the parent table whose row, of the same user, it must name
+        self.parents = parents or {}
+        self.updated_column = updated_column
+        # one row per user per day (unique (user_id, day_column)), see _write_chunk
+        self.day_column = day_column
+        # drops or adjusts fields of a client row before it is written
+        self.prepare = prepare
+        self.columns = [c.name for c in self.table.columns]
+        # an upsert that lands on an existing row never rewrites these
+        self.update_columns = [name for name in self.columns if name not in ("id", "user_id", "created_at")]
+
+    def to_row(self, data: dict, user_id: str, now: datetime) -> dict:
+        item = self.schema.model_validate(data)
+        for field, enum_name in self.enum_fields.items():
+            enum_registry.validate(enum_name, getattr(item, field), field)
+        row = {name: getattr(item, name) for name in self.columns if name in item.model_fields_set}
+        if self.prepare is not None:
+            self.prepare(row)
+        row["user_id"] = user_id
+        row[self.updated_column] = now
+        if "created_at" in self.columns and row.get("created_at") is None:
+            row["created_at"] = now
+        return row
+
+
+# Parents before children: upserts run in this order, deletes in reverse
+SYNC_RESOURCES: Dict[str, SyncResource] = {
+    "water_intake_logs": SyncResource(WaterIntakeLogORM, WaterIntakeLog, day_column="date"),
+    "basic_profile": SyncResource(BasicProfileORM, BasicProfile, {"gender": "gender"}),
+    "physical_info": SyncResource(PhysicalInfoORM, PhysicalInfo),
+    "about_yourself": SyncResource(AboutYourselfORM, AboutYourself),
+    "food_logs": SyncResource(FoodLogORM, FoodLog, updated_column="last_modified"),
+    "meals": SyncResource(MealORM, Meal, {"meal_type": "meal_type"}, parents={"food_log_id": FoodLogORM}),
+    "exercise_logs": SyncResource(ExerciseLogORM, ExerciseLog, {"activity_type": "activity_type"}),
+    "sleep_logs": SyncResource(SleepLogORM, SleepLog, {"sleep_quality": "sleep_quality"}, day_column="date"),
+    "user_goals": SyncResource(UserGoalORM, UserGoal),
+    "achievements": SyncResource(AchievementORM, Achievement, prepare=drop_client_progress),
+    "notification_settings": SyncResource(NotificationSettingsORM, NotificationSettings),
+}
+
+
+async def record_deletions(db: AsyncSession, resource: str, user_id: str, ids: Iterable[str]) -> None:
+    """Leave tombstones for deleted rows so /sync/changes can report them."""
+    now = datetime.utcnow()
+    rows = [{"resource": resource, "id": record_id, "user_id": user_id, "deleted_at": now} for record_id in ids]
+    if not rows:
+        return
+    table = SyncTombstoneORM.__table__
+    stmt = insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.resource, table.c.id],
+        set_={"user_id": stmt.excluded.user_id, "deleted_at": stmt.excluded.deleted_at},
+    )
+    await db.execute(stmt)
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _by_shape(rows: List[dict]) -> Iterable[List[dict]]:
+    """``rows`` grouped by the columns they carry, a multi-row VALUES needs the same ones in each row."""
+    groups: Dict[Tuple[str, ...], List[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    return groups.values()
+
+
+async def _isolated(db: AsyncSession, chunk: list, write) -> Tuple[Dict[int, str], Dict[int, Tuple[int, str]]]:
+    """Run ``write(chunk)`` in a savepoint; if the database refuses it, run the operations one by one.
+
+    Returns what ``write`` returned for the operations that were applied,
+    and (status, detail) by index for the ones the database refused (a
+    unique or foreign key violation is a 409), so one bad record does not
+    cost the rest of the batch.
+    """
+    try:
+        async with db.begin_nested():
+            return await write(chunk), {}
+    except DBAPIError:
+        pass
+    done: Dict[int, str] = {}
+    refused: Dict[int, Tuple[int, str]] = {}
+    for item in chunk:
+        try:
+            async with db.begin_nested():
+                done.update(await write([item]))
+        except DBAPIError as e:
+            refused[item[0]] = (409 if isinstance(e, IntegrityError) else 400, str(e.orig))
+    return done, refused
+
+
+async def _foreign_parents(db: AsyncSession, resource: SyncResource, user_id: str, chunk: List[Tuple[int, dict]]) -> Dict[int, str]:
+    """Operations of ``chunk`` naming a parent row the user does not own (the FK alone allows anyone's), by index."""
+    rejected = {}
+    for column, parent in resource.parents.items():
+        ids = list({row.get(column) for _, row in chunk} - {None})
+        stmt = select(parent.id).where(parent.user_id == user_id, parent.id.in_(ids))
+        owned = set((await db.execute(stmt)).scalars()) if ids else set()
+        for i, row in chunk:
+            if row.get(column) is not None and row[column] not in owned:
+                rejected[i] = f"{column} not found"
+    return rejected
+
+
+async def _upsert_by_id(db: AsyncSession, resource: SyncResource, rows: List[dict]) -> Set[str]:
+    """INSERT ... ON CONFLICT (id) DO UPDATE; returns the ids written."""
+    table = resource.table
+    written = set()
+    for shaped in _by_shape(rows):
+        stmt = insert(table).values(shaped)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={col: stmt.excluded[col] for col in resource.update_columns if col in shaped[0]},
+            # ids are client generated; never take over another user's row
+            where=table.c.user_id == stmt.excluded.user_id,
+        ).returning(table.c.id)
+        written |= set((await db.execute(stmt)).scalars())
+    return written
+
+
+async def _upsert_by_day(db: AsyncSession, resource: SyncResource, rows: List[dict]) -> Dict[date, str]:
+    """INSERT ... ON CONFLICT (user_id, day) DO UPDATE; returns the id stored for each day."""
+    table = resource.table
+    day = table.c[resource.day_column]
+    stored = {}
+    for shaped in _by_shape(rows):
+        stmt = insert(table).values(shaped)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, day],
+            set_={col: stmt.excluded[col] for col in resource.update_columns if col in shaped[0]},
+        ).returning(table.c.id, day)
+        stored.update((stored_day, stored_id) for stored_id, stored_day in await db.execute(stmt))
+    return stored
+
+
+async def _write_chunk(db: AsyncSession, resource: SyncResource, chunk: List[Tuple[int, dict]]) -> Dict[int, str]:
+    """Upsert the rows of ``chunk``; returns, by operation index, the id of the row each one was written to.
+
+    Devices generate their own ids, so for a day keyed table a second device
+    sends a new id for a day the server already has. Rows whose id is known
+    are updated by id (which may move them to another day); rows with a new
+    id are written onto their day's row if there is one, keeping its id.
+    """
+    if resource.day_column is None:
+        applied = await _upsert_by_id(db, resource, [row for _, row in chunk])
+        return {i: row["id"] for i, row in chunk if row["id"] in applied}
+    table = resource.table
+    known = set((await db.execute(select(table.c.id).where(table.c.id.in_([row["id"] for _, row in chunk])))).scalars())
+    written = {}
+    by_id = [(i, row) for i, row in chunk if row["id"] in known]
+    if by_id:
+        applied = await _upsert_by_id(db, resource, [row for _, row in by_id])
+        written.update((i, row["id"]) for i, row in by_id if row["id"] in applied)
+    new = [(i, row) for i, row in chunk if row["id"] not in known]
+    if new:
+        # ON CONFLICT cannot touch the same row twice in one statement: last one for a day wins
+        last = {row[resource.day_column]: row for _, row in new}
+        stored = await _upsert_by_day(db, resource, list(last.values()))
+        written.update((i, stored[row[resource.day_column]]) for i, row in new)
+    return written
+
+
+async def _delete_chunk(db: AsyncSession, name: str, resource: SyncResource, user_id: str, chunk: List[Tuple[int, str]]) -> Dict[int, str]:
+    """Delete the caller's rows of ``chunk`` and leave tombstones; returns the ids deleted by index."""
+    table = resource.table
+    stmt = delete(table).where(table.c.user_id == user_id, table.c.id.in_([record_id for _, record_id in chunk])).returning(table.c.id)
+    deleted = set((await db.execute(stmt)).scalars())
+    await record_deletions(db, name, user_id, deleted)
+    return {i: record_id for i, record_id in chunk if record_id in deleted}
+
+
+@router.post("/sync/batch", response_model=SyncBatchResponse)
+async def sync_batch(batch: SyncBatchRequest, db: AsyncSession = Depends(auth_module.get_db), user_id: str = Depends(auth_module.get_current_user_id)):
+    operations = batch.operations
+    if len(operations) > settings.sync_batch_max_operations:
+        raise HTTPException(status_code=413, detail=f"At most {settings.sync_batch_max_operations} operations per batch")
+    now = datetime.utcnow()
+    results: List[Optional[SyncItemResult]] = [None] * len(operations)
+
+    # Within one transaction the last operation on an id decides the
+    # outcome; earlier ones report its result.
+    final: Dict[Tuple[str, str], Tuple[int, Optional[dict]]] = {}
+    superseded: Dict[int, int] = {}
+    for index, operation in enumerate(operations):
+        resource = SYNC_RESOURCES.get(operation.resource)
+        if resource is None:
+            results[index] = SyncItemResult(index=index, resource=operation.resource, id=operation.id, status=404, detail="Unknown resource")
+            continue
+        try:
+            if operation.op == "delete":
+                if not operation.id:
+                    raise HTTPException(status_code=422, detail="delete requires id")
+                record_id, row = operation.id, None
+            else:
+                row = resource.to_row(operation.data or {}, user_id, now)
+                record_id = row["id"]
+        except ValidationError as e:
+            results[index] = SyncItemResult(index=index, resource=operation.resource, id=operation.id, status=422, detail=str(e))
+            continue
+        except HTTPException as e:
+            results[index] = SyncItemResult(index=index, resource=operation.resource, id=operation.id, status=e.status_code, detail=e.detail)
+            continue
+        previous = final.get((operation.resource, record_id))
+        if previous is not None:
+            superseded[previous[0]] = index
+        final[(operation.resource, record_id)] = (index, row)
+
+    # user_daily_summary days to recompute: where the rows were before and after
+    touched_days: Set[date] = set()
+    try:
+        for name, resource in SYNC_RESOURCES.items():
+            upserts = [(i, row) for (res, _), (i, row) in final.items() if res == name and row is not None]
+            for chunk in _chunks(upserts):
+                # parents were written before their children, so this sees the batch's own food logs
+                foreign = await _foreign_parents(db, resource, user_id, chunk)
+                for i, row in chunk:
+                    if i in foreign:
+                        results[i] = SyncItemResult(index=i, resource=name, id=row["id"], status=400, detail=foreign[i])
+                chunk = [(i, row) for i, row in chunk if i not in foreign]
+                if not chunk:
+                    continue
+                touched_days |= await days_of(db, name, user_id, [row["id"] for _, row in chunk])
+                written, refused = await _isolated(db, chunk, lambda items: _write_chunk(db, resource, items))
+                touched_days |= await days_of(db, name, user_id, set(written.values()))
+                for i, row in chunk:
+                    stored = written.get(i)
+                    if i in refused:
+                        results[i] = SyncItemResult(index=i, resource=name, id=row["id"], status=refused[i][0], detail=refused[i][1])
+                    elif stored is None:
+                        results[i] = SyncItemResult(index=i, resource=name, id=row["id"], status=409, detail="Id already in use")
+                    elif stored != row["id"]:
+                        # the client keeps the server's row for that day under its id
+                        results[i] = SyncItemResult(index=i, resource=name, id=stored, status=200, detail="Merged into the existing record of the day")
+                    else:
+                        results[i] = SyncItemResult(index=i, resource=name, id=stored, status=200)
+
+        for name, resource in reversed(SYNC_RESOURCES.items()):
+            deletes = [(i, record_id) for (res, record_id), (i, row) in final.items() if res == name and row is None]
+            for chunk in _chunks(deletes):
+                touched_days |= await days_of(db, name, user_id, [record_id for _, record_id in chunk])
+                # e.g. a food log whose meals are not deleted with it fails on their foreign key
+                deleted, refused = await _isolated(db, chunk, lambda items: _delete_chunk(db, name, resource, user_id, items))
+                for i, record_id in chunk:
+                    if i in refused:
+                        results[i] = SyncItemResult(index=i, resource=name, id=record_id, status=refused[i][0], detail=refused[i][1])
+                    elif i in deleted:
+                        results[i] = SyncItemResult(index=i, resource=name, id=record_id, status=200)
+                    else:
+                        results[i] = SyncItemResult(index=i, resource=name, id=record_id, status=404, detail="Not found")
+        await refresh_daily_summary(db, user_id, touched_days)
+        goal_ids = [row["id"] for (res, _), (i, row) in final.items() if res == "user_goals" and row is not None and results[i].status == 200]
+        if goal_ids:
+            # goal_current of tracked goals is the server's, not the client's
+            await lock_user(db, user_id)
+            await recompute_goals(db, user_id, goal_ids)
+        achievement_ids = [row["id"] for (res, _), (i, row) in final.items() if res == "achievements" and row is not None and results[i].status == 200]
+        if achievement_ids:
+            await initialize_achievements(db, user_id, achievement_ids)
+        if any(res == "notification_settings" for res, _ in final):
+            await schedule(db, user_id)
+        await db.commit()
+    except DBAPIError:
+        # the records themselves were isolated above; this is the rollup, goals or reminders failing
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Batch rejected by the database, nothing was applied")
+
+    for index, winner in superseded.items():
+        # follow chains of repeated ids to the operation that was applied
+        while winner in superseded:
+            winner = superseded[winner]
+        applied = results[winner]
+        results[index] = SyncItemResult(index=index, resource=applied.resource, id=applied.id, status=applied.status, detail=applied.detail)
+    return SyncBatchResponse(results=results)
+
+
+def _encode_cursor(positions: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(positions, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> dict:
+    try:
+        positions = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return {
+            name: {kind: (datetime.fromisoformat(ts), record_id) for kind, (ts, record_id) in position.items()}
+            for name, position in positions.items()
+        }
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _advance(rows, ts_key: str, settled_before: datetime, position):
+    """Keyset position after ``rows``.
+
+    Timestamps are taken before commit, so a row stamped just now may become
+    visible after a later one. The cursor only moves past rows older than the
+    settle window, on every page; newer ones are sent again next time (upserts
+    are idempotent). A full page inside the window leaves the cursor in place.
+    """
+    for row in rows:
+        if row[ts_key] is None or row[ts_key] >= settled_before:
+            break
+        position = (row[ts_key], row["id"])
+    return position
+
+
+@router.get("/sync/changes", response_model=SyncChangesResponse)
+async def sync_changes(
+    since: Optional[str] = None,
+    resources: Optional[str] = Query(None, description="Comma separated resource names, default all"),
+    limit: int = Query(500, ge=1, le=5000, description="Max upserted and max deleted records per resource"),
+    db: AsyncSession = Depends(auth_module.get_db),
+    user_id: str = Depends(auth_module.get_current_user_id),
+):
+    """Records created, updated or deleted after ``since``.
+
+    Clients apply ``deleted`` before ``upserted`` for each resource and keep
+    calling with the returned cursor while ``has_more`` is true.
+    """
+    names = resources.split(",") if resources else list(SYNC_RESOURCES)
+    unknown = [name for name in names if name not in SYNC_RESOURCES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown resources: {unknown}")
+    positions = _decode_cursor(since) if since else {}
+    settled_before = datetime.utcnow() - timedelta(seconds=settings.sync_cursor_lag_seconds)
+    tombstones = SyncTombstoneORM.__table__
+    changes: Dict[str, SyncResourceChanges] = {}
+    any_more = False
+
+    for name in names:
+        resource = SYNC_RESOURCES[name]
+        table = resource.table
+        position = dict(positions.get(name, {}))
+
+        updated = table.c[resource.updated_column]
+        stmt = select(table).where(table.c.user_id == user_id)
+        if "u" in position:
+            stmt = stmt.where(tuple_(updated, table.c.id) > tuple(position["u"]))
+        stmt = stmt.order_by(updated, table.c.id).limit(limit + 1)
+        rows = (await db.execute(stmt)).mappings().all()
+        rows_more = len(rows) > limit
+        rows = rows[:limit]
+
+        # a tombstone whose id is live again is stale, the row itself is the truth
+        stmt = select(tombstones.c.id, tombstones.c.deleted_at).where(
+            tombstones.c.user_id == user_id,
+            tombstones.c.resource == name,
+            ~exists().where(table.c.id == tombstones.c.id),
+        )
+        if "d" in position:
+            stmt = stmt.where(tuple_(tombstones.c.deleted_at, tombstones.c.id) > tuple(position["d"]))
+        stmt = stmt.order_by(tombstones.c.deleted_at, tombstones.c.id).limit(limit + 1)
+        deleted = (await db.execute(stmt)).mappings().all()
+        deleted_more = len(deleted) > limit
+        deleted = deleted[:limit]
+
+        changes[name] = SyncResourceChanges(
+            upserted=[resource.schema.model_validate(dict(row)).model_dump(mode="json") for row in rows],
+            deleted=[row["id"] for row in deleted],
+        )
+        for kind, ts_key, batch in (("u", resource.updated_column, rows), ("d", "deleted_at", deleted)):
+            advanced = _advance(batch, ts_key, settled_before, position.get(kind))
+            if advanced is not None:
+                position[kind] = advanced
+        positions[name] = position
+        any_more = any_more or rows_more or deleted_more
+
+    cursor = _encode_cursor({
+        name: {kind: [ts.isoformat(), record_id] for kind, (ts, record_id) in position.items()}
+        for name, position in positions.items()
+    })
+    return SyncChangesResponse(changes=changes, cursor=cursor, has_more=any_more)
@@ -1,74 +1,48 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.security import OAuth2PasswordBearer
-import jwt
+from fastapi import APIRouter, Depends, Response
 from typing import List
-from ..schema.user_goals import UserGoal
-
-SECRET_KEY = "your-secret-key"
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.security import OAuth2PasswordBearer
-from typing import List
-from ..schema.user_goals import UserGoal
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..schema.user_goals import ActiveGoal, UserGoal, UserGoalORM
 from ..api import auth as auth_module
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
-
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    try:
-        payload = jwt.decode(token, auth_module.SECRET_KEY, algorithms=[auth_module.ALGORITHM])
-        user_id = payload.get("user_id") or payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        return user_id
-    except Exception:
-        raise HTTPException(status_code=401, detail="Invalid token")
+from ..api.crud import CrudHooks, CrudResource, add_crud_routes
+from ..api.etag import conditional_get
+from ..goals import recompute_goals
+from ..responses import model_list_response, select_rows
+from ..rollup import lock_user
 
 router = APIRouter(tags=["User Goals"])
-user_goals_db = {}
-
-
-@router.get("/user_goals", response_model=List[UserGoal])
-def get_user_goals(db=Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    return [v for v in user_goals_db.values() if getattr(v, 'user_id', None) == user_id]
-
-
-@router.get("/user_goals/{goal_id}", response_model=UserGoal)
-def get_user_goal(goal_id: str, db=Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    goal = user_goals_db.get(goal_id)
-    if not goal or getattr(goal, 'user_id', None) != user_id:
-        raise HTTPException(status_code=404, detail="Goal not found")
-    return goal
-
-
-@router.post("/user_goals", response_model=UserGoal)
-def create_user_goal(goal: UserGoal, db=Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    if goal.id in user_goals_db:
-        raise HTTPException(status_code=400, detail="Goal already exists")
-    try:
-        goal.user_id = user_id
-    except Exception:
-        goal = UserGoal(**{**(goal.model_dump() if hasattr(goal, 'model_dump') else goal.__dict__), 'user_id': user_id})
-    user_goals_db[goal.id] = goal
-    return goal
-
-
-@router.put("/user_goals/{goal_id}", response_model=UserGoal)
-def update_user_goal(goal_id: str, goal: UserGoal, db=Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    existing = user_goals_db.get(goal_id)
-    if not existing or getattr(existing, 'user_id', None) != user_id:
-        raise HTTPException(status_code=404, detail="Goal not found")
-    try:
-        goal.user_id = user_id
-    except Exception:
-        goal = UserGoal(**{**(goal.model_dump() if hasattr(goal, 'model_dump') else goal.__dict__), 'user_id': user_id})
-    user_goals_db[goal_id] = goal
-    return goal
 
 
-@router.delete("/user_goals/{goal_id}")
-def delete_user_goal(goal_id: str, db=Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    existing = user_goals_db.get(goal_id)
-    if not existing or getattr(existing, 'user_id', None) != user_id:
-        raise HTTPException(status_code=404, detail="Goal not found")
-    del user_goals_db[goal_id]
-    return {"detail": "Goal deleted"}
+@router.get("/user_goals/active", response_model=List[ActiveGoal], dependencies=[Depends(conditional_get(UserGoalORM))])
+async def list_active_goals(response: Response, db: AsyncSession = Depends(auth_module.get_db), user_id: str = Depends(auth_module.get_current_user_id)):
+    """The caller's active goals with their current progress, read over the (user_id, is_active) index."""
+    progress = (UserGoalORM.goal_current / func.nullif(UserGoalORM.goal_value, 0)).label("progress")
+    stmt = select_rows(UserGoalORM).add_columns(progress).where(
+        UserGoalORM.user_id == user_id, UserGoalORM.is_active.is_(True)
+    ).order_by(UserGoalORM.start_date, UserGoalORM.id)
+    return model_list_response(response, ActiveGoal, (await db.execute(stmt)).all())
+
+
+class GoalHooks(CrudHooks):
+    """Tracked goals get goal_current from the logs, whatever the client sent."""
+
+    async def written(self, db, user_id, old, new):
+        if new is None:
+            return
+        await lock_user(db, user_id)
+        current = await recompute_goals(db, user_id, [new["id"]])
+        if new["id"] in current:
+            new["goal_current"] = current[new["id"]]
+
+
+resource = CrudResource(
+    UserGoalORM,
+    UserGoal,
+    "user_goals",
+    "Goal",
+    UserGoalORM.start_date,
+    defaults={"is_active": True},
+    conditional=True,
+    hooks=GoalHooks(),
+)
+add_crud_routes(router, resource)
@@ -1,125 +1,58 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.security import OAuth2PasswordBearer
-import jwt
-from typing import List
-from datetime import datetime
-from sqlalchemy.orm import Session
-from ..schema.water_intake_logs import WaterIntakeLog, WaterIntakeLogORM
+from datetime import date, datetime
+from uuid import uuid4
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..schema.water_intake_logs import WaterIncrement, WaterIntakeLog, WaterIntakeLogORM
 from ..api import auth as auth_module
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
-
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    try:
-        payload = jwt.decode(token, auth_module.SECRET_KEY, algorithms=[auth_module.ALGORITHM])
-        user_id = payload.get("user_id") or payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        return user_id
-    except Exception:
-        raise HTTPException(status_code=401, detail="Invalid token")
+from ..api.crud import CrudResource, DailySummaryHooks, add_crud_routes
+from ..rollup import refresh_daily_summary
 
 router = APIRouter(tags=["Water Intake Logs"])
 
 
-@router.get("/water_intake_logs", response_model=List[WaterIntakeLog])
-def get_water_intake_logs(db: Session = Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    logs = db.query(WaterIntakeLogORM).filter(WaterIntakeLogORM.user_id == user_id).all()
-    return [WaterIntakeLog(
-        id=log.id,
-        user_id=log.user_id,
-        date=log.date,
-        count=log.count,
-        updated_at=log.updated_at
-    ) for log in logs]
-
+@router.post("/water_intake_logs/by_date/{day}/increment", response_model=WaterIntakeLog)
+async def increment_water_intake(day: date, body: WaterIncrement, db: AsyncSession = Depends(auth_module.get_db), user_id: str = Depends(auth_module.get_current_user_id)):
+    """Add ``amount`` glasses to the day's count, creating the log on first use.
 
-@router.get("/water_intake_logs/{log_id}", response_model=WaterIntakeLog)
-def get_water_intake_log(log_id: str, db: Session = Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    log = db.query(WaterIntakeLogORM).filter(
-        WaterIntakeLogORM.id == log_id,
-        WaterIntakeLogORM.user_id == user_id
-    ).first()
-    if not log:
-        raise HTTPException(status_code=404, detail="Water intake log not found")
-    return WaterIntakeLog(
-        id=log.id,
-        user_id=log.user_id,
-        date=log.date,
-        count=log.count,
-        updated_at=log.updated_at
+    The count is updated in the row by the upsert itself, so concurrent
+    increments from several devices all land; it never goes below zero.
+    """
+    table = WaterIntakeLogORM.__table__
+    now = datetime.utcnow()
+    stmt = insert(table).values(
+        id=body.id or str(uuid4()), user_id=user_id, date=day, count=max(body.amount, 0), updated_at=now,
     )
-
-
-@router.post("/water_intake_logs", response_model=WaterIntakeLog)
-def create_water_intake_log(log: WaterIntakeLog, db: Session = Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    # Check if record already exists
-    existing = db.query(WaterIntakeLogORM).filter(WaterIntakeLogORM.id == log.id).first()
-    if existing:
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.date],
+        set_={
+            "count": func.greatest(func.coalesce(table.c.count, 0) + body.amount, 0),
+            "updated_at": stmt.excluded.updated_at,
+        },
+    ).returning(*table.columns)
+    try:
+        row = (await db.execute(stmt)).mappings().one()
+    except IntegrityError:
+        # the id is taken by another row
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Water intake log already exists")
-    
-    # Create new database record
-    db_record = WaterIntakeLogORM(
-        id=log.id,
-        user_id=user_id,
-        date=log.date,
-        count=log.count,
-        updated_at=datetime.now()
-    )
-    
-    db.add(db_record)
-    db.commit()
-    db.refresh(db_record)
-    
-    return WaterIntakeLog(
-        id=db_record.id,
-        user_id=db_record.user_id,
-        date=db_record.date,
-        count=db_record.count,
-        updated_at=db_record.updated_at
-    )
-
-
-@router.put("/water_intake_logs/{log_id}", response_model=WaterIntakeLog)
-def update_water_intake_log(log_id: str, log: WaterIntakeLog, db: Session = Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    # Find existing record
-    db_record = db.query(WaterIntakeLogORM).filter(
-        WaterIntakeLogORM.id == log_id,
-        WaterIntakeLogORM.user_id == user_id
-    ).first()
-    
-    if not db_record:
-        raise HTTPException(status_code=404, detail="Water intake log not found")
-    
-    # Update fields
-    db_record.date = log.date
-    db_record.count = log.count
-    db_record.updated_at = datetime.now()
-    
-    db.commit()
-    db.refresh(db_record)
-    
-    return WaterIntakeLog(
-        id=db_record.id,
-        user_id=db_record.user_id,
-        date=db_record.date,
-        count=db_record.count,
-        updated_at=db_record.updated_at
-    )
-
-
-@router.delete("/water_intake_logs/{log_id}")
-def delete_water_intake_log(log_id: str, db: Session = Depends(auth_module.get_db), user_id: str = Depends(get_current_user)):
-    # Find existing record
-    db_record = db.query(WaterIntakeLogORM).filter(
-        WaterIntakeLogORM.id == log_id,
-        WaterIntakeLogORM.user_id == user_id
-    ).first()
-    
-    if not db_record:
-        raise HTTPException(status_code=404, detail="Water intake log not found")
-    
-    db.delete(db_record)
-    db.commit()
-    
-    return {"detail": "Water intake log deleted"}
+    await refresh_daily_summary(db, user_id, [day])
+    await db.commit()
+    return dict(row)
+
+
+resource = CrudResource(
+    WaterIntakeLogORM,
+    WaterIntakeLog,
+    "water_intake_logs",
+    "Water intake log",
+    WaterIntakeLogORM.date,
+    previous_columns=("date",),
+    day_column="date",
+    # unique (user_id, date): one log per day, PUT /by_date/{day} replaces it
+    conflict_detail="Water intake log for this date already exists",
+    hooks=DailySummaryHooks(),
+)
+add_crud_routes(router, resource)
@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+from .metrics import REGISTRY
+
+CACHE_HITS = REGISTRY.counter("cache_hits_total", "Cache lookups served from memory", ["cache"])
+CACHE_MISSES = REGISTRY.counter("cache_misses_total", "Cache lookups that fell through", ["cache"])
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire at an absolute deadline.
+
+    ``get`` returns ``default`` for missing or expired keys; hits and misses are
+    counted under ``cache_hits_total{cache=name}`` / ``cache_misses_total``.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: Optional[float] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.time():
+                    self._data.move_to_end(key)
+                    CACHE_HITS.inc(cache=self.name)
+                    return value
+                del self._data[key]
+        CACHE_MISSES.inc(cache=self.name)
+        return default
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None) -> None:
+        """Store ``value``; it expires at ``expires_at`` (epoch seconds) or after ``ttl``, whichever is first."""
+        if self.ttl is not None:
+            ttl_deadline = time.time() + self.ttl
+            expires_at = ttl_deadline if expires_at is None else min(expires_at, ttl_deadline)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def hits(self) -> int:
+        return int(CACHE_HITS.value(cache=self.name))
+
+    @property
+    def misses(self) -> int:
+        return int(CACHE_MISSES.value(cache=self.name))
@@ -0,0 +1,75 @@
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from . import query_profiler
+from .metrics import REGISTRY
+from .request_metrics import instrument_engine
+from .settings import Settings, settings
+
+POOL_CHECKOUT_SECONDS = REGISTRY.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection (includes opening overflow connections)",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+)
+POOL_CHECKOUT_TIMEOUTS = REGISTRY.counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up after pool_timeout"
+)
+POOL_CONNECTIONS_OPENED = REGISTRY.counter(
+    "db_pool_connections_opened_total", "New DBAPI connections opened by the pool"
+)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
+
+def create_engine_from_settings(config: Settings = settings) -> AsyncEngine:
+    engine = create_async_engine(
+        config.database_url,
+        poolclass=InstrumentedPool,
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+        pool_timeout=config.db_pool_timeout,
+        pool_recycle=config.db_pool_recycle,
+        pool_pre_ping=config.db_pool_pre_ping,
+    )
+    pool = engine.sync_engine.pool
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        POOL_CONNECTIONS_OPENED.inc()
+
+    instrument_engine(engine.sync_engine)
+    if config.query_profiler:
+        query_profiler.attach(engine)
+
+    REGISTRY.gauge("db_pool_checked_out", "Connections currently checked out (in use)", fn=pool.checkedout)
+    REGISTRY.gauge("db_pool_idle", "Idle connections held by the pool", fn=pool.checkedin)
+    REGISTRY.gauge("db_pool_overflow", "Connections opened beyond pool_size", fn=lambda: max(pool.overflow(), 0))
+    REGISTRY.gauge(
+        "db_pool_max_connections",
+        "Upper bound of connections this worker can hold (pool_size + max_overflow)",
+        fn=lambda: config.db_pool_size + config.db_max_overflow,
+    )
+    return engine
+
+
+engine = create_engine_from_settings()
+# expire_on_commit=False: attributes cannot be lazily reloaded on an AsyncSession
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_db():
+    async with SessionLocal() as db:
+        yield db
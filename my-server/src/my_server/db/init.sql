@@ -1,3 +1,6 @@
+-- Schema of a new database. An existing one is brought up to date by the
+-- scripts of db/migrations/, in order.
+
 -- Enums
 CREATE TYPE "gender" AS ENUM ('male', 'female', 'other');
 CREATE TYPE "meal_type" AS ENUM ('breakfast', 'lunch', 'dinner', 'snack');
@@ -58,7 +61,7 @@ CREATE TABLE "meals" (
   "food_name" varchar,
   "meal_type" meal_type,
   "image_url" varchar,
-  "created_at" timestamp DEFAULT (now()),
+  "created_at" timestamp NOT NULL DEFAULT (now()),
   "updated_at" timestamp DEFAULT (now())
 );
 
@@ -72,7 +75,8 @@ CREATE TABLE "achievements" (
   "current" integer,
   "achieved" boolean DEFAULT false,
   "achieved_at" timestamp,
-  "created_at" timestamp DEFAULT (now())
+  "created_at" timestamp DEFAULT (now()),
+  "updated_at" timestamp DEFAULT (now())
 );
 
 CREATE TABLE "nutrition_database" (
@@ -84,7 +88,7 @@ CREATE TABLE "nutrition_database" (
   "fat" double precision,
   "fiber" double precision,
   "sugar" double precision,
-  "last_updated" timestamp DEFAULT (now())
+  "last_updated" timestamp NOT NULL DEFAULT (now())
 );
 
 CREATE TABLE "exercise_logs" (
@@ -135,7 +139,8 @@ CREATE TABLE "physical_info" (
   "weight" double precision,
   "height" double precision,
   "activity_level" varchar,
-  "created_at" timestamp DEFAULT (now())
+  "created_at" timestamp DEFAULT (now()),
+  "updated_at" timestamp DEFAULT (now())
 );
 
 CREATE TABLE "about_yourself" (
@@ -146,6 +151,50 @@ CREATE TABLE "about_yourself" (
   "updated_at" timestamp DEFAULT (now())
 );
 
+CREATE TABLE "sync_tombstones" (
+  "resource" varchar NOT NULL,
+  "id" varchar NOT NULL,
+  "user_id" varchar NOT NULL,
+  "deleted_at" timestamp NOT NULL DEFAULT (now()),
+  PRIMARY KEY ("resource", "id")
+);
+
+-- Per user, per day totals kept up to date by the write paths (my_server/rollup.py);
+-- rebuild with `python -m my_server.rollup`
+CREATE TABLE "user_daily_summary" (
+  "user_id" varchar NOT NULL,
+  "date" date NOT NULL,
+  "water_count" integer NOT NULL DEFAULT 0,
+  "exercise_minutes" integer NOT NULL DEFAULT 0,
+  "exercise_calories" double precision NOT NULL DEFAULT 0,
+  "sleep_hours" double precision NOT NULL DEFAULT 0,
+  "meal_count" integer NOT NULL DEFAULT 0,
+  "updated_at" timestamp DEFAULT (now()),
+  PRIMARY KEY ("user_id", "date")
+);
+
+-- Achievement progress per user and achievement type, advanced from log
+-- events by my_server/achievement_engine.py and copied into achievements.current
+CREATE TABLE "achievement_counters" (
+  "user_id" varchar NOT NULL,
+  "type" varchar NOT NULL,
+  "value" integer NOT NULL DEFAULT 0,
+  "last_day" date,
+  "updated_at" timestamp DEFAULT (now()),
+  PRIMARY KEY ("user_id", "type")
+);
+
+-- Next reminder per user and kind for the enabled notification_settings flags,
+-- claimed by the scheduler in my_server/reminders.py
+CREATE TABLE "reminder_jobs" (
+  "user_id" varchar NOT NULL,
+  "kind" varchar NOT NULL,
+  "due_at" timestamp NOT NULL,
+  "interval_seconds" integer NOT NULL,
+  "updated_at" timestamp DEFAULT (now()),
+  PRIMARY KEY ("user_id", "kind")
+);
+
 -- Indexes
 CREATE UNIQUE INDEX ON "users" ("email");
 CREATE UNIQUE INDEX ON "users" ("id");
@@ -154,6 +203,10 @@ CREATE INDEX ON "user_goals" ("user_id");
 CREATE INDEX ON "user_goals" ("user_id", "is_active");
 CREATE INDEX ON "user_goals" ("user_id", "start_date");
 CREATE UNIQUE INDEX ON "food_logs" ("user_id", "date");
+-- one log per user per day: the conflict target of PUT /<logs>/by_date/{date}
+-- (existing databases: db/migrations/002_one_log_per_day.sql merges duplicate days first)
+CREATE UNIQUE INDEX ON "water_intake_logs" ("user_id", "date");
+CREATE UNIQUE INDEX ON "sleep_logs" ("user_id", "date");
 CREATE INDEX ON "food_logs" ("date");
 CREATE INDEX ON "meals" ("food_log_id");
 CREATE INDEX ON "meals" ("user_id");
@@ -173,6 +226,28 @@ CREATE INDEX ON "water_intake_logs" ("date");
 CREATE INDEX ON "notification_settings" ("user_id");
 CREATE INDEX ON "physical_info" ("user_id");
 CREATE INDEX ON "about_yourself" ("user_id");
+-- change feed (/sync/changes) keyset scans
+CREATE INDEX ON "water_intake_logs" ("user_id", "updated_at", "id");
+CREATE INDEX ON "basic_profile" ("user_id", "updated_at", "id");
+CREATE INDEX ON "physical_info" ("user_id", "updated_at", "id");
+CREATE INDEX ON "about_yourself" ("user_id", "updated_at", "id");
+CREATE INDEX ON "food_logs" ("user_id", "last_modified", "id");
+CREATE INDEX ON "meals" ("user_id", "updated_at", "id");
+CREATE INDEX ON "exercise_logs" ("user_id", "updated_at", "id");
+CREATE INDEX ON "sleep_logs" ("user_id", "updated_at", "id");
+CREATE INDEX ON "user_goals" ("user_id", "updated_at", "id");
+CREATE INDEX ON "achievements" ("user_id", "updated_at", "id");
+CREATE INDEX ON "notification_settings" ("user_id", "updated_at", "id");
+CREATE INDEX ON "sync_tombstones" ("user_id", "resource", "deleted_at", "id");
+-- reminder scheduler: due jobs in due_at order
+CREATE INDEX ON "reminder_jobs" ("due_at");
+
+-- list endpoints: from/to range + keyset pagination
+CREATE INDEX ON "water_intake_logs" ("user_id", "date", "id");
+CREATE INDEX ON "exercise_logs" ("user_id", "date", "id");
+CREATE INDEX ON "sleep_logs" ("user_id", "date", "id");
+CREATE INDEX ON "meals" ("user_id", "created_at", "id");
+CREATE INDEX ON "nutrition_database" ("last_updated", "id");
 
 -- Foreign Keys
 ALTER TABLE "basic_profile" ADD FOREIGN KEY ("user_id") REFERENCES "users" ("id");
@@ -187,3 +262,6 @@ ALTER TABLE "water_intake_logs" ADD FOREIGN KEY ("user_id") REFERENCES "users" (
 ALTER TABLE "notification_settings" ADD FOREIGN KEY ("user_id") REFERENCES "users" ("id");
 ALTER TABLE "physical_info" ADD FOREIGN KEY ("user_id") REFERENCES "users" ("id");
 ALTER TABLE "about_yourself" ADD FOREIGN KEY ("user_id") REFERENCES "users" ("id");
+ALTER TABLE "user_daily_summary" ADD FOREIGN KEY ("user_id") REFERENCES "users" ("id");
+ALTER TABLE "achievement_counters" ADD FOREIGN KEY ("user_id") REFERENCES "users" ("id");
+ALTER TABLE "reminder_jobs" ADD FOREIGN KEY ("user_id") REFERENCES "users" ("id");
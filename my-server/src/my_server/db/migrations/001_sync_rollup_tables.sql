@@ -0,0 +1,81 @@
+-- Tables, columns and indexes init.sql gained for the change feed, the daily
+-- rollup, server side achievements and reminders.
+--
+-- For databases created from an earlier init.sql; every statement is a no-op
+-- where the object already exists. Run the migrations in order, then build
+-- the rollup and the reminder jobs of the existing users:
+--
+--   psql -h localhost -U admin -d health_db -f migrations/001_sync_rollup_tables.sql
+--   psql -h localhost -U admin -d health_db -f migrations/002_one_log_per_day.sql
+--   psql -h localhost -U admin -d health_db -f migrations/003_list_sort_columns.sql
+--   python -m my_server.rollup
+--   python -m my_server.reminders
+--
+-- Index names are the ones Postgres gives the unnamed indexes of init.sql.
+
+BEGIN;
+
+-- /sync/changes reads rows by updated_at; existing rows count as changed now
+ALTER TABLE "achievements" ADD COLUMN IF NOT EXISTS "updated_at" timestamp DEFAULT (now());
+ALTER TABLE "physical_info" ADD COLUMN IF NOT EXISTS "updated_at" timestamp DEFAULT (now());
+
+CREATE TABLE IF NOT EXISTS "sync_tombstones" (
+  "resource" varchar NOT NULL,
+  "id" varchar NOT NULL,
+  "user_id" varchar NOT NULL,
+  "deleted_at" timestamp NOT NULL DEFAULT (now()),
+  PRIMARY KEY ("resource", "id")
+);
+
+CREATE TABLE IF NOT EXISTS "user_daily_summary" (
+  "user_id" varchar NOT NULL REFERENCES "users" ("id"),
+  "date" date NOT NULL,
+  "water_count" integer NOT NULL DEFAULT 0,
+  "exercise_minutes" integer NOT NULL DEFAULT 0,
+  "exercise_calories" double precision NOT NULL DEFAULT 0,
+  "sleep_hours" double precision NOT NULL DEFAULT 0,
+  "meal_count" integer NOT NULL DEFAULT 0,
+  "updated_at" timestamp DEFAULT (now()),
+  PRIMARY KEY ("user_id", "date")
+);
+
+CREATE TABLE IF NOT EXISTS "achievement_counters" (
+  "user_id" varchar NOT NULL REFERENCES "users" ("id"),
+  "type" varchar NOT NULL,
+  "value" integer NOT NULL DEFAULT 0,
+  "last_day" date,
+  "updated_at" timestamp DEFAULT (now()),
+  PRIMARY KEY ("user_id", "type")
+);
+
+CREATE TABLE IF NOT EXISTS "reminder_jobs" (
+  "user_id" varchar NOT NULL REFERENCES "users" ("id"),
+  "kind" varchar NOT NULL,
+  "due_at" timestamp NOT NULL,
+  "interval_seconds" integer NOT NULL,
+  "updated_at" timestamp DEFAULT (now()),
+  PRIMARY KEY ("user_id", "kind")
+);
+
+-- change feed (/sync/changes) keyset scans
+CREATE INDEX IF NOT EXISTS "water_intake_logs_user_id_updated_at_id_idx" ON "water_intake_logs" ("user_id", "updated_at", "id");
+CREATE INDEX IF NOT EXISTS "basic_profile_user_id_updated_at_id_idx" ON "basic_profile" ("user_id", "updated_at", "id");
+CREATE INDEX IF NOT EXISTS "physical_info_user_id_updated_at_id_idx" ON "physical_info" ("user_id", "updated_at", "id");
+CREATE INDEX IF NOT EXISTS "about_yourself_user_id_updated_at_id_idx" ON "about_yourself" ("user_id", "updated_at", "id");
+CREATE INDEX IF NOT EXISTS "food_logs_user_id_last_modified_id_idx" ON "food_logs" ("user_id", "last_modified", "id");
+CREATE INDEX IF NOT EXISTS "meals_user_id_updated_at_id_idx" ON "meals" ("user_id", "updated_at", "id");
+CREATE INDEX IF NOT EXISTS "exercise_logs_user_id_updated_at_id_idx" ON "exercise_logs" ("user_id", "updated_at", "id");
+CREATE INDEX IF NOT EXISTS "sleep_logs_user_id_updated_at_id_idx" ON "sleep_logs" ("user_id", "updated_at", "id");
+CREATE INDEX IF NOT EXISTS "user_goals_user_id_updated_at_id_idx" ON "user_goals" ("user_id", "updated_at", "id");
+CREATE INDEX IF NOT EXISTS "achievements_user_id_updated_at_id_idx" ON "achievements" ("user_id", "updated_at", "id");
+CREATE INDEX IF NOT EXISTS "notification_settings_user_id_updated_at_id_idx" ON "notification_settings" ("user_id", "updated_at", "id");
+CREATE INDEX IF NOT EXISTS "sync_tombstones_user_id_resource_deleted_at_id_idx" ON "sync_tombstones" ("user_id", "resource", "deleted_at", "id");
+-- reminder scheduler: due jobs in due_at order
+CREATE INDEX IF NOT EXISTS "reminder_jobs_due_at_idx" ON "reminder_jobs" ("due_at");
+
+-- list endpoints: from/to range + keyset pagination
+CREATE INDEX IF NOT EXISTS "water_intake_logs_user_id_date_id_idx" ON "water_intake_logs" ("user_id", "date", "id");
+CREATE INDEX IF NOT EXISTS "exercise_logs_user_id_date_id_idx" ON "exercise_logs" ("user_id", "date", "id");
+CREATE INDEX IF NOT EXISTS "sleep_logs_user_id_date_id_idx" ON "sleep_logs" ("user_id", "date", "id");
+
+COMMIT;
@@ -0,0 +1,59 @@
+-- One water_intake_logs and one sleep_logs row per user per day.
+--
+-- For databases created before init.sql had the unique (user_id, date)
+-- indexes; runs after 001, which creates sync_tombstones. Days holding several
+-- rows are merged first: water keeps the most recently updated row with the
+-- day's summed count, sleep keeps the most recently updated row. Removed rows
+-- get tombstones, so /sync/changes tells the devices to drop them. Afterwards
+-- rebuild the rollup (see 001):
+--
+--   psql -h localhost -U admin -d health_db -f migrations/002_one_log_per_day.sql
+--   python -m my_server.rollup
+
+BEGIN;
+
+-- keep writers out until the indexes exist
+LOCK TABLE "water_intake_logs", "sleep_logs" IN SHARE ROW EXCLUSIVE MODE;
+
+CREATE TEMP TABLE "water_keep" ON COMMIT DROP AS
+SELECT DISTINCT ON ("user_id", "date")
+  "id", "user_id", "date", sum("count") OVER "day" AS "total", count(*) OVER "day" AS "copies"
+FROM "water_intake_logs"
+WINDOW "day" AS (PARTITION BY "user_id", "date")
+ORDER BY "user_id", "date", "updated_at" DESC NULLS LAST, "id";
+
+UPDATE "water_intake_logs" AS w
+SET "count" = k."total", "updated_at" = timezone('utc', now())
+FROM "water_keep" AS k
+WHERE w."id" = k."id" AND k."copies" > 1;
+
+WITH "removed" AS (
+  DELETE FROM "water_intake_logs" AS w
+  USING "water_keep" AS k
+  WHERE w."user_id" = k."user_id" AND w."date" = k."date" AND w."id" <> k."id"
+  RETURNING w."id", w."user_id"
+)
+INSERT INTO "sync_tombstones" ("resource", "id", "user_id", "deleted_at")
+SELECT 'water_intake_logs', "id", "user_id", timezone('utc', now()) FROM "removed"
+ON CONFLICT ("resource", "id") DO UPDATE SET "user_id" = EXCLUDED."user_id", "deleted_at" = EXCLUDED."deleted_at";
+
+CREATE TEMP TABLE "sleep_keep" ON COMMIT DROP AS
+SELECT DISTINCT ON ("user_id", "date") "id", "user_id", "date"
+FROM "sleep_logs"
+ORDER BY "user_id", "date", "updated_at" DESC NULLS LAST, "id";
+
+WITH "removed" AS (
+  DELETE FROM "sleep_logs" AS s
+  USING "sleep_keep" AS k
+  WHERE s."user_id" = k."user_id" AND s."date" = k."date" AND s."id" <> k."id"
+  RETURNING s."id", s."user_id"
+)
+INSERT INTO "sync_tombstones" ("resource", "id", "user_id", "deleted_at")
+SELECT 'sleep_logs', "id", "user_id", timezone('utc', now()) FROM "removed"
+ON CONFLICT ("resource", "id") DO UPDATE SET "user_id" = EXCLUDED."user_id", "deleted_at" = EXCLUDED."deleted_at";
+
+-- the names Postgres gives the unnamed indexes of init.sql
+CREATE UNIQUE INDEX IF NOT EXISTS "water_intake_logs_user_id_date_idx" ON "water_intake_logs" ("user_id", "date");
+CREATE UNIQUE INDEX IF NOT EXISTS "sleep_logs_user_id_date_idx" ON "sleep_logs" ("user_id", "date");
+
+COMMIT;
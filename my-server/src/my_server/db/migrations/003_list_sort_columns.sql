@@ -0,0 +1,22 @@
+-- Keyset pagination of GET /meals and GET /nutrition_database over an index.
+--
+-- paginate() sorts a nullable column through coalesce(), which no index
+-- serves, so every page sorted the whole table. The two sort columns become
+-- NOT NULL (rows without a value take the other timestamp of the row, or
+-- now) and get (.., id) indexes. Runs after 002:
+--
+--   psql -h localhost -U admin -d health_db -f migrations/003_list_sort_columns.sql
+
+BEGIN;
+
+UPDATE "meals" SET "created_at" = coalesce("updated_at", timezone('utc', now())) WHERE "created_at" IS NULL;
+ALTER TABLE "meals" ALTER COLUMN "created_at" SET NOT NULL;
+
+UPDATE "nutrition_database" SET "last_updated" = timezone('utc', now()) WHERE "last_updated" IS NULL;
+ALTER TABLE "nutrition_database" ALTER COLUMN "last_updated" SET NOT NULL;
+
+-- the names Postgres gives the unnamed indexes of init.sql
+CREATE INDEX IF NOT EXISTS "meals_user_id_created_at_id_idx" ON "meals" ("user_id", "created_at", "id");
+CREATE INDEX IF NOT EXISTS "nutrition_database_last_updated_id_idx" ON "nutrition_database" ("last_updated", "id");
+
+COMMIT;
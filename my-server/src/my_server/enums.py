@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Postgres enum types from db/init.sql that API payloads write into. These are
+# the values used until the first successful load (or if the DB is unreachable).
+DEFAULT_ENUMS: Dict[str, Tuple[str, ...]] = {
+    "gender": ("male", "female", "other"),
+    "meal_type": ("breakfast", "lunch", "dinner", "snack"),
+    "activity_type": ("walking", "running", "cycling", "swimming", "yoga", "other"),
+    "sleep_quality": ("very_poor", "poor", "average", "good", "excellent"),
+}
+
+_LOAD_QUERY = text(
+    "SELECT t.typname, e.enumlabel FROM pg_enum e JOIN pg_type t ON e.enumtypid = t.oid "
+    "WHERE t.typname = ANY(:names) ORDER BY t.typname, e.enumsortorder"
+)
+
+
+class EnumRegistry:
+    """In-process copy of the Postgres enum labels, loaded once at startup.
+
+    Values are reloaded every ``ttl`` seconds by ``run_refresher`` or right away
+    after ``request_refresh()`` (wired to SIGHUP in main), so validating a
+    write never touches the catalog.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._values: Dict[str, frozenset] = {name: frozenset(v) for name, v in DEFAULT_ENUMS.items()}
+        self._refresh_requested = asyncio.Event()
+
+    def values(self, enum_name: str) -> frozenset:
+        return self._values[enum_name]
+
+    def validate(self, enum_name: str, value: Optional[str], field: Optional[str] = None) -> None:
+        allowed = self._values[enum_name]
+        if value is not None and value not in allowed:
+            raise HTTPException(status_code=400, detail=f"Invalid {field or enum_name} '{value}'. Allowed: {sorted(allowed)}")
+
+    async def load(self, engine: AsyncEngine) -> None:
+        try:
+            async with engine.connect() as conn:
+                rows = (await conn.execute(_LOAD_QUERY, {"names": list(DEFAULT_ENUMS)})).fetchall()
+        except Exception:
+            logger.warning("Could not load enum values, keeping the current set", exc_info=True)
+            return
+        loaded: Dict[str, set] = {}
+        for typname, label in rows:
+            loaded.setdefault(typname, set()).add(label)
+        self._values = {**self._values, **{name: frozenset(labels) for name, labels in loaded.items()}}
+
+    def request_refresh(self) -> None:
+        self._refresh_requested.set()
+
+    async def run_refresher(self, engine: AsyncEngine) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._refresh_requested.wait(), timeout=self.ttl)
+            except asyncio.TimeoutError:
+                pass
+            self._refresh_requested.clear()
+            await self.load(engine)
+
+
+enum_registry = EnumRegistry(ttl=settings.enum_registry_ttl)
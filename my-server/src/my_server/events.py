@@ -0,0 +1,71 @@
+"""In-process bus of "a user's logs for this day changed" events.
+
+``refresh_daily_summary`` stages a ``LogEvent`` per touched day on the
+writer's session; they are published when that session commits and dropped
+if it rolls back, so consumers only see committed writes. Every log write
+(CRUD routes, by-date upserts, /sync/batch) goes through the rollup, which
+makes it the one place events come from.
+
+The queue is bounded: a consumer that falls behind loses events (counted in
+``log_events_dropped_total``) instead of holding memory or slowing requests.
+"""
+import asyncio
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, List
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from .metrics import REGISTRY
+from .settings import settings
+
+EVENTS_PUBLISHED = REGISTRY.counter("log_events_published_total", "Log events queued for background consumers")
+EVENTS_DROPPED = REGISTRY.counter("log_events_dropped_total", "Log events dropped because the queue was full")
+
+_STAGED = "log_events"
+
+
+@dataclass(frozen=True)
+class LogEvent:
+    user_id: str
+    day: date
+
+
+class EventBus:
+    def __init__(self, max_pending: int):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        REGISTRY.gauge("log_events_pending", "Log events waiting for a consumer", fn=self._queue.qsize)
+
+    def publish(self, item: LogEvent) -> None:
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            EVENTS_DROPPED.inc()
+            return
+        EVENTS_PUBLISHED.inc()
+
+    async def next_batch(self, max_size: int) -> List[LogEvent]:
+        """Wait for an event, then take whatever else is already queued, up to ``max_size``."""
+        batch = [await self._queue.get()]
+        while len(batch) < max_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+
+bus = EventBus(settings.event_queue_size)
+
+
+def stage(db: AsyncSession, items: Iterable[LogEvent]) -> None:
+    """Publish ``items`` once ``db``'s current transaction commits."""
+    db.sync_session.info.setdefault(_STAGED, []).extend(items)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_staged(session: Session) -> None:
+    for item in session.info.pop(_STAGED, ()):
+        bus.publish(item)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_staged(session: Session) -> None:
+    session.info.pop(_STAGED, None)
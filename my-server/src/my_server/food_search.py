@@ -0,0 +1,201 @@
+import asyncio
+import bisect
+import heapq
+import logging
+import re
+import unicodedata
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from .schema.nutrition_database import NutritionDatabase, NutritionDatabaseORM
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+_WORD_SPLIT = re.compile(r"[\s\-_,.;:/()\[\]]+")
+
+# Candidates ranked by shared trigram count before the exact score is computed
+_CANDIDATES_PER_RESULT = 8
+
+
+def normalize(text: str) -> str:
+    """Case- and width-fold a food name so "Pad Thai", "pad  thai" and "ｐａｄ ｔｈａｉ" compare equal."""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def trigrams(normalized: str) -> List[str]:
+    """Character trigrams with word boundaries, as pg_trgm does.
+
+    Works the same for Thai, which is written without spaces between words, so
+    a query matches anywhere inside a name and survives a typo or two.
+    """
+    grams = []
+    for word in _WORD_SPLIT.split(normalized):
+        if word:
+            padded = f"  {word} "
+            grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class _Index:
+    """Posting lists over numbered foods; numbers are never reused until the next build."""
+
+    def __init__(self):
+        self.foods: List[Optional[NutritionDatabase]] = []  # doc number -> record, None once removed
+        self.names: List[str] = []
+        self.gram_counts: List[int] = []
+        self.postings: Dict[str, List[int]] = {}
+        self.words: List[Tuple[str, int]] = []  # sorted (word, doc) for prefix lookups
+        self.by_id: Dict[str, int] = {}
+
+    def add(self, food: NutritionDatabase, sort_words: bool = True) -> None:
+        self.remove(food.id)
+        doc = len(self.foods)
+        name = normalize(food.food_name)
+        grams = set(trigrams(name))
+        self.foods.append(food)
+        self.names.append(name)
+        self.gram_counts.append(len(grams))
+        self.by_id[food.id] = doc
+        for gram in grams:
+            self.postings.setdefault(gram, []).append(doc)
+        for word in set(_WORD_SPLIT.split(name)):
+            if word:
+                if sort_words:
+                    bisect.insort(self.words, (word, doc))
+                else:
+                    self.words.append((word, doc))
+
+    def remove(self, food_id: str) -> None:
+        # postings keep the number, lookups skip docs whose record is gone
+        doc = self.by_id.pop(food_id, None)
+        if doc is not None:
+            self.foods[doc] = None
+
+
+class FoodSearchIndex:
+    """In-process type-ahead index over nutrition_database.food_name.
+
+    Loaded at startup and rebuilt every ``refresh_seconds`` in a worker thread
+    (picks up writes made by other uvicorn workers); this worker's own writes
+    are applied right away through ``upsert``/``remove``. Those made while a
+    rebuild reads and builds are also logged and replayed onto the new index
+    before it replaces the current one, so the rebuild does not drop them.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._index = _Index()
+        self._generation = 0
+        # (generation, food or None, food id) of the changes since the oldest running rebuild began
+        self._changes: List[Tuple[int, Optional[NutritionDatabase], str]] = []
+        # generation each running rebuild began at -> how many began there
+        self._rebuilds: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._index.by_id)
+
+    @staticmethod
+    def _build(foods: Iterable[NutritionDatabase]) -> _Index:
+        index = _Index()
+        for food in foods:
+            index.add(food, sort_words=False)
+        index.words.sort()
+        return index
+
+    def build(self, foods: Iterable[NutritionDatabase]) -> None:
+        self._index = self._build(foods)
+
+    def upsert(self, food: NutritionDatabase) -> None:
+        self._index.add(food)
+        self._log(food, food.id)
+
+    def remove(self, food_id: str) -> None:
+        self._index.remove(food_id)
+        self._log(None, food_id)
+
+    def _log(self, food: Optional[NutritionDatabase], food_id: str) -> None:
+        if self._rebuilds:
+            self._generation += 1
+            self._changes.append((self._generation, food, food_id))
+
+    async def rebuild(self, read: Callable[[], Awaitable[Iterable[NutritionDatabase]]]) -> None:
+        """Replace the index with one built from ``read()``, plus the changes made meanwhile."""
+        began = self._generation
+        self._rebuilds[began] += 1
+        try:
+            foods = await read()
+            # building 100k entries takes seconds, keep it off the event loop
+            index = await asyncio.to_thread(self._build, foods)
+            # back on the event loop, where upsert and remove run: nothing lands in between
+            for generation, food, food_id in self._changes:
+                if generation > began:
+                    if food is None:
+                        index.remove(food_id)
+                    else:
+                        index.add(food)
+            self._index = index
+        finally:
+            self._rebuilds[began] -= 1
+            if not self._rebuilds[began]:
+                del self._rebuilds[began]
+            oldest = min(self._rebuilds, default=self._generation)
+            self._changes = [change for change in self._changes if change[0] > oldest]
+
+    def search(self, query: str, limit: int = 10) -> List[NutritionDatabase]:
+        """Best ``limit`` foods for ``query``, exact and prefix matches first."""
+        index = self._index
+        q = normalize(query)
+        if not q:
+            return []
+        scores: Dict[int, float] = {}
+
+        # prefix of any word in the name: what people type first
+        start = bisect.bisect_left(index.words, (q,))
+        for word, doc in index.words[start:start + limit * _CANDIDATES_PER_RESULT]:
+            if not word.startswith(q):
+                break
+            scores[doc] = 3.0 if index.names[doc] == q else 2.0
+
+        grams = set(trigrams(q))
+        # a trigram match scores below any word prefix match, so a full page of those is final
+        if len(q) >= 3 and grams and len(scores) < limit:
+            # Count shared trigrams over the rarer half of the query's grams only: a
+            # close match shares most grams, so it still ranks near the top, while
+            # grams like " ch" that hit a large part of the corpus are skipped.
+            postings = sorted((index.postings[gram] for gram in grams if gram in index.postings), key=len)
+            shared: Counter = Counter()
+            for posting in postings[:max(1, (len(postings) + 1) // 2)]:
+                shared.update(posting)
+            for doc, _ in shared.most_common(limit * _CANDIDATES_PER_RESULT):
+                name = index.names[doc]
+                common = len(grams.intersection(trigrams(name)))
+                # Jaccard similarity of the trigram sets, like pg_trgm similarity()
+                similarity = common / (len(grams) + index.gram_counts[doc] - common)
+                scores[doc] = max(scores.get(doc, 0.0), similarity + (1.0 if q in name else 0.0))
+
+        ranked = heapq.nlargest(
+            limit,
+            ((score, -len(index.names[doc]), doc) for doc, score in scores.items() if index.foods[doc] is not None),
+        )
+        return [index.foods[doc] for _, _, doc in ranked]
+
+    async def load(self, engine: AsyncEngine) -> None:
+        async def read():
+            async with engine.connect() as conn:
+                rows = (await conn.execute(select(NutritionDatabaseORM.__table__))).mappings().all()
+            return (NutritionDatabase.model_validate(dict(row)) for row in rows)
+
+        try:
+            await self.rebuild(read)
+        except Exception:
+            logger.warning("Could not load foods for search, keeping the current index", exc_info=True)
+
+    async def run_refresher(self, engine: AsyncEngine) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            await self.load(engine)
+
+
+food_index = FoodSearchIndex(refresh_seconds=settings.food_search_refresh_seconds)
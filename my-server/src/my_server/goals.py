@@ -0,0 +1,80 @@
+"""Server kept ``goal_current`` of the goals that track a logged quantity.
+
+A goal of one of the ``GOAL_TOTALS`` types counts the sum of that
+user_daily_summary column over its start_date..end_date window (an open end
+counts every day on that side). The rollup hands ``apply_day_changes`` each
+day's totals before and after a write, and the difference is added to the
+active goals covering the day in one UPDATE over the (user_id, is_active)
+index, so a log write costs the same however long the goal has run.
+``recompute_goals`` sums the window from the summary instead; it runs when a
+goal is written (its type, window or activity may have changed) and when a
+user's rollup is rebuilt.
+
+Both expect the caller to hold the user's rollup lock (``rollup.lock_user``).
+Other goal types keep the client's ``goal_current``.
+"""
+from datetime import date, datetime
+from typing import Dict, Iterable, Mapping, Optional
+from sqlalchemy import Date, Float, String, and_, case, column, func, or_, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+from .schema.stats import UserDailySummaryORM
+from .schema.user_goals import UserGoalORM
+
+# Goal type -> the user_daily_summary column it adds up
+GOAL_TOTALS = {
+    "water": "water_count",
+    "exercise": "exercise_minutes",
+    "calories": "exercise_calories",
+    "sleep": "sleep_hours",
+    "meal": "meal_count",
+}
+
+
+def _covers(goal, day):
+    return and_(
+        or_(goal.c.start_date.is_(None), goal.c.start_date <= day),
+        or_(goal.c.end_date.is_(None), goal.c.end_date >= day),
+    )
+
+
+async def apply_day_changes(db: AsyncSession, user_id: str, before: Mapping[date, Mapping], after: Mapping[date, Mapping]) -> None:
+    """Add the change between ``before`` and ``after`` (summary rows by day) to the user's active goals."""
+    changes = []
+    for day, new in after.items():
+        old = before.get(day)
+        for goal_type, total in GOAL_TOTALS.items():
+            delta = new[total] - (old[total] if old is not None else 0)
+            if delta:
+                changes.append((goal_type, day, float(delta)))
+    if not changes:
+        return
+    goal = UserGoalORM.__table__
+    listed = values(column("goal_type", String), column("day", Date), column("delta", Float), name="changes").data(changes)
+    per_goal = select(goal.c.id, func.sum(listed.c.delta).label("delta")).join(
+        listed, and_(listed.c.goal_type == goal.c.goal_type, _covers(goal, listed.c.day))
+    ).where(goal.c.user_id == user_id, goal.c.is_active.is_(True)).group_by(goal.c.id).subquery("per_goal")
+    await db.execute(
+        update(goal).where(goal.c.id == per_goal.c.id).values(
+            goal_current=func.coalesce(goal.c.goal_current, 0) + per_goal.c.delta,
+            updated_at=datetime.utcnow(),
+        )
+    )
+
+
+async def recompute_goals(db: AsyncSession, user_id: str, goal_ids: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """Set ``goal_current`` from the summary for the user's active tracked goals (only ``goal_ids`` if given)."""
+    goal = UserGoalORM.__table__
+    summary = UserDailySummaryORM.__table__
+    amount = case({goal_type: summary.c[total] for goal_type, total in GOAL_TOTALS.items()}, value=goal.c.goal_type)
+    window_total = select(func.coalesce(func.sum(amount), 0)).where(
+        summary.c.user_id == goal.c.user_id, _covers(goal, summary.c.date)
+    ).scalar_subquery()
+    stmt = update(goal).where(
+        goal.c.user_id == user_id, goal.c.is_active.is_(True), goal.c.goal_type.in_(list(GOAL_TOTALS))
+    )
+    if goal_ids is not None:
+        stmt = stmt.where(goal.c.id.in_(list(goal_ids)))
+    result = await db.execute(
+        stmt.values(goal_current=window_total, updated_at=datetime.utcnow()).returning(goal.c.id, goal.c.goal_current)
+    )
+    return {row.id: row.goal_current for row in result}
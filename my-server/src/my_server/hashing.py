@@ -0,0 +1,46 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from .metrics import REGISTRY
+
+HASH_SECONDS = REGISTRY.histogram("password_hash_seconds", "Time spent in bcrypt hash/verify, excluding queueing", ["op"])
+HASH_REJECTED = REGISTRY.counter("password_hash_rejected_total", "Hash requests refused with 503 because the queue was full")
+
+
+class HashingPool:
+    """Runs bcrypt off the event loop on a fixed set of threads.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism
+    without pickling anything into a process pool. At most ``max_pending``
+    calls may be running or queued; beyond that callers get a 503 instead of
+    piling up behind a login storm.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._pending = 0
+        REGISTRY.gauge("password_hash_pending", "Hash requests running or waiting for a worker", fn=lambda: self._pending)
+
+    async def run(self, op: str, fn, *args):
+        if self._pending >= self.max_pending:
+            HASH_REJECTED.inc()
+            raise HTTPException(status_code=503, detail="Server busy, try again", headers={"Retry-After": "1"})
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, _timed, op, fn, *args)
+        finally:
+            self._pending -= 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _timed(op, fn, *args):
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        HASH_SECONDS.observe(time.perf_counter() - start, op=op)
@@ -1,6 +1,11 @@
+import asyncio
+import signal
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from my_server.achievement_engine import achievement_evaluator
+from my_server.api import auth as auth_module
 from my_server.api.auth import router as auth_router
 from my_server.api.basic_profile import router as basic_profile_router
 from my_server.api.user_goals import router as user_goals_router
@@ -14,8 +19,43 @@ from my_server.api.water_intake_logs import router as water_intake_logs_router
 from my_server.api.notification_settings import router as notification_settings_router
 from my_server.api.physical_info import router as physical_info_router
 from my_server.api.about_yourself import router as about_yourself_router
+from my_server.api.sync import router as sync_router
+from my_server.api.stats import router as stats_router
+from my_server.api.dashboard import router as dashboard_router
+from my_server.compression import CompressionMiddleware
+from my_server.enums import enum_registry
+from my_server.food_search import food_index
+from my_server.metrics import REGISTRY
+from my_server.query_profiler import QueryProfilerMiddleware
+from my_server.reminders import reminder_scheduler
+from my_server.request_metrics import MetricsMiddleware
+from my_server.responses import FastJSONResponse
+from my_server.settings import settings
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await enum_registry.load(auth_module.engine)
+    refresher = asyncio.create_task(enum_registry.run_refresher(auth_module.engine))
+    await food_index.load(auth_module.engine)
+    food_refresher = asyncio.create_task(food_index.run_refresher(auth_module.engine))
+    achievement_worker = asyncio.create_task(achievement_evaluator.run(auth_module.SessionLocal))
+    background = [refresher, food_refresher, achievement_worker]
+    if settings.reminder_scheduler_enabled:
+        background.append(asyncio.create_task(reminder_scheduler.run(auth_module.SessionLocal)))
+    # `kill -HUP <pid>` reloads enum values after a migration (main thread, non-Windows only)
+    with suppress(AttributeError, NotImplementedError, RuntimeError):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, enum_registry.request_refresh)
+    yield
+    for task in background:
+        task.cancel()
+    # a task cancelled inside a transaction hands its connection back here, before dispose
+    await asyncio.gather(*background, return_exceptions=True)
+    auth_module.hashing_pool.shutdown()
+    await auth_module.engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -25,6 +65,16 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.gzip_level,
+    brotli_quality=settings.brotli_quality,
+)
+if settings.query_profiler:
+    app.add_middleware(QueryProfilerMiddleware)
+# outermost: times the whole stack and sees the compressed size
+app.add_middleware(MetricsMiddleware)
 
 @app.get("/")
 def read_root():
@@ -34,6 +84,10 @@ def read_root():
 def swagger_redirect():
     return RedirectResponse(url="/docs")
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/favicon.ico")
 def favicon():
     return {"message": "No favicon configured"}
@@ -51,4 +105,7 @@ app.include_router(sleep_logs_router)
 app.include_router(water_intake_logs_router)
 app.include_router(notification_settings_router)
 app.include_router(physical_info_router)
-app.include_router(about_yourself_router)
\ No newline at end of file
+app.include_router(about_yourself_router)
+app.include_router(sync_router)
+app.include_router(stats_router)
+app.include_router(dashboard_router)
\ No newline at end of file
@@ -0,0 +1,243 @@
+"""Bulk load of nutrition_database from CSV or JSON Lines.
+
+Rows are parsed and validated in chunks of ``chunk_size`` with the
+``NutritionDatabase`` model (in a worker thread, so the event loop stays free)
+and written with one multi-row ``INSERT ... ON CONFLICT (food_name) DO UPDATE``
+per chunk. Memory stays constant whatever the file size. Used by
+``POST /nutrition_database/import`` and from the command line:
+
+    python -m my_server.nutrition_import foods.csv
+    python -m my_server.nutrition_import foods.jsonl --chunk-size 2000
+"""
+import argparse
+import asyncio
+import csv
+import hashlib
+import io
+import json
+import time
+from datetime import datetime
+from typing import IO, Iterator, List, Optional, Tuple
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import SessionLocal, engine
+from .schema.nutrition_database import NutritionDatabase, NutritionDatabaseORM
+from .settings import settings
+
+FORMATS = ("csv", "jsonl")
+
+# Reject details kept in the report; the counts cover every row
+MAX_REPORTED_ERRORS = 100
+
+_FOODS = TypeAdapter(List[NutritionDatabase])
+_TABLE = NutritionDatabaseORM.__table__
+_UPDATE_COLUMNS = [c.name for c in _TABLE.columns if c.name not in ("id", "food_name")]
+# asyncpg allows 32767 bind parameters per statement
+MAX_CHUNK_SIZE = 32767 // len(_TABLE.columns)
+
+
+class ImportFileError(ValueError):
+    """The file cannot be read at all, e.g. it is not UTF-8 text; nothing is imported."""
+
+
+class ImportRowError(BaseModel):
+    line: int
+    detail: str
+
+
+class ImportReport(BaseModel):
+    format: str
+    accepted: int = 0  # rows written (inserted or updated)
+    rejected: int = 0
+    seconds: float = 0.0
+    rows_per_second: float = 0.0
+    errors: List[ImportRowError] = []
+
+
+def detect_format(filename: Optional[str]) -> str:
+    if filename and filename.lower().endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return "csv"
+
+
+def _records(stream: IO[str], fmt: str) -> Iterator[Tuple[int, object]]:
+    """(line number, raw record) pairs; a record that cannot be parsed is an Exception."""
+    try:
+        if fmt == "csv":
+            yield from _csv_records(stream)
+        else:
+            for line_number, line in enumerate(stream, 1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except ValueError as e:
+                        yield line_number, e
+    except UnicodeDecodeError as e:
+        raise ImportFileError(f"File is not UTF-8 text: {e}") from e
+
+
+def _csv_records(stream: IO[str]) -> Iterator[Tuple[int, object]]:
+    reader = csv.reader(stream)
+    try:
+        header = next(reader, [])
+    except csv.Error as e:
+        raise ImportFileError(f"Unreadable CSV header: {e}") from e
+    while True:
+        try:
+            values = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # e.g. a field over csv.field_size_limit(); the reader resumes on the next line
+            yield reader.line_num, e
+            continue
+        # empty cells mean "unknown", not the empty string
+        yield reader.line_num, {key: value for key, value in zip(header, values) if value != ""}
+
+
+def _food_id(food_name: str) -> str:
+    # stable across re-imports of the same reference data
+    return "food-" + hashlib.sha1(food_name.encode()).hexdigest()[:32]
+
+
+def _prepare(batch: List[Tuple[int, object]], now: datetime) -> Tuple[List[Tuple[int, dict]], int, List[ImportRowError]]:
+    """Rows to write (one per food_name), number of valid records, and rejects."""
+    errors = []
+    good = [(line, record) for line, record in batch if isinstance(record, dict)]
+    errors.extend(ImportRowError(line=line, detail=f"Unreadable record: {record}") for line, record in batch if not isinstance(record, dict))
+    for _, record in good:
+        if not record.get("id") and isinstance(record.get("food_name"), str):
+            record["id"] = _food_id(record["food_name"])
+    try:
+        foods = list(zip((line for line, _ in good), _FOODS.validate_python([record for _, record in good])))
+    except ValidationError:
+        # one bad row fails the whole list, find out which ones row by row
+        foods = []
+        for line, record in good:
+            try:
+                foods.append((line, NutritionDatabase.model_validate(record)))
+            except ValidationError as e:
+                errors.append(ImportRowError(line=line, detail="; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())))
+    # ON CONFLICT cannot touch the same row twice in one statement: last one wins
+    by_name = {}
+    for (line, _), row in zip(foods, _FOODS.dump_python([food for _, food in foods])):
+        row["last_updated"] = now
+        by_name[row["food_name"]] = (line, row)
+    return list(by_name.values()), len(foods), errors
+
+
+def read_chunks(stream: IO[str], fmt: str, chunk_size: int) -> Iterator[Tuple[List[Tuple[int, dict]], int, List[ImportRowError]]]:
+    """``_prepare`` results for ``chunk_size`` input records at a time."""
+    records = _records(stream, fmt)
+    while True:
+        batch = []
+        for item in records:
+            batch.append(item)
+            if len(batch) >= chunk_size:
+                break
+        if not batch:
+            return
+        yield _prepare(batch, datetime.utcnow())
+
+
+def _upsert(rows: List[dict]):
+    stmt = insert(_TABLE).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[_TABLE.c.food_name],
+        set_={name: stmt.excluded[name] for name in _UPDATE_COLUMNS},
+    )
+
+
+async def _write(db: AsyncSession, rows: List[Tuple[int, dict]], report: ImportReport) -> int:
+    """Upsert ``rows``, returns how many the database refused."""
+    try:
+        async with db.begin_nested():
+            await db.execute(_upsert([row for _, row in rows]))
+        return 0
+    except DBAPIError:
+        pass
+    # e.g. an id already used by another food: isolate the offending rows
+    failed = 0
+    for line, row in rows:
+        try:
+            async with db.begin_nested():
+                await db.execute(_upsert([row]))
+        except DBAPIError as e:
+            failed += 1
+            _reject(report, [ImportRowError(line=line, detail=str(e.orig))])
+    return failed
+
+
+def _reject(report: ImportReport, errors: List[ImportRowError]) -> None:
+    report.rejected += len(errors)
+    room = MAX_REPORTED_ERRORS - len(report.errors)
+    if room > 0:
+        report.errors.extend(errors[:room])
+
+
+async def import_foods(db: AsyncSession, stream: IO[str], fmt: str, chunk_size: Optional[int] = None) -> ImportReport:
+    """Load every record of ``stream`` and commit; rejects are counted, not fatal.
+
+    Raises ``ImportFileError``, after rolling back, when the file itself cannot be read.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}")
+    report = ImportReport(format=fmt)
+    started = time.perf_counter()
+    chunk_size = min(chunk_size or settings.nutrition_import_chunk_size, MAX_CHUNK_SIZE)
+    chunks = read_chunks(stream, fmt, chunk_size)
+    # parsing and validation are CPU bound: a worker thread prepares the next
+    # chunk while the current one is being written
+    upcoming = asyncio.ensure_future(asyncio.to_thread(next, chunks, None))
+    try:
+        while True:
+            chunk = await upcoming
+            if chunk is None:
+                break
+            upcoming = asyncio.ensure_future(asyncio.to_thread(next, chunks, None))
+            rows, valid, errors = chunk
+            _reject(report, errors)
+            # repeated food names in a chunk were folded into one row, each counts as accepted
+            report.accepted += valid - (await _write(db, rows, report) if rows else 0)
+    except ImportFileError:
+        await db.rollback()
+        raise
+    finally:
+        upcoming.cancel()
+    await db.commit()
+    report.seconds = round(time.perf_counter() - started, 3)
+    report.rows_per_second = round((report.accepted + report.rejected) / report.seconds, 1) if report.seconds else 0.0
+    return report
+
+
+def text_stream(binary: IO[bytes]) -> IO[str]:
+    # utf-8-sig drops the BOM spreadsheet exports put in front of the header
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+
+async def _main(path: str, fmt: Optional[str], chunk_size: Optional[int]) -> None:
+    with open(path, "rb") as binary:
+        async with SessionLocal() as db:
+            report = await import_foods(db, text_stream(binary), fmt or detect_format(path), chunk_size)
+    await engine.dispose()
+    for error in report.errors:
+        print(f"line {error.line}: {error.detail}")
+    print(f"{report.accepted} rows written, {report.rejected} rejected in {report.seconds}s ({report.rows_per_second} rows/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load foods into nutrition_database from CSV or JSON Lines")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    parser.add_argument("--chunk-size", type=int)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_main(args.path, args.format, args.chunk_size))
+    except ImportFileError as e:
+        raise SystemExit(f"{args.path}: {e}")
+
+
+if __name__ == "__main__":
+    main()
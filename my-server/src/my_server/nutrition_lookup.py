@@ -0,0 +1,36 @@
+from typing import Dict, Iterable, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .cache import TTLCache
+from .schema.nutrition_database import NutritionDatabase, NutritionDatabaseORM
+from .settings import settings
+
+# food_name -> NutritionDatabase, or None for a name the table does not know
+nutrition_cache = TTLCache("nutrition", maxsize=settings.nutrition_cache_size, ttl=settings.nutrition_cache_ttl)
+
+_MISS = object()
+
+
+async def lookup_foods(db: AsyncSession, names: Iterable[str]) -> Dict[str, Optional[NutritionDatabase]]:
+    """Nutrition rows by exact food_name, hot foods from the LRU, the rest in one query."""
+    found: Dict[str, Optional[NutritionDatabase]] = {}
+    missing = []
+    for name in set(names):
+        cached = nutrition_cache.get(name, _MISS)
+        if cached is _MISS:
+            missing.append(name)
+        else:
+            found[name] = cached
+    if missing:
+        result = await db.execute(select(NutritionDatabaseORM.__table__).where(NutritionDatabaseORM.food_name.in_(missing)))
+        loaded = {row["food_name"]: NutritionDatabase.model_validate(dict(row)) for row in result.mappings()}
+        for name in missing:
+            # unknown names are cached too, so a typo in a meal is not a query every time
+            found[name] = loaded.get(name)
+            nutrition_cache.set(name, found[name])
+    return found
+
+
+def forget_food(name: Optional[str]) -> None:
+    if name is not None:
+        nutrition_cache.pop(name)
@@ -0,0 +1,158 @@
+"""Request scoped SQL profiler, for debugging and for query budgets in tests.
+
+Off unless ``QUERY_PROFILER=1``: then the engine gets cursor listeners
+(``attach``) and the app ``QueryProfilerMiddleware``; when off neither is
+installed and nothing runs per statement. Each request collects every
+statement with the shape of its parameters, its duration and the row count
+the driver reports (None if it reports none), and its response carries
+
+    X-Query-Count: 4
+    Server-Timing: db;dur=3.1;desc="4 queries", app;dur=7.9
+
+Statements slower than ``SLOW_QUERY_SECONDS`` are logged with the route that
+ran them. In tests, ``query_budget`` fails when any request (or direct call)
+inside the block ran more statements than allowed:
+
+    query_profiler.attach(auth_module.engine)
+    with query_budget(3) as profiles:
+        client.get("/dashboard")
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, List, Optional
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .request_metrics import route_label
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryRecord:
+    statement: str
+    parameters: str
+    seconds: float
+    rows: Optional[int]
+
+
+@dataclass
+class QueryProfile:
+    route: str = "-"
+    queries: List[QueryRecord] = field(default_factory=list)
+    scope: Optional[Scope] = None
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def seconds(self) -> float:
+        return sum(query.seconds for query in self.queries)
+
+
+current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("current_profile", default=None)
+
+# profiles of finished requests go to every open query_budget block
+_collectors: List[List[QueryProfile]] = []
+
+
+def parameters_shape(parameters: Any, executemany: bool) -> str:
+    """Types of the bound values, never the values: ``(str, date)``, ``500 x (str, int)``."""
+    if executemany:
+        rows = list(parameters or ())
+        return f"{len(rows)} x {parameters_shape(rows[0], False)}" if rows else "0 x ()"
+    if isinstance(parameters, dict):
+        return "(" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + ")"
+    return "(" + ", ".join(type(value).__name__ for value in parameters or ()) + ")"
+
+
+def _row_count(cursor) -> Optional[int]:
+    # DBAPI rowcount, which is -1 when the driver does not know
+    rowcount = getattr(cursor, "rowcount", -1)
+    return rowcount if rowcount is not None and rowcount >= 0 else None
+
+
+def _before(conn, cursor, statement, parameters, context, executemany):
+    context._profiler_started = time.perf_counter()
+
+
+def _after(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    if profile is None:
+        return
+    elapsed = time.perf_counter() - context._profiler_started
+    if profile.scope is not None:
+        profile.route = route_label(profile.scope)
+    profile.queries.append(QueryRecord(statement, parameters_shape(parameters, executemany), elapsed, _row_count(cursor)))
+    if elapsed >= settings.slow_query_seconds:
+        logger.warning("Slow query (%.1f ms) in %s: %s %s", elapsed * 1000, profile.route, " ".join(statement.split()), parameters_shape(parameters, executemany))
+
+
+def attach(engine) -> None:
+    """Install the listeners on ``engine`` (an AsyncEngine or Engine); safe to call again."""
+    engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(engine, "after_cursor_execute", _after):
+        event.listen(engine, "before_cursor_execute", _before)
+        event.listen(engine, "after_cursor_execute", _after)
+
+
+class QueryProfilerMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profile = QueryProfile(scope=scope)
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - started
+                headers = MutableHeaders(scope=message)
+                headers["X-Query-Count"] = str(profile.count)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={profile.seconds * 1000:.1f};desc="{profile.count} queries", app;dur={elapsed * 1000:.1f}',
+                )
+            await send(message)
+
+        token = current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            profile.route = route_label(scope)
+            profile.scope = None
+            for collected in _collectors:
+                collected.append(profile)
+
+
+@contextmanager
+def query_budget(max_queries: Optional[int] = None) -> Iterator[List[QueryProfile]]:
+    """Collect the profiles of the requests finished inside the block, and of statements run directly in it.
+
+    With ``max_queries`` the block fails if any of them ran more statements.
+    """
+    collected: List[QueryProfile] = []
+    direct = QueryProfile(route="(direct)")
+    token = current_profile.set(direct)
+    _collectors.append(collected)
+    try:
+        yield collected
+    finally:
+        _collectors.remove(collected)
+        current_profile.reset(token)
+        if direct.queries:
+            collected.append(direct)
+    if max_queries is not None:
+        over = [profile for profile in collected if profile.count > max_queries]
+        if over:
+            details = "; ".join(f"{profile.route}: {profile.count}" for profile in over)
+            raise AssertionError(f"Query budget of {max_queries} exceeded ({details})")
@@ -0,0 +1,195 @@
+"""Server side reminders for the notification_settings flags.
+
+Every enabled flag of a user is one ``reminder_jobs`` row holding the next
+time it is due. Each worker runs a ``ReminderScheduler``: every poll it takes
+the jobs due by then in batches of ``reminder_batch_size`` with one
+statement per batch, which locks them FOR UPDATE SKIP LOCKED (so workers
+split the bucket between them instead of delivering twice), moves their
+``due_at`` to the next occurrence after now and returns them. The batch goes
+to the sink before the transaction commits; if delivery fails the
+transaction rolls back and the jobs are due again on the next poll. The scan
+runs on the due_at index, so a poll costs the reminders that are due, not
+the number of users.
+
+``schedule`` keeps the jobs in step with the settings: the notification
+settings routes and /sync/batch call it for the writer, and to build the
+jobs of every user (first deployment, repair):
+
+    python -m my_server.reminders
+"""
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import DateTime, Integer, String, and_, case, column, delete, exists, func, literal, literal_column, select, true, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from .database import SessionLocal, engine
+from .metrics import REGISTRY
+from .schema.notification_settings import NotificationSettingsORM
+from .schema.reminders import ReminderJobORM
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Reminder kind -> the notification_settings flag enabling it, and how often it repeats
+REMINDER_KINDS = {
+    "water": ("water_reminder_enabled", timedelta(hours=2)),
+    "exercise": ("exercise_reminder_enabled", timedelta(days=1)),
+    "meal": ("meal_logging_enabled", timedelta(hours=6)),
+    "sleep": ("sleep_reminder_enabled", timedelta(days=1)),
+}
+
+ONE_SECOND = literal_column("interval '1 second'")
+
+REMINDERS_DELIVERED = REGISTRY.counter("reminders_delivered_total", "Reminders handed to the delivery sink", ("kind",))
+REMINDER_BATCH_FAILURES = REGISTRY.counter("reminder_batch_failures_total", "Reminder batches rolled back (retried on the next poll)")
+
+
+@dataclass(frozen=True)
+class Reminder:
+    user_id: str
+    kind: str
+    due_at: datetime
+
+
+class ReminderSink:
+    """Where due reminders go (push service, e-mail, ...); ``deliver`` raising retries the whole batch."""
+
+    async def deliver(self, reminders: List[Reminder]) -> None:
+        raise NotImplementedError
+
+
+class LoggingSink(ReminderSink):
+    async def deliver(self, reminders):
+        logger.info("%d reminders due", len(reminders))
+
+
+class MemorySink(ReminderSink):
+    """Keeps what it was given, for tests and local runs."""
+
+    def __init__(self):
+        self.delivered: List[Reminder] = []
+
+    async def deliver(self, reminders):
+        self.delivered.extend(reminders)
+
+
+SINKS = {"log": LoggingSink, "memory": MemorySink}
+
+
+def _latest_settings(user_id: Optional[str]):
+    """One settings row per user (the last updated one), of one user or everyone."""
+    table = NotificationSettingsORM.__table__
+    stmt = select(table.c.user_id, *(table.c[flag] for flag, _ in REMINDER_KINDS.values()))
+    if user_id is not None:
+        stmt = stmt.where(table.c.user_id == user_id)
+    return stmt.distinct(table.c.user_id).order_by(
+        table.c.user_id, table.c.updated_at.desc().nulls_last()
+    ).subquery("latest")
+
+
+async def schedule(db: AsyncSession, user_id: Optional[str] = None) -> None:
+    """Make the jobs of ``user_id`` (everyone if None) match the flags, in the caller's transaction.
+
+    Newly enabled kinds are first due one interval from now; kinds that stay
+    enabled keep their due_at; a flag left NULL counts as enabled, like the
+    column default.
+    """
+    jobs = ReminderJobORM.__table__
+    latest = _latest_settings(user_id)
+    kinds = values(column("kind", String), column("seconds", Integer), name="kinds").data(
+        [(kind, int(every.total_seconds())) for kind, (_, every) in REMINDER_KINDS.items()]
+    )
+    enabled = case(
+        {kind: func.coalesce(latest.c[flag], True) for kind, (flag, _) in REMINDER_KINDS.items()},
+        value=kinds.c.kind,
+    )
+    now = literal(datetime.utcnow(), DateTime)
+    wanted = select(latest.c.user_id, kinds.c.kind, kinds.c.seconds).select_from(latest).join(kinds, true()).where(enabled).subquery("wanted")
+    await db.execute(insert(jobs).from_select(
+        ["user_id", "kind", "due_at", "interval_seconds", "updated_at"],
+        select(wanted.c.user_id, wanted.c.kind, now + ONE_SECOND * wanted.c.seconds, wanted.c.seconds, now),
+    ).on_conflict_do_nothing(index_elements=[jobs.c.user_id, jobs.c.kind]))
+    scope = [jobs.c.user_id == user_id] if user_id is not None else []
+    await db.execute(delete(jobs).where(
+        *scope,
+        ~exists(select(wanted.c.user_id).where(wanted.c.user_id == jobs.c.user_id, wanted.c.kind == jobs.c.kind)),
+    ))
+
+
+def claim_due(batch_size: int):
+    """UPDATE ... RETURNING that takes up to ``batch_size`` due, unlocked jobs and moves them past now.
+
+    A job several intervals late is delivered once and moves to its next
+    slot in the future.
+    """
+    jobs = ReminderJobORM.__table__
+    now = literal(datetime.utcnow(), DateTime)
+    due = select(jobs.c.user_id, jobs.c.kind, jobs.c.due_at).where(
+        jobs.c.due_at <= now
+    ).order_by(jobs.c.due_at).limit(batch_size).with_for_update(skip_locked=True).subquery("due")
+    missed = func.floor(func.extract("epoch", now - due.c.due_at) / jobs.c.interval_seconds) + 1
+    return update(jobs).where(
+        and_(jobs.c.user_id == due.c.user_id, jobs.c.kind == due.c.kind)
+    ).values(
+        due_at=due.c.due_at + ONE_SECOND * jobs.c.interval_seconds * missed,
+        updated_at=now,
+    ).returning(jobs.c.user_id, jobs.c.kind, due.c.due_at)
+
+
+class ReminderScheduler:
+    def __init__(self, sink: ReminderSink, batch_size: int, poll_seconds: float):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+
+    async def run_once(self, sessionmaker: async_sessionmaker) -> int:
+        """Deliver everything due now; returns how many reminders went out."""
+        sent = 0
+        while True:
+            async with sessionmaker() as db:
+                try:
+                    rows = (await db.execute(claim_due(self.batch_size))).all()
+                    reminders = [Reminder(row.user_id, row.kind, row.due_at) for row in rows]
+                    if reminders:
+                        await self.sink.deliver(reminders)
+                    await db.commit()
+                except Exception:
+                    # closing the session rolls the claim back
+                    REMINDER_BATCH_FAILURES.inc()
+                    logger.exception("Reminder batch failed, retrying on the next poll")
+                    return sent
+            for reminder in reminders:
+                REMINDERS_DELIVERED.inc(kind=reminder.kind)
+            sent += len(reminders)
+            if len(reminders) < self.batch_size:
+                return sent
+
+    async def run(self, sessionmaker: async_sessionmaker) -> None:
+        while True:
+            await self.run_once(sessionmaker)
+            await asyncio.sleep(self.poll_seconds)
+
+
+reminder_scheduler = ReminderScheduler(SINKS[settings.reminder_sink](), settings.reminder_batch_size, settings.reminder_poll_seconds)
+
+
+async def rebuild() -> None:
+    async with SessionLocal() as db:
+        await schedule(db)
+        await db.commit()
+        count = (await db.execute(select(func.count()).select_from(ReminderJobORM))).scalar_one()
+    print(f"{count} reminder jobs scheduled")
+    await engine.dispose()
+
+
+def main() -> None:
+    argparse.ArgumentParser(description="Create the reminder_jobs of every user from notification_settings").parse_args()
+    asyncio.run(rebuild())
+
+
+if __name__ == "__main__":
+    main()
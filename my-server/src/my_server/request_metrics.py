@@ -0,0 +1,104 @@
+"""Per-route request metrics and per-request database query counts.
+
+``MetricsMiddleware`` records, for every HTTP request, the count by status,
+the latency, the response size on the wire and the number in flight. The
+``route`` label is the matched path template (``/water_intake_logs/{item_id}``),
+never the raw path, so ids do not create series.
+
+``instrument_engine`` hooks the engine's cursor events: every statement is
+counted and timed, and when it runs inside a request the totals are added to
+that request's ``QueryStats`` (a context variable the middleware sets up;
+SQLAlchemy runs the sync events in the caller's context). Routes whose
+``http_request_db_queries`` histogram sits in the high buckets are the ones
+issuing a query per row or a re-read after each write.
+"""
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .metrics import REGISTRY
+
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+REQUESTS = REGISTRY.counter("http_requests_total", "HTTP requests by route, method and status", ("method", "route", "status"))
+REQUEST_SECONDS = REGISTRY.histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+RESPONSE_BYTES = REGISTRY.histogram("http_response_size_bytes", "Response body size as sent (after compression)", ("method", "route"), buckets=SIZE_BUCKETS)
+IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "HTTP requests being handled")
+REQUEST_QUERIES = REGISTRY.histogram("http_request_db_queries", "SQL statements executed per HTTP request", ("method", "route"), buckets=QUERY_COUNT_BUCKETS)
+REQUEST_QUERY_SECONDS = REGISTRY.histogram("http_request_db_seconds", "Time per HTTP request spent executing SQL", ("method", "route"))
+QUERIES = REGISTRY.counter("db_queries_total", "SQL statements executed (requests and background tasks)")
+QUERY_SECONDS = REGISTRY.histogram("db_query_duration_seconds", "Execution time of single SQL statements")
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+
+
+current_queries: ContextVar[Optional[QueryStats]] = ContextVar("current_queries", default=None)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count and time the statements of ``engine`` (the ``sync_engine`` of an AsyncEngine)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        QUERIES.inc()
+        QUERY_SECONDS.observe(elapsed)
+        stats = current_queries.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+
+
+def route_label(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        stats = QueryStats()
+        token = current_queries.set(stats)
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.dec()
+            current_queries.reset(token)
+            # the router stored the matched route in the scope on the way in
+            labels = {"method": scope["method"], "route": route_label(scope)}
+            REQUESTS.inc(status=status, **labels)
+            REQUEST_SECONDS.observe(elapsed, **labels)
+            RESPONSE_BYTES.observe(size, **labels)
+            REQUEST_QUERIES.observe(stats.count, **labels)
+            REQUEST_QUERY_SECONDS.observe(stats.seconds, **labels)
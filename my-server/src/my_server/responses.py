@@ -0,0 +1,71 @@
+"""Building and serializing response models.
+
+The resource models are ``from_attributes`` models, so handlers return the
+ORM object itself and FastAPI validates it against the response_model once,
+instead of the handler copying it into a model that FastAPI then dumps and
+validates again. ``to_models`` does the same conversion where models are
+needed in code.
+
+List endpoints read ``select_rows`` tuples and return ``model_list_response``:
+the rows are validated in one call and pydantic-core writes the JSON bytes
+directly, skipping FastAPI's response_model pass and ``json.dumps``.
+``FastJSONResponse`` is the app's default response class and renders
+everything else with orjson when it is installed
+(``pip install my-server[speedups]``), falling back to compact ``json.dumps``.
+"""
+import json
+from functools import lru_cache
+from typing import Any, Iterable, List, Type, TypeVar
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Row, select
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def select_rows(orm):
+    """SELECT of every column of ``orm``'s table.
+
+    The result rows are plain named tuples: no ORM instances, identity map
+    entries or attribute instrumentation, which is most of the per-row cost
+    of reading a list. ``to_models``/``model_list_response`` accept them.
+    """
+    return select(*orm.__table__.columns)
+
+
+def _validation_input(rows: Iterable[Any]) -> List[Any]:
+    rows = list(rows)
+    if rows and isinstance(rows[0], Row):
+        # pydantic reads a dict faster than a Row's attributes
+        fields = rows[0]._fields
+        return [dict(zip(fields, row)) for row in rows]
+    return rows
+
+
+def to_models(model: Type[M], rows: Iterable[Any]) -> List[M]:
+    return _list_adapter(model).validate_python(_validation_input(rows), from_attributes=True)
+
+
+def model_list_response(response: Response, model: Type[BaseModel], rows: Iterable[Any]) -> Response:
+    """JSON response for ``rows`` (ORM objects or models), keeping headers set on the injected ``response`` (cursor, ETag)."""
+    adapter = _list_adapter(model)
+    body = adapter.dump_json(adapter.validate_python(_validation_input(rows), from_attributes=True))
+    return Response(body, media_type="application/json", headers=dict(response.headers))
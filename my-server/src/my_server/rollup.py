@@ -0,0 +1,206 @@
+"""The user_daily_summary rollup: one row per user per day with that day's totals.
+
+Writes to the log tables call ``refresh_daily_summary`` for the days they
+touched, inside their own transaction, so /stats/daily reads one primary key
+range instead of aggregating the logs, and goal progress moves by each day's
+change (``my_server.goals``). To backfill or repair the table and the goals:
+
+    python -m my_server.rollup            # every user
+    python -m my_server.rollup USER_ID    # one user
+"""
+import argparse
+import asyncio
+from datetime import date, datetime
+from typing import Iterable, List, Optional, Set
+from sqlalchemy import ARRAY, Date, DateTime, Float, and_, case, delete, func, literal, select, union
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import SessionLocal, engine
+from .events import LogEvent, stage
+from .goals import apply_day_changes, recompute_goals
+from .schema.stats import UserDailySummaryORM
+from .schema.water_intake_logs import WaterIntakeLogORM
+from .schema.exercise_logs import ExerciseLogORM
+from .schema.sleep_logs import SleepLogORM
+from .schema.food_logs import FoodLogORM
+from .schema.meals import MealORM
+
+# First key of the pg_advisory_xact_lock(int, int) pair, the second is the user
+ROLLUP_LOCK_NAMESPACE = 4242
+
+SUMMARY_COLUMNS = ("water_count", "exercise_minutes", "exercise_calories", "sleep_hours", "meal_count")
+
+# Tables whose rows feed the rollup, and the date column that places a row on a day
+DATED_TABLES = (
+    (WaterIntakeLogORM, WaterIntakeLogORM.date),
+    (ExerciseLogORM, ExerciseLogORM.date),
+    (SleepLogORM, SleepLogORM.date),
+    (FoodLogORM, FoodLogORM.date),
+)
+
+
+def _sleep_seconds():
+    """Seconds between bed_time and wake_time, a wake time before the bed time means the next morning."""
+    bed = func.extract("epoch", SleepLogORM.bed_time)
+    wake = func.extract("epoch", SleepLogORM.wake_time)
+    return case((wake >= bed, wake - bed), else_=wake - bed + 86400)
+
+
+def aggregate_days_query(user_id: str, days, date_from: date, date_to: date):
+    """Totals from the log tables for each ``days.c.day`` (all within date_from..date_to).
+
+    Each log table is grouped by date over its (user_id, date) index and left
+    joined onto ``days``, so days without logs come back as zeros.
+    """
+    water = select(
+        WaterIntakeLogORM.date.label("day"),
+        func.sum(WaterIntakeLogORM.count).label("water_count"),
+    ).where(
+        WaterIntakeLogORM.user_id == user_id,
+        WaterIntakeLogORM.date.between(date_from, date_to),
+    ).group_by(WaterIntakeLogORM.date).subquery("water")
+
+    exercise = select(
+        ExerciseLogORM.date.label("day"),
+        func.sum(ExerciseLogORM.duration).label("exercise_minutes"),
+        func.sum(ExerciseLogORM.calories_burned).label("exercise_calories"),
+    ).where(
+        ExerciseLogORM.user_id == user_id,
+        ExerciseLogORM.date.between(date_from, date_to),
+    ).group_by(ExerciseLogORM.date).subquery("exercise")
+
+    sleep = select(
+        SleepLogORM.date.label("day"),
+        (func.sum(_sleep_seconds()) / 3600.0).label("sleep_hours"),
+    ).where(
+        SleepLogORM.user_id == user_id,
+        SleepLogORM.date.between(date_from, date_to),
+    ).group_by(SleepLogORM.date).subquery("sleep")
+
+    # meals carry no date of their own, they belong to the day of their food log
+    meals = select(
+        FoodLogORM.date.label("day"),
+        func.count(MealORM.id).label("meal_count"),
+    ).join(MealORM, and_(MealORM.food_log_id == FoodLogORM.id, MealORM.user_id == user_id)).where(
+        FoodLogORM.user_id == user_id,
+        FoodLogORM.date.between(date_from, date_to),
+    ).group_by(FoodLogORM.date).subquery("meals")
+
+    return select(
+        days.c.day,
+        func.coalesce(water.c.water_count, 0).label("water_count"),
+        func.coalesce(exercise.c.exercise_minutes, 0).label("exercise_minutes"),
+        func.coalesce(exercise.c.exercise_calories, 0).label("exercise_calories"),
+        func.coalesce(sleep.c.sleep_hours, 0).cast(Float).label("sleep_hours"),
+        func.coalesce(meals.c.meal_count, 0).label("meal_count"),
+    ).select_from(days).outerjoin(
+        water, water.c.day == days.c.day
+    ).outerjoin(
+        exercise, exercise.c.day == days.c.day
+    ).outerjoin(
+        sleep, sleep.c.day == days.c.day
+    ).outerjoin(
+        meals, meals.c.day == days.c.day
+    )
+
+
+def _upsert_from(user_id: str, aggregate):
+    rows = aggregate.subquery("totals")
+    table = UserDailySummaryORM.__table__
+    stmt = insert(table).from_select(
+        ["user_id", "date", *SUMMARY_COLUMNS, "updated_at"],
+        select(literal(user_id), rows.c.day, *(rows.c[name] for name in SUMMARY_COLUMNS), literal(datetime.utcnow(), DateTime)),
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.date],
+        set_={name: stmt.excluded[name] for name in (*SUMMARY_COLUMNS, "updated_at")},
+    )
+
+
+async def lock_user(db: AsyncSession, user_id: str) -> None:
+    """Serialize, until commit, the transactions that change the user's summary rows or goal progress."""
+    await db.execute(select(func.pg_advisory_xact_lock(ROLLUP_LOCK_NAMESPACE, func.hashtext(user_id))))
+
+
+async def refresh_daily_summary(db: AsyncSession, user_id: str, days: Iterable[Optional[date]]) -> None:
+    """Recompute the summary rows of ``days`` for one user, in the caller's transaction.
+
+    Call after the log rows are written and before commit. The advisory lock
+    makes concurrent writers for the same user take turns, and each recompute
+    statement starts after the previous writer committed, so no write is lost.
+    The days' totals from before and after go to ``apply_day_changes``.
+    """
+    days = sorted({day for day in days if day is not None})
+    if not days:
+        return
+    await db.flush()
+    await lock_user(db, user_id)
+    summary = UserDailySummaryORM.__table__
+    before = await db.execute(select(summary).where(summary.c.user_id == user_id, summary.c.date.in_(days)))
+    before = {row["date"]: row for row in before.mappings()}
+    listed = select(func.unnest(literal(days, ARRAY(Date))).label("day")).subquery("days")
+    after = await db.execute(_upsert_from(user_id, aggregate_days_query(user_id, listed, days[0], days[-1])).returning(*summary.columns))
+    await apply_day_changes(db, user_id, before, {row["date"]: row for row in after.mappings()})
+    stage(db, (LogEvent(user_id, day) for day in days))
+
+
+async def days_of(db: AsyncSession, resource: str, user_id: str, ids: Iterable[str]) -> Set[date]:
+    """Days the given rows of a log table count towards (empty for other resources)."""
+    ids = list(ids)
+    if not ids:
+        return set()
+    if resource == "meals":
+        stmt = select(FoodLogORM.date).join(MealORM, MealORM.food_log_id == FoodLogORM.id).where(
+            MealORM.user_id == user_id, MealORM.id.in_(ids)
+        )
+    else:
+        dated = {orm.__tablename__: (orm, column) for orm, column in DATED_TABLES}.get(resource)
+        if dated is None:
+            return set()
+        orm, column = dated
+        stmt = select(column).where(orm.user_id == user_id, orm.id.in_(ids))
+    return set((await db.execute(stmt.distinct())).scalars())
+
+
+async def rebuild_user(db: AsyncSession, user_id: str) -> int:
+    """Replace all summary rows of one user with totals computed from the logs."""
+    await lock_user(db, user_id)
+    await db.execute(delete(UserDailySummaryORM).where(UserDailySummaryORM.user_id == user_id))
+    days = union(*(select(column.label("day")).where(orm.user_id == user_id) for orm, column in DATED_TABLES)).subquery("days")
+    bounds = (await db.execute(select(func.min(days.c.day), func.max(days.c.day)))).one()
+    rebuilt = 0
+    if bounds[0] is not None:
+        result = await db.execute(_upsert_from(user_id, aggregate_days_query(user_id, days, bounds[0], bounds[1])))
+        rebuilt = result.rowcount
+    await recompute_goals(db, user_id)
+    return rebuilt
+
+
+async def rebuild(user_ids: Optional[List[str]] = None) -> None:
+    async with SessionLocal() as db:
+        if not user_ids:
+            users = union(*(select(orm.user_id) for orm, _ in DATED_TABLES))
+            user_ids = list((await db.execute(users)).scalars())
+    started = datetime.now()
+    total = 0
+    for number, user_id in enumerate(user_ids, 1):
+        # one transaction per user keeps locks short on a live database
+        async with SessionLocal() as db:
+            total += await rebuild_user(db, user_id)
+            await db.commit()
+        if number % 1000 == 0:
+            print(f"{number}/{len(user_ids)} users, {total} days")
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"Rebuilt {total} days for {len(user_ids)} users in {elapsed:.1f}s")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild user_daily_summary from the log tables")
+    parser.add_argument("user_ids", nargs="*", help="only these users (default: everyone with logs)")
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.user_ids))
+
+
+if __name__ == "__main__":
+    main()
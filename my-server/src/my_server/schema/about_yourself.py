@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
 from sqlalchemy import Column, String, DateTime
@@ -15,6 +15,8 @@ class AboutYourselfORM(Base):
     updated_at = Column("updated_at", DateTime)
 
 class AboutYourself(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     user_id: Optional[str] = None  # Server will set this from token
     health_description: Optional[str] = None
@@ -1,15 +1,45 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
+from sqlalchemy import Column, String, Integer, Boolean, Date, DateTime
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+class AchievementORM(Base):
+    __tablename__ = "achievements"
+    id = Column("id", String, primary_key=True)
+    user_id = Column("user_id", String, index=True)
+    type = Column("type", String)
+    name = Column("name", String)
+    description = Column("description", String)
+    target = Column("target", Integer)
+    current = Column("current", Integer)
+    achieved = Column("achieved", Boolean)
+    achieved_at = Column("achieved_at", DateTime)
+    created_at = Column("created_at", DateTime)
+    updated_at = Column("updated_at", DateTime)
+
+class AchievementCounterORM(Base):
+    """Progress of one user towards every achievement of one type, see ``my_server.achievement_engine``."""
+    __tablename__ = "achievement_counters"
+    user_id = Column("user_id", String, primary_key=True)
+    type = Column("type", String, primary_key=True)
+    value = Column("value", Integer, nullable=False, default=0)
+    last_day = Column("last_day", Date)
+    updated_at = Column("updated_at", DateTime)
 
 class Achievement(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
-    user_id: str
-    type: Optional[str]
-    name: Optional[str]
-    description: Optional[str]
-    target: Optional[int]
-    current: Optional[int]
-    achieved: Optional[bool]
-    achieved_at: Optional[datetime]
-    created_at: Optional[datetime]
+    user_id: Optional[str] = None  # Server will set this from token
+    type: Optional[str] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    target: Optional[int] = None
+    current: Optional[int] = None
+    achieved: Optional[bool] = None
+    achieved_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
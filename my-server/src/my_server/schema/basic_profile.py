@@ -1,7 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import date, datetime
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, Date, DateTime
+from sqlalchemy.dialects.postgresql import ENUM
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -12,8 +13,9 @@ class BasicProfileORM(Base):
     id = Column("id", String, primary_key=True)
     user_id = Column("user_id", String, index=True)
     full_name = Column("full_name", String)
-    date_of_birth = Column("date_of_birth", String)
-    gender = Column("gender", String)
+    date_of_birth = Column("date_of_birth", Date)
+    # asyncpg sends typed parameters, so the column must carry the pg enum type
+    gender = Column("gender", ENUM("male", "female", "other", name="gender", create_type=False))
     profile_image_url = Column("profile_image_url", String)
     phone_number = Column("phone_number", String)
     address = Column("address", String)
@@ -22,6 +24,8 @@ class BasicProfileORM(Base):
 
 
 class BasicProfile(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     # user_id is intentionally omitted from client payloads; server will set it from token
     full_name: Optional[str] = None
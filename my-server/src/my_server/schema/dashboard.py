@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import date
+from .basic_profile import BasicProfile
+from .physical_info import PhysicalInfo
+from .user_goals import UserGoal
+from .water_intake_logs import WaterIntakeLog
+from .exercise_logs import ExerciseLog
+from .sleep_logs import SleepLog
+from .achievements import Achievement
+
+
+class DashboardSnapshot(BaseModel):
+    date: date
+    profile: Optional[BasicProfile] = None
+    physical_info: Optional[PhysicalInfo] = None
+    goals: List[UserGoal] = Field(default_factory=list)  # active goals only
+    water: Optional[WaterIntakeLog] = None
+    exercise: List[ExerciseLog] = Field(default_factory=list)
+    sleep: Optional[SleepLog] = None
+    achievements: List[Achievement] = Field(default_factory=list)
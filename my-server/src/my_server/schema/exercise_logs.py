@@ -1,14 +1,33 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import date, datetime
+from sqlalchemy import Column, String, Date, Integer, Float, DateTime
+from sqlalchemy.dialects.postgresql import ENUM
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+class ExerciseLogORM(Base):
+    __tablename__ = "exercise_logs"
+    id = Column("id", String, primary_key=True)
+    user_id = Column("user_id", String, index=True)
+    date = Column("date", Date, nullable=False)
+    activity_type = Column("activity_type", ENUM("walking", "running", "cycling", "swimming", "yoga", "other", name="activity_type", create_type=False))
+    duration = Column("duration", Integer)
+    calories_burned = Column("calories_burned", Float)
+    notes = Column("notes", String)
+    created_at = Column("created_at", DateTime)
+    updated_at = Column("updated_at", DateTime)
 
 class ExerciseLog(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
-    user_id: str
+    user_id: Optional[str] = None  # Server will set this from token
     date: date
-    activity_type: Optional[str]
-    duration: Optional[int]
-    calories_burned: Optional[float]
-    notes: Optional[str]
-    created_at: Optional[datetime]
-    updated_at: Optional[datetime]
+    activity_type: Optional[str] = None
+    duration: Optional[int] = None
+    calories_burned: Optional[float] = None
+    notes: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
@@ -1,10 +1,52 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ConfigDict
+from typing import Dict, List, Optional
 from datetime import date, datetime
+from sqlalchemy import Column, String, Date, Integer, DateTime
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+class FoodLogORM(Base):
+    __tablename__ = "food_logs"
+    id = Column("id", String, primary_key=True)
+    user_id = Column("user_id", String, index=True)
+    date = Column("date", Date, nullable=False)
+    last_modified = Column("last_modified", DateTime)
+    meal_count = Column("meal_count", Integer)
 
 class FoodLog(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
-    user_id: str
+    user_id: Optional[str] = None  # Server will set this from token
+    date: date
+    last_modified: Optional[datetime] = None
+    meal_count: Optional[int] = None
+
+class NutritionTotals(BaseModel):
+    calories: float = 0.0
+    protein: float = 0.0
+    carbs: float = 0.0
+    fat: float = 0.0
+    fiber: float = 0.0
+    sugar: float = 0.0
+
+class MealNutrition(BaseModel):
+    meal_id: str
+    food_name: Optional[str] = None
+    meal_type: Optional[str] = None
+    nutrition: Optional[NutritionTotals] = None  # None when food_name is not in nutrition_database
+
+class DayNutrition(BaseModel):
     date: date
-    last_modified: Optional[datetime]
-    meal_count: Optional[int]
+    food_log_id: str
+    totals: NutritionTotals
+    by_meal_type: Dict[str, NutritionTotals] = {}
+    meals: List[MealNutrition] = []
+    unmatched_foods: List[str] = []
+
+class NutritionRangeResponse(BaseModel):
+    date_from: date
+    date_to: date
+    totals: NutritionTotals
+    days: List[DayNutrition]  # only days with a food log
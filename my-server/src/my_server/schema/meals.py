@@ -1,13 +1,32 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects.postgresql import ENUM
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+class MealORM(Base):
+    __tablename__ = "meals"
+    id = Column("id", String, primary_key=True)
+    food_log_id = Column("food_log_id", String, nullable=False, index=True)
+    user_id = Column("user_id", String, index=True)
+    food_name = Column("food_name", String)
+    meal_type = Column("meal_type", ENUM("breakfast", "lunch", "dinner", "snack", name="meal_type", create_type=False))
+    image_url = Column("image_url", String)
+    # NOT NULL: the list endpoint pages on (user_id, created_at, id)
+    created_at = Column("created_at", DateTime, nullable=False)
+    updated_at = Column("updated_at", DateTime)
 
 class Meal(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     food_log_id: str
-    user_id: str
-    food_name: Optional[str]
-    meal_type: Optional[str]
-    image_url: Optional[str]
-    created_at: Optional[datetime]
-    updated_at: Optional[datetime]
+    user_id: Optional[str] = None  # Server will set this from token
+    food_name: Optional[str] = None
+    meal_type: Optional[str] = None
+    image_url: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
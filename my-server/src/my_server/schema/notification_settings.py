@@ -1,12 +1,28 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
+from sqlalchemy import Column, String, Boolean, DateTime
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+class NotificationSettingsORM(Base):
+    __tablename__ = "notification_settings"
+    id = Column("id", String, primary_key=True)
+    user_id = Column("user_id", String, index=True)
+    water_reminder_enabled = Column("water_reminder_enabled", Boolean)
+    exercise_reminder_enabled = Column("exercise_reminder_enabled", Boolean)
+    meal_logging_enabled = Column("meal_logging_enabled", Boolean)
+    sleep_reminder_enabled = Column("sleep_reminder_enabled", Boolean)
+    updated_at = Column("updated_at", DateTime)
 
 class NotificationSettings(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
-    user_id: str
-    water_reminder_enabled: Optional[bool]
-    exercise_reminder_enabled: Optional[bool]
-    meal_logging_enabled: Optional[bool]
-    sleep_reminder_enabled: Optional[bool]
-    updated_at: Optional[datetime]
+    user_id: Optional[str] = None  # Server will set this from token
+    water_reminder_enabled: Optional[bool] = None
+    exercise_reminder_enabled: Optional[bool] = None
+    meal_logging_enabled: Optional[bool] = None
+    sleep_reminder_enabled: Optional[bool] = None
+    updated_at: Optional[datetime] = None
@@ -1,14 +1,34 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
+from sqlalchemy import Column, String, Float, DateTime
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+class NutritionDatabaseORM(Base):
+    """Shared food reference table, not owned by any user."""
+    __tablename__ = "nutrition_database"
+    id = Column("id", String, primary_key=True)
+    food_name = Column("food_name", String, nullable=False, unique=True)
+    calories = Column("calories", Float)
+    protein = Column("protein", Float)
+    carbs = Column("carbs", Float)
+    fat = Column("fat", Float)
+    fiber = Column("fiber", Float)
+    sugar = Column("sugar", Float)
+    # NOT NULL: the list endpoint pages on (last_updated, id)
+    last_updated = Column("last_updated", DateTime, nullable=False)
 
 class NutritionDatabase(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     food_name: str
-    calories: Optional[float]
-    protein: Optional[float]
-    carbs: Optional[float]
-    fat: Optional[float]
-    fiber: Optional[float]
-    sugar: Optional[float]
-    last_updated: Optional[datetime]
+    calories: Optional[float] = None
+    protein: Optional[float] = None
+    carbs: Optional[float] = None
+    fat: Optional[float] = None
+    fiber: Optional[float] = None
+    sugar: Optional[float] = None
+    last_updated: Optional[datetime] = None
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
 from sqlalchemy import Column, String, Float, DateTime
@@ -14,11 +14,15 @@ class PhysicalInfoORM(Base):
     height = Column("height", Float)
     activity_level = Column("activity_level", String)
     created_at = Column("created_at", DateTime)
+    updated_at = Column("updated_at", DateTime)
 
 class PhysicalInfo(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     user_id: Optional[str] = None  # Server will set this from token
     weight: Optional[float] = None
     height: Optional[float] = None
     activity_level: Optional[str] = None
     created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
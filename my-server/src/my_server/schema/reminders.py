@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+
+class ReminderJobORM(Base):
+    """The next reminder of one kind for one user, see ``my_server.reminders``."""
+    __tablename__ = "reminder_jobs"
+    user_id = Column("user_id", String, primary_key=True)
+    kind = Column("kind", String, primary_key=True)
+    due_at = Column("due_at", DateTime, nullable=False)
+    interval_seconds = Column("interval_seconds", Integer, nullable=False)
+    updated_at = Column("updated_at", DateTime)
@@ -1,14 +1,33 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import date, time, datetime
+from sqlalchemy import Column, String, Date, Time, DateTime
+from sqlalchemy.dialects.postgresql import ENUM
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+class SleepLogORM(Base):
+    __tablename__ = "sleep_logs"
+    id = Column("id", String, primary_key=True)
+    user_id = Column("user_id", String, index=True)
+    date = Column("date", Date, nullable=False)
+    bed_time = Column("bed_time", Time)
+    wake_time = Column("wake_time", Time)
+    sleep_quality = Column("sleep_quality", ENUM("very_poor", "poor", "average", "good", "excellent", name="sleep_quality", create_type=False))
+    notes = Column("notes", String)
+    created_at = Column("created_at", DateTime)
+    updated_at = Column("updated_at", DateTime)
 
 class SleepLog(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
-    user_id: str
+    user_id: Optional[str] = None  # Server will set this from token
     date: date
-    bed_time: Optional[time]
-    wake_time: Optional[time]
-    sleep_quality: Optional[str]
-    notes: Optional[str]
-    created_at: Optional[datetime]
-    updated_at: Optional[datetime]
+    bed_time: Optional[time] = None
+    wake_time: Optional[time] = None
+    sleep_quality: Optional[str] = None
+    notes: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import date
+from sqlalchemy import Column, String, Date, Integer, Float, DateTime
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+
+class DailyStats(BaseModel):
+    date: date
+    water_count: int = 0
+    exercise_minutes: int = 0
+    exercise_calories: float = 0.0
+    sleep_hours: float = 0.0
+    meal_count: int = 0
+
+
+class DailyStatsResponse(BaseModel):
+    date_from: date
+    date_to: date
+    days: List[DailyStats]  # one entry per day in the range, zeros where nothing was logged
+
+
+class UserDailySummaryORM(Base):
+    """Per user, per day totals kept in step with the log tables by ``my_server.rollup``."""
+    __tablename__ = "user_daily_summary"
+    user_id = Column("user_id", String, primary_key=True)
+    date = Column("date", Date, primary_key=True)
+    water_count = Column("water_count", Integer, nullable=False, default=0)
+    exercise_minutes = Column("exercise_minutes", Integer, nullable=False, default=0)
+    exercise_calories = Column("exercise_calories", Float, nullable=False, default=0)
+    sleep_hours = Column("sleep_hours", Float, nullable=False, default=0)
+    meal_count = Column("meal_count", Integer, nullable=False, default=0)
+    updated_at = Column("updated_at", DateTime)
@@ -0,0 +1,49 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+
+class SyncTombstoneORM(Base):
+    """One row per deleted record, so /sync/changes can report deletions."""
+    __tablename__ = "sync_tombstones"
+    resource = Column("resource", String, primary_key=True)
+    id = Column("id", String, primary_key=True)
+    user_id = Column("user_id", String, index=True)
+    deleted_at = Column("deleted_at", DateTime)
+
+
+class SyncOperation(BaseModel):
+    resource: str  # router path, e.g. "water_intake_logs"
+    op: Literal["upsert", "delete"]
+    id: Optional[str] = None  # required for delete; upserts take it from data["id"]
+    data: Optional[Dict[str, Any]] = None  # full record, same shape as the resource's POST body
+
+
+class SyncBatchRequest(BaseModel):
+    operations: List[SyncOperation] = Field(default_factory=list)
+
+
+class SyncItemResult(BaseModel):
+    index: int
+    resource: str
+    id: Optional[str] = None
+    status: int
+    detail: Optional[str] = None
+
+
+class SyncBatchResponse(BaseModel):
+    results: List[SyncItemResult]
+
+
+class SyncResourceChanges(BaseModel):
+    upserted: List[Dict[str, Any]] = Field(default_factory=list)
+    deleted: List[str] = Field(default_factory=list)
+
+
+class SyncChangesResponse(BaseModel):
+    changes: Dict[str, SyncResourceChanges]
+    cursor: str  # opaque, pass back as ?since= on the next call
+    has_more: bool = False
@@ -1,15 +1,37 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import date, datetime
+from sqlalchemy import Column, String, Float, Date, Boolean, DateTime
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+class UserGoalORM(Base):
+    __tablename__ = "user_goals"
+    id = Column("id", String, primary_key=True)
+    user_id = Column("user_id", String, index=True)
+    goal_type = Column("goal_type", String)
+    goal_value = Column("goal_value", Float)
+    goal_current = Column("goal_current", Float)
+    start_date = Column("start_date", Date)
+    end_date = Column("end_date", Date)
+    is_active = Column("is_active", Boolean)
+    created_at = Column("created_at", DateTime)
+    updated_at = Column("updated_at", DateTime)
 
 class UserGoal(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
-    user_id: str
-    goal_type: Optional[str]
-    goal_value: Optional[float]
-    goal_current: Optional[float]
-    start_date: Optional[date]
-    end_date: Optional[date]
-    is_active: Optional[bool]
-    created_at: Optional[datetime]
-    updated_at: Optional[datetime]
+    user_id: Optional[str] = None  # Server will set this from token
+    goal_type: Optional[str] = None
+    goal_value: Optional[float] = None
+    goal_current: Optional[float] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    is_active: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class ActiveGoal(UserGoal):
+    progress: Optional[float] = None  # goal_current / goal_value
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 from datetime import date, datetime
 from sqlalchemy import Column, String, Date, Integer, DateTime
@@ -10,13 +10,19 @@ class WaterIntakeLogORM(Base):
     __tablename__ = "water_intake_logs"
     id = Column("id", String, primary_key=True)
     user_id = Column("user_id", String, index=True)
-    date = Column("date", Date)
+    date = Column("date", Date, nullable=False)
     count = Column("count", Integer)
     updated_at = Column("updated_at", DateTime)
 
 class WaterIntakeLog(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     user_id: Optional[str] = None  # Server will set this from token
     date: date
     count: Optional[int] = None
     updated_at: Optional[datetime] = None
+
+class WaterIncrement(BaseModel):
+    id: Optional[str] = None  # used if the day has no log yet
+    amount: int = Field(1, ge=-100, le=100)
@@ -0,0 +1,106 @@
+import os
+from typing import Literal, Optional
+from pydantic import BaseModel
+
+
+class Settings(BaseModel):
+    """Runtime configuration. Every field can be overridden by the environment
+    variable of the same name in upper case (``DB_POOL_SIZE=20``)."""
+
+    # DB config, defaults match db/docker-compose.yaml
+    db_user: str = "admin"
+    db_password: str = "adminpass"
+    db_host: str = "localhost"
+    db_port: int = 5432
+    db_name: str = "health_db"
+    # Full SQLAlchemy URL, takes precedence over the db_* parts when set
+    db_url: Optional[str] = None
+
+    # Connection pool, per uvicorn worker: at most pool_size + max_overflow
+    # connections, so Postgres max_connections must cover workers * that.
+    db_pool_size: int = 10
+    db_max_overflow: int = 5
+    db_pool_timeout: float = 10.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+
+    # Comma separated user ids allowed to change shared reference data (the
+    # nutrition_database writes and its bulk import); nobody when empty
+    admin_user_ids: str = ""
+
+    # Verified JWT claims cached per token digest; entries also expire at the token's exp
+    auth_claims_cache_size: int = 10000
+    auth_claims_cache_ttl: float = 300.0
+
+    # Password hashing: bcrypt cost factor and the worker pool it runs on
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 32
+
+    # Seconds between reloads of the Postgres enum labels (SIGHUP reloads at once)
+    enum_registry_ttl: float = 600.0
+
+    # List endpoints: rows per page when ?limit= is absent, and the largest allowed
+    page_size_default: int = 100
+    page_size_max: int = 500
+
+    # Upper bound on operations accepted by one /sync/batch call
+    sync_batch_max_operations: int = 2000
+    # /sync/changes does not move its cursor past rows younger than this, so
+    # writes still committing when the feed is read are not skipped
+    sync_cursor_lag_seconds: float = 5.0
+
+    # /stats/daily: days returned when ?from= is absent, and the widest range allowed
+    stats_default_days: int = 30
+    stats_max_days: int = 731
+
+    # Seconds between full reloads of the in-process food search index
+    food_search_refresh_seconds: float = 300.0
+
+    # Records validated and written per INSERT by the nutrition bulk import
+    nutrition_import_chunk_size: int = 2000
+
+    # Nutrition rows kept in memory for meal totals (LRU by food name); other
+    # workers' edits show up after the TTL
+    nutrition_cache_size: int = 5000
+    nutrition_cache_ttl: float = 600.0
+
+    # Responses of at least this many bytes are compressed (brotli when the
+    # package is installed and the client accepts it, gzip otherwise)
+    compression_minimum_size: int = 1024
+    gzip_level: int = 6
+    brotli_quality: int = 4
+
+    # Log events waiting for the achievement evaluator (more are dropped), and
+    # the most it folds into one transaction
+    event_queue_size: int = 10000
+    achievement_batch_size: int = 500
+
+    # Reminder scheduler: seconds between scans for due reminders, reminders
+    # claimed per transaction, and where they are delivered (reminders.SINKS)
+    reminder_scheduler_enabled: bool = True
+    reminder_poll_seconds: float = 30.0
+    reminder_batch_size: int = 1000
+    reminder_sink: Literal["log", "memory"] = "log"
+
+    # Request scoped SQL profiler (X-Query-Count / Server-Timing headers and a
+    # slow query log), off by default; see my_server/query_profiler.py
+    query_profiler: bool = False
+    slow_query_seconds: float = 0.1
+
+    @property
+    def database_url(self) -> str:
+        if self.db_url:
+            return self.db_url
+        return f"postgresql+asyncpg://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
+
+    @property
+    def admins(self) -> frozenset:
+        return frozenset(user_id.strip() for user_id in self.admin_user_ids.split(",") if user_id.strip())
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(**{name: os.environ[name.upper()] for name in cls.model_fields if name.upper() in os.environ})
+
+
+settings = Settings.from_env()
@@ -0,0 +1,80 @@
+"""fold and drop_client_progress, no database needed."""
+from datetime import date, timedelta
+from my_server.achievement_engine import Counter, drop_client_progress, fold
+
+START = date(2026, 3, 1)
+
+
+def _day(water=0, exercise=0, sleep=0.0, meals=0):
+    return {"water_count": water, "exercise_minutes": exercise, "sleep_hours": sleep, "meal_count": meals}
+
+
+def _days(*totals, start=START):
+    return {start + timedelta(days=offset): day for offset, day in enumerate(totals)}
+
+
+def test_a_big_day_is_one_day_of_the_week_achievement():
+    counters = {}
+    assert fold(counters, _days(_day(water=20))) == {"water", "streak"}
+    assert counters["water"] == Counter(1, START)
+
+
+def test_a_day_short_of_the_amount_does_not_count():
+    counters = {}
+    moved = fold(counters, _days(_day(water=7, exercise=29, sleep=7.5)))
+    assert moved == {"streak"}
+    assert counters["water"] == Counter(0, None)
+    assert counters["exercise"] == Counter(0, None)
+    assert counters["sleep"] == Counter(0, None)
+
+
+def test_one_night_of_eight_hours():
+    counters = {}
+    fold(counters, _days(_day(sleep=8.0)))
+    assert counters["sleep"] == Counter(1, START)
+
+
+def test_consecutive_qualifying_days_make_a_run():
+    counters = {}
+    fold(counters, _days(*[_day(water=8, exercise=30)] * 7))
+    assert counters["water"] == Counter(7, START + timedelta(days=6))
+    assert counters["exercise"] == Counter(7, START + timedelta(days=6))
+
+
+def test_runs_continue_across_batches_and_restart_after_a_gap():
+    counters = {}
+    fold(counters, _days(_day(water=8), _day(water=8)))
+    fold(counters, _days(_day(water=9), start=START + timedelta(days=2)))
+    assert counters["water"] == Counter(3, START + timedelta(days=2))
+    # a day below the amount in between: the next qualifying day starts over
+    fold(counters, _days(_day(water=2), _day(water=8), start=START + timedelta(days=3)))
+    assert counters["water"] == Counter(1, START + timedelta(days=4))
+
+
+def test_days_up_to_the_last_day_do_not_move_the_counter():
+    counters = {"water": Counter(3, START + timedelta(days=5))}
+    assert "water" not in fold(counters, _days(_day(water=8), start=START + timedelta(days=5)))
+    assert "water" not in fold(counters, _days(_day(water=8), start=START))
+    assert counters["water"] == Counter(3, START + timedelta(days=5))
+
+
+def test_streak_counts_days_with_anything_logged():
+    counters = {}
+    fold(counters, _days(_day(meals=1), _day(water=1), _day(), _day(sleep=6.0)))
+    assert counters["streak"] == Counter(1, START + timedelta(days=3))
+    fold(counters, _days(_day(exercise=5), start=START + timedelta(days=4)))
+    assert counters["streak"] == Counter(2, START + timedelta(days=4))
+
+
+def test_client_progress_is_kept_only_for_types_the_engine_does_not_track():
+    progress = {"current": 3, "achieved": True, "achieved_at": None}
+    for values, kept in (
+        ({"id": "a", "type": "water", **progress}, False),
+        ({"id": "a", "type": "streak", **progress}, False),
+        ({"id": "a", **progress}, False),
+        ({"id": "a", "type": "weight", **progress}, True),
+        ({"id": "a", "type": None, **progress}, True),
+    ):
+        drop_client_progress(values)
+        assert ("current" in values) is kept
+        assert ("achieved" in values) is kept
@@ -0,0 +1,230 @@
+"""The routes add_crud_routes generates, for one resource of each shape."""
+import pytest
+from my_server.api import water_intake_logs
+from my_server.api.crud import CrudHooks
+
+
+def _summary(db, user_id):
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT date::text, water_count, exercise_minutes, meal_count FROM user_daily_summary WHERE user_id = %s ORDER BY date",
+            (user_id,),
+        )
+        return cursor.fetchall()
+
+
+def _tombstones(db, resource):
+    with db.cursor() as cursor:
+        cursor.execute("SELECT id FROM sync_tombstones WHERE resource = %s ORDER BY id", (resource,))
+        return [record_id for record_id, in cursor.fetchall()]
+
+
+class RecordingHooks(CrudHooks):
+    """Wraps a resource's hooks and keeps the (old, new) pairs ``written`` was given."""
+
+    def __init__(self, wrapped):
+        self.wrapped = wrapped
+        self.calls = []
+
+    async def prepare(self, db, user_id, values):
+        await self.wrapped.prepare(db, user_id, values)
+
+    async def before_delete(self, db, user_id, record_id):
+        await self.wrapped.before_delete(db, user_id, record_id)
+
+    async def written(self, db, user_id, old, new):
+        self.calls.append((old, dict(new) if new is not None else None))
+        await self.wrapped.written(db, user_id, old, new)
+
+    def committed(self, old, new):
+        self.wrapped.committed(old, new)
+
+
+@pytest.fixture
+def water_hooks(monkeypatch):
+    hooks = RecordingHooks(water_intake_logs.resource.hooks)
+    monkeypatch.setattr(water_intake_logs.resource, "hooks", hooks)
+    return hooks
+
+
+# user scoped log: exercise_logs
+
+def test_exercise_log_create_update_delete(client, db, alice):
+    body = {"id": "ex-1", "date": "2026-03-01", "activity_type": "running", "duration": 30, "calories_burned": 250.0}
+    response = client.post("/exercise_logs", json=body, headers=alice)
+    assert response.status_code == 200
+    assert response.json()["user_id"] == "alice"
+    assert _summary(db, "alice") == [("2026-03-01", 0, 30, 0)]
+
+    response = client.put("/exercise_logs/ex-1", json=dict(body, date="2026-03-02", duration=45), headers=alice)
+    assert response.status_code == 200
+    assert response.json()["duration"] == 45
+    # the old day is recomputed as well as the new one
+    assert _summary(db, "alice") == [("2026-03-01", 0, 0, 0), ("2026-03-02", 0, 45, 0)]
+
+    response = client.delete("/exercise_logs/ex-1", headers=alice)
+    assert response.status_code == 200
+    assert client.get("/exercise_logs/ex-1", headers=alice).status_code == 404
+    assert _tombstones(db, "exercise_logs") == ["ex-1"]
+    assert _summary(db, "alice") == [("2026-03-01", 0, 0, 0), ("2026-03-02", 0, 0, 0)]
+
+
+def test_exercise_log_id_conflict_and_other_users_rows(client, alice, bob):
+    body = {"id": "ex-1", "date": "2026-03-01", "activity_type": "running"}
+    assert client.post("/exercise_logs", json=body, headers=alice).status_code == 200
+    response = client.post("/exercise_logs", json=body, headers=alice)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Exercise log already exists"
+    # another user's id is neither readable, writable nor deletable
+    assert client.post("/exercise_logs", json=body, headers=bob).status_code == 400
+    assert client.get("/exercise_logs/ex-1", headers=bob).status_code == 404
+    assert client.put("/exercise_logs/ex-1", json=body, headers=bob).status_code == 404
+    assert client.delete("/exercise_logs/ex-1", headers=bob).status_code == 404
+    assert [row["id"] for row in client.get("/exercise_logs", headers=bob).json()] == []
+
+
+def test_exercise_log_rejects_unknown_enum_value(client, alice):
+    response = client.post("/exercise_logs", json={"id": "ex-1", "date": "2026-03-01", "activity_type": "flying"}, headers=alice)
+    assert response.status_code == 400
+
+
+# one row per user per day: water_intake_logs
+
+def test_water_log_second_row_for_a_day_is_a_conflict(client, alice):
+    assert client.post("/water_intake_logs", json={"id": "w-1", "date": "2026-03-01", "count": 2}, headers=alice).status_code == 200
+    response = client.post("/water_intake_logs", json={"id": "w-2", "date": "2026-03-01", "count": 3}, headers=alice)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Water intake log for this date already exists"
+    # moving another log onto the day is the same conflict
+    assert client.post("/water_intake_logs", json={"id": "w-3", "date": "2026-03-02", "count": 1}, headers=alice).status_code == 200
+    response = client.put("/water_intake_logs/w-3", json={"id": "w-3", "date": "2026-03-01", "count": 1}, headers=alice)
+    assert response.status_code == 400
+
+
+def test_water_log_put_by_date_creates_then_replaces(client, db, alice, water_hooks):
+    response = client.put("/water_intake_logs/by_date/2026-03-01", json={"id": "w-1", "date": "2026-03-01", "count": 2}, headers=alice)
+    assert response.status_code == 200
+    assert water_hooks.calls[-1][0] is None
+
+    # a second device sends its own id: the day's row is replaced and keeps its id
+    response = client.put("/water_intake_logs/by_date/2026-03-01", json={"id": "w-9", "date": "2026-03-01", "count": 5}, headers=alice)
+    assert response.status_code == 200
+    assert response.json()["id"] == "w-1"
+    assert response.json()["count"] == 5
+    old, new = water_hooks.calls[-1]
+    assert old == {"date": new["date"]}
+    assert [row["id"] for row in client.get("/water_intake_logs", headers=alice).json()] == ["w-1"]
+    assert _summary(db, "alice") == [("2026-03-01", 5, 0, 0)]
+
+
+def test_water_log_increment(client, db, alice):
+    for amount in (2, 3, -1):
+        response = client.post("/water_intake_logs/by_date/2026-03-01/increment", json={"amount": amount}, headers=alice)
+        assert response.status_code == 200
+    assert response.json()["count"] == 4
+    assert _summary(db, "alice") == [("2026-03-01", 4, 0, 0)]
+
+
+def test_water_log_increment_with_an_id_in_use(client, db, alice, bob):
+    assert client.post("/water_intake_logs", json={"id": "w-1", "date": "2026-03-01", "count": 2}, headers=alice).status_code == 200
+    for headers in (alice, bob):
+        response = client.post("/water_intake_logs/by_date/2026-03-02/increment", json={"id": "w-1", "amount": 1}, headers=headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Water intake log already exists"
+    assert _summary(db, "alice") == [("2026-03-01", 2, 0, 0)]
+    # on the day of the row the id names, it is an increment
+    response = client.post("/water_intake_logs/by_date/2026-03-01/increment", json={"id": "w-1", "amount": 1}, headers=alice)
+    assert response.json()["count"] == 3
+
+
+# child of another user scoped row: meals
+
+def test_meal_needs_one_of_the_callers_food_logs(client, db, alice, bob):
+    assert client.post("/food_logs", json={"id": "log-a", "date": "2026-03-01"}, headers=alice).status_code == 200
+    assert client.post("/food_logs", json={"id": "log-b", "date": "2026-03-01"}, headers=bob).status_code == 200
+
+    response = client.post("/meals", json={"id": "meal-1", "food_log_id": "log-b", "meal_type": "breakfast"}, headers=alice)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Food log not found"
+
+    assert client.post("/meals", json={"id": "meal-1", "food_log_id": "log-a", "meal_type": "breakfast"}, headers=alice).status_code == 200
+    assert _summary(db, "alice") == [("2026-03-01", 0, 0, 1)]
+    assert _summary(db, "bob") == []
+
+    # deleting the food log takes its meals with it
+    assert client.delete("/food_logs/log-a", headers=alice).status_code == 200
+    assert client.get("/meals/meal-1", headers=alice).status_code == 404
+    assert _tombstones(db, "meals") == ["meal-1"]
+    assert _summary(db, "alice") == [("2026-03-01", 0, 0, 0)]
+
+
+# shared table with its own unique column: nutrition_database
+
+def test_food_conflicts_on_id_and_on_name(client, admin, alice):
+    food = {"id": "food-1", "food_name": "Rice", "calories": 130.0}
+    assert client.post("/nutrition_database", json=food, headers=admin).status_code == 200
+    # not user scoped: everyone reads it
+    assert client.get("/nutrition_database/food-1", headers=alice).json()["food_name"] == "Rice"
+
+    response = client.post("/nutrition_database", json=food, headers=admin)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Food already exists"
+    response = client.post("/nutrition_database", json=dict(food, id="food-2"), headers=admin)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Food already exists"
+
+    assert client.delete("/nutrition_database/food-1", headers=admin).status_code == 200
+    assert client.get("/nutrition_database/food-1", headers=alice).status_code == 404
+
+
+def test_only_admins_change_foods(client, admin, alice):
+    food = {"id": "food-1", "food_name": "Rice", "calories": 130.0}
+    assert client.post("/nutrition_database", json=food, headers=alice).status_code == 403
+    assert client.post("/nutrition_database", json=food, headers=admin).status_code == 200
+    response = client.put("/nutrition_database/food-1", json=dict(food, calories=1.0), headers=alice)
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Admin access required"
+    assert client.delete("/nutrition_database/food-1", headers=alice).status_code == 403
+    response = client.post("/nutrition_database/import", files={"file": ("foods.csv", b"food_name,calories\nRice,1\n")}, headers=alice)
+    assert response.status_code == 403
+
+    assert client.get("/nutrition_database/food-1", headers=alice).json()["calories"] == 130.0
+    assert [row["id"] for row in client.get("/nutrition_database", headers=alice).json()] == ["food-1"]
+    assert client.get("/nutrition_database/search", params={"q": "rice"}, headers=alice).status_code == 200
+
+
+# defaults and conditional GETs: notification_settings
+
+def test_notification_settings_defaults_and_etag(client, alice):
+    response = client.post("/notification_settings", json={"id": "ns-1", "water_reminder_enabled": False}, headers=alice)
+    assert response.status_code == 200
+    assert response.json()["water_reminder_enabled"] is False
+    assert response.json()["sleep_reminder_enabled"] is True
+
+    # a field left out of an update keeps its stored value
+    response = client.put("/notification_settings/ns-1", json={"id": "ns-1", "sleep_reminder_enabled": False}, headers=alice)
+    assert response.json()["water_reminder_enabled"] is False
+    assert response.json()["sleep_reminder_enabled"] is False
+
+    response = client.get("/notification_settings", headers=alice)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert client.get("/notification_settings", headers=dict(alice, **{"If-None-Match": etag})).status_code == 304
+
+
+# server kept progress: achievements
+
+def test_achievement_progress_of_tracked_types_comes_from_the_counters(client, db, alice):
+    with db.cursor() as cursor:
+        cursor.execute("INSERT INTO achievement_counters (user_id, type, value, last_day) VALUES ('alice', 'water', 1, '2026-03-01')")
+    week = {"id": "water-week", "type": "water", "target": 7, "current": 7, "achieved": True}
+    response = client.post("/achievements", json=week, headers=alice)
+    assert response.status_code == 200
+    assert (response.json()["current"], response.json()["achieved"]) == (1, False)
+    response = client.put("/achievements/water-week", json=week, headers=alice)
+    assert (response.json()["current"], response.json()["achieved"]) == (1, False)
+
+    # the engine does not model weight achievements: the client's progress stands
+    weight = {"id": "weight-first", "type": "weight", "target": 1, "current": 1, "achieved": True}
+    response = client.post("/achievements", json=weight, headers=alice)
+    assert (response.json()["current"], response.json()["achieved"]) == (1, True)
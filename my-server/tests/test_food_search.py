@@ -0,0 +1,95 @@
+"""FoodSearchIndex ranking and live updates, no database needed."""
+import asyncio
+from my_server.food_search import FoodSearchIndex
+from my_server.schema.nutrition_database import NutritionDatabase
+
+
+def _food(food_id, name):
+    return NutritionDatabase(id=food_id, food_name=name)
+
+
+def _index(*names):
+    index = FoodSearchIndex(refresh_seconds=0)
+    index.build(_food(f"f-{number}", name) for number, name in enumerate(names))
+    return index
+
+
+def _names(index, query, limit=10):
+    return [food.food_name for food in index.search(query, limit)]
+
+
+def test_exact_then_word_prefix_then_trigram_matches():
+    index = _index("Fried rice", "Rice", "Rice noodles", "Brown rice", "Licorice")
+    assert _names(index, "rice") == ["Rice", "Brown rice", "Fried rice", "Rice noodles", "Licorice"]
+
+
+def test_shorter_names_first_among_equal_scores():
+    index = _index("Chicken curry with rice", "Chicken curry", "Chicken")
+    assert _names(index, "chick") == ["Chicken", "Chicken curry", "Chicken curry with rice"]
+
+
+def test_case_width_and_spacing_are_folded():
+    index = _index("Pad Thai")
+    assert _names(index, "ｐａｄ  THAI") == ["Pad Thai"]
+
+
+def test_a_typo_still_finds_the_food():
+    index = _index("Spaghetti bolognese", "Salad")
+    assert _names(index, "spagetti") == ["Spaghetti bolognese"]
+
+
+def test_thai_matches_inside_a_name():
+    index = _index("ข้าวผัดกุ้ง", "ต้มยำกุ้ง")
+    assert _names(index, "ผัดกุ้ง") == ["ข้าวผัดกุ้ง"]
+
+
+def test_limit_and_empty_query():
+    index = _index("Rice", "Brown rice", "Fried rice")
+    assert len(index.search("rice", limit=2)) == 2
+    assert index.search("   ") == []
+
+
+def test_upsert_adds_and_renames_remove_drops():
+    index = _index("Rice")
+    index.upsert(_food("f-9", "Mango sticky rice"))
+    assert _names(index, "mango") == ["Mango sticky rice"]
+    index.upsert(_food("f-9", "Papaya salad"))
+    assert _names(index, "mango") == []
+    assert _names(index, "papaya") == ["Papaya salad"]
+    index.remove("f-0")
+    assert _names(index, "rice") == []
+    assert len(index) == 1
+
+
+def test_changes_made_during_a_rebuild_survive_it():
+    index = _index("Rice", "Bread")
+
+    async def read():
+        # the snapshot is taken, then this worker commits two changes
+        snapshot = [_food("f-0", "Rice"), _food("f-1", "Bread")]
+        index.upsert(_food("f-2", "Omelette"))
+        index.remove("f-1")
+        return snapshot
+
+    asyncio.run(index.rebuild(read))
+    assert _names(index, "omelette") == ["Omelette"]
+    assert _names(index, "bread") == []
+    assert _names(index, "rice") == ["Rice"]
+    # the log is only kept while a rebuild runs
+    assert index._changes == []
+    index.upsert(_food("f-3", "Soup"))
+    assert index._changes == []
+
+
+def test_a_failed_rebuild_keeps_the_index():
+    index = _index("Rice")
+
+    async def read():
+        raise OSError("database down")
+
+    try:
+        asyncio.run(index.rebuild(read))
+    except OSError:
+        pass
+    assert _names(index, "rice") == ["Rice"]
+    assert index._rebuilds == {}
@@ -0,0 +1,30 @@
+"""POST /nutrition_database/import with files that are partly or wholly unreadable."""
+import csv
+
+
+def _import(client, headers, filename, content: bytes):
+    return client.post("/nutrition_database/import", files={"file": (filename, content)}, headers=headers)
+
+
+def _food_names(client, headers):
+    return sorted(row["food_name"] for row in client.get("/nutrition_database", headers=headers).json())
+
+
+def test_a_file_that_is_not_utf8_is_a_400_and_imports_nothing(client, admin):
+    content = "food_name,calories\nRice,130\nCrème brûlée,330\n".encode("latin-1")
+    response = _import(client, admin, "foods.csv", content)
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("File is not UTF-8 text")
+    assert _food_names(client, admin) == []
+
+
+def test_a_line_the_csv_reader_refuses_is_a_rejected_row(client, admin):
+    oversized = "x" * (csv.field_size_limit() + 1)
+    content = f"food_name,calories\nRice,130\nBread,{oversized}\nEgg,155\n".encode()
+    response = _import(client, admin, "foods.csv", content)
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["accepted"], report["rejected"]) == (2, 1)
+    assert report["errors"][0]["line"] == 3
+    assert "field larger than field limit" in report["errors"][0]["detail"]
+    assert _food_names(client, admin) == ["Egg", "Rice"]
@@ -0,0 +1,28 @@
+"""Statement counts of list endpoints, through the query profiler (conftest turns it on)."""
+import pytest
+from my_server.query_profiler import query_budget
+
+
+def _log_days(client, headers, days):
+    for day in range(1, days + 1):
+        response = client.post("/water_intake_logs", json={"id": f"w-{day}", "date": f"2026-03-{day:02d}", "count": day}, headers=headers)
+        assert response.status_code == 200
+
+
+@pytest.mark.parametrize("days", [1, 20])
+def test_list_endpoint_is_one_statement_whatever_the_page_size(client, alice, days):
+    _log_days(client, alice, days)
+    with query_budget(1) as profiles:
+        response = client.get("/water_intake_logs", headers=alice)
+    assert response.status_code == 200
+    assert len(response.json()) == days
+    assert response.headers["X-Query-Count"] == "1"
+    [profile] = profiles
+    assert profile.route == "/water_intake_logs"
+    assert profile.count == 1
+
+
+def test_budget_fails_the_block_when_exceeded(client, alice):
+    with pytest.raises(AssertionError, match=r"Query budget of 0 exceeded \(/water_intake_logs: 1\)"):
+        with query_budget(0):
+            client.get("/water_intake_logs", headers=alice)
@@ -0,0 +1,153 @@
+"""/sync/changes cursors and /sync/batch per-operation results."""
+import pytest
+from my_server.settings import settings
+
+
+@pytest.fixture
+def settled(monkeypatch):
+    """No settle window: the cursor moves past every row it returns."""
+    monkeypatch.setattr(settings, "sync_cursor_lag_seconds", 0.0)
+
+
+def _changes(client, headers, since=None, **params):
+    params = dict(params, resources="exercise_logs")
+    if since is not None:
+        params["since"] = since
+    response = client.get("/sync/changes", params=params, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    changes = body["changes"]["exercise_logs"]
+    return [row["id"] for row in changes["upserted"]], changes["deleted"], body["cursor"], body["has_more"]
+
+
+def _exercise(record_id, day="2026-03-01", **fields):
+    return dict({"id": record_id, "date": day, "activity_type": "running", "duration": 30}, **fields)
+
+
+def _batch(client, headers, *operations):
+    response = client.post("/sync/batch", json={"operations": list(operations)}, headers=headers)
+    assert response.status_code == 200
+    return [(item["status"], item["id"], item["detail"]) for item in response.json()["results"]]
+
+
+def _age(db, table, seconds):
+    """Move every row of ``table`` ``seconds`` into the past, out of the settle window."""
+    with db.cursor() as cursor:
+        cursor.execute(f'UPDATE "{table}" SET updated_at = updated_at - make_interval(secs => %s)', (seconds,))
+
+
+# /sync/changes
+
+def test_changes_cursor_round_trip(client, alice, bob, settled):
+    for record_id in ("ex-1", "ex-2", "ex-3"):
+        assert client.post("/exercise_logs", json=_exercise(record_id), headers=alice).status_code == 200
+    assert client.post("/exercise_logs", json=_exercise("ex-bob"), headers=bob).status_code == 200
+
+    upserted, deleted, cursor, has_more = _changes(client, alice, limit=2)
+    assert (upserted, deleted, has_more) == (["ex-1", "ex-2"], [], True)
+    upserted, deleted, cursor, has_more = _changes(client, alice, cursor, limit=2)
+    assert (upserted, deleted, has_more) == (["ex-3"], [], False)
+    assert _changes(client, alice, cursor)[:2] == ([], [])
+
+    # an update comes back once, after the cursor
+    assert client.put("/exercise_logs/ex-2", json=_exercise("ex-2", duration=45), headers=alice).status_code == 200
+    upserted, _, cursor, _ = _changes(client, alice, cursor)
+    assert upserted == ["ex-2"]
+    assert _changes(client, alice, cursor)[:2] == ([], [])
+
+
+def test_changes_reports_deletions_once(client, alice, settled):
+    assert client.post("/exercise_logs", json=_exercise("ex-1"), headers=alice).status_code == 200
+    _, _, cursor, _ = _changes(client, alice)
+    assert client.delete("/exercise_logs/ex-1", headers=alice).status_code == 200
+
+    upserted, deleted, cursor, _ = _changes(client, alice, cursor)
+    assert (upserted, deleted) == ([], ["ex-1"])
+    assert _changes(client, alice, cursor)[:2] == ([], [])
+    # a new row under the same id makes the tombstone stale
+    assert client.post("/exercise_logs", json=_exercise("ex-1"), headers=alice).status_code == 200
+    assert _changes(client, alice)[:2] == (["ex-1"], [])
+
+
+def test_changes_invalid_cursor_is_a_400(client, alice):
+    response = client.get("/sync/changes", params={"since": "not a cursor"}, headers=alice)
+    assert response.status_code == 400
+
+
+def test_changes_do_not_move_the_cursor_into_the_settle_window(client, db, alice):
+    assert client.post("/exercise_logs", json=_exercise("ex-1"), headers=alice).status_code == 200
+    _age(db, "exercise_logs", 60)
+    assert client.post("/exercise_logs", json=_exercise("ex-2"), headers=alice).status_code == 200
+
+    # ex-2 was stamped just now: it is sent, but the cursor stops after ex-1
+    upserted, _, cursor, has_more = _changes(client, alice)
+    assert (upserted, has_more) == (["ex-1", "ex-2"], False)
+    upserted, _, cursor, _ = _changes(client, alice, cursor)
+    assert upserted == ["ex-2"]
+
+    _age(db, "exercise_logs", 60)
+    upserted, _, cursor, _ = _changes(client, alice, cursor)
+    assert upserted == ["ex-2"]
+    assert _changes(client, alice, cursor)[0] == []
+
+
+def test_changes_apply_the_settle_window_to_full_pages(client, db, alice):
+    for record_id in ("ex-1", "ex-2", "ex-3"):
+        assert client.post("/exercise_logs", json=_exercise(record_id), headers=alice).status_code == 200
+
+    # a full page inside the window: more to come, cursor where it was
+    upserted, _, cursor, has_more = _changes(client, alice, limit=2)
+    assert (upserted, has_more) == (["ex-1", "ex-2"], True)
+    again, _, next_cursor, has_more = _changes(client, alice, cursor, limit=2)
+    assert (again, next_cursor, has_more) == (["ex-1", "ex-2"], cursor, True)
+
+    _age(db, "exercise_logs", 60)
+    upserted, _, cursor, has_more = _changes(client, alice, cursor, limit=2)
+    assert (upserted, has_more) == (["ex-1", "ex-2"], True)
+    upserted, _, cursor, has_more = _changes(client, alice, cursor, limit=2)
+    assert (upserted, has_more) == (["ex-3"], False)
+
+
+# /sync/batch
+
+def test_batch_isolates_refused_operations(client, alice, bob):
+    assert client.post("/exercise_logs", json=_exercise("ex-bob"), headers=bob).status_code == 200
+    results = _batch(
+        client, alice,
+        {"resource": "exercise_logs", "op": "upsert", "data": _exercise("ex-1")},
+        # another user's id
+        {"resource": "exercise_logs", "op": "upsert", "data": _exercise("ex-bob")},
+        # a food log the caller does not have
+        {"resource": "meals", "op": "upsert", "data": {"id": "m-1", "food_log_id": "nowhere", "meal_type": "breakfast"}},
+        {"resource": "exercise_logs", "op": "upsert", "data": _exercise("ex-2")},
+        {"resource": "exercise_logs", "op": "delete", "id": "ex-missing"},
+    )
+    assert results == [
+        (200, "ex-1", None),
+        (409, "ex-bob", "Id already in use"),
+        (400, "m-1", "food_log_id not found"),
+        (200, "ex-2", None),
+        (404, "ex-missing", "Not found"),
+    ]
+    assert sorted(row["id"] for row in client.get("/exercise_logs", headers=alice).json()) == ["ex-1", "ex-2"]
+    assert client.get("/exercise_logs/ex-bob", headers=bob).json()["duration"] == 30
+
+
+def test_batch_merges_a_new_id_into_the_days_record(client, alice):
+    assert client.post("/water_intake_logs", json={"id": "w-1", "date": "2026-03-01", "count": 2}, headers=alice).status_code == 200
+    results = _batch(client, alice, {"resource": "water_intake_logs", "op": "upsert", "data": {"id": "w-2", "date": "2026-03-01", "count": 5}})
+    assert results == [(200, "w-1", "Merged into the existing record of the day")]
+    assert [(row["id"], row["count"]) for row in client.get("/water_intake_logs", headers=alice).json()] == [("w-1", 5)]
+
+
+def test_batch_later_operation_on_an_id_supersedes_earlier_ones(client, alice):
+    results = _batch(
+        client, alice,
+        {"resource": "exercise_logs", "op": "upsert", "data": _exercise("ex-1", duration=10)},
+        {"resource": "exercise_logs", "op": "upsert", "data": _exercise("ex-1", duration=20)},
+        {"resource": "exercise_logs", "op": "upsert", "data": _exercise("ex-2")},
+        {"resource": "exercise_logs", "op": "delete", "id": "ex-2"},
+    )
+    # ex-2 never existed before the batch, so its delete finds nothing and the upsert reports that too
+    assert results == [(200, "ex-1", None), (200, "ex-1", None), (404, "ex-2", "Not found"), (404, "ex-2", "Not found")]
+    assert [(row["id"], row["duration"]) for row in client.get("/exercise_logs", headers=alice).json()] == [("ex-1", 20)]